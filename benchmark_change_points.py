@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Change-Point Benchmark
+Times the batched binary segmentation in change_points.py against a textbook
+per-series recursive version on synthetic 3PA-rate series with known shifts,
+from season granularity (21 points per franchise) up to game granularity
+(21 x 82 points) and beyond.
+
+Both versions make the same splits; the benchmark checks they agree and how
+close the detected shifts land to the planted ones.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from change_points import DEFAULT_MAX_CHANGES, DEFAULT_PENALTY, binary_segmentation, noise_variance
+
+def synthetic_series(teams, length, seed=0):
+    """3PA-rate series (percent) with one planted upward shift each."""
+    rng = np.random.default_rng(seed)
+    shift_at = rng.integers(length // 5, length - length // 5, teams)
+    shift = rng.uniform(5, 15, teams)
+    matrix = rng.normal(22, 6 if length > 100 else 2, (teams, length))
+    matrix += (np.arange(length)[None, :] >= shift_at[:, None]) * shift[:, None]
+    return matrix, np.full(teams, length), shift_at
+
+def looped_segmentation(matrix, lengths, penalty=DEFAULT_PENALTY, max_changes=DEFAULT_MAX_CHANGES, min_size=2):
+    """Textbook binary segmentation: one series at a time, one segment at a time."""
+    variance = noise_variance(matrix)
+    found = []
+    for row, length in enumerate(lengths):
+        values = matrix[row, :length]
+        cumulative = np.r_[0, np.cumsum(values)]
+        threshold = penalty * variance[row] * np.log(max(length, 2))
+        segments, changes = [(0, int(length))], []
+
+        while segments:
+            # Split the open segments in order of their best gain, like the batched rounds
+            scored = []
+            for start, end in segments:
+                best, best_gain = None, -np.inf
+                for split in range(start + min_size, end - min_size + 1):
+                    left = cumulative[split] - cumulative[start]
+                    right = cumulative[end] - cumulative[split]
+                    gain = (left ** 2 / (split - start) + right ** 2 / (end - split)
+                            - (left + right) ** 2 / (end - start))
+                    if gain > best_gain:
+                        best, best_gain = split, gain
+                if best is not None and best_gain > threshold:
+                    scored.append((best_gain, start, best, end))
+
+            next_segments = []
+            for best_gain, start, split, end in sorted(scored, reverse=True):
+                if len(changes) >= max_changes:
+                    break
+                changes.append((split, best_gain))
+                next_segments += [(start, split), (split, end)]
+            segments = [(s, e) for s, e in next_segments if e - s >= 2 * min_size and len(changes) < max_changes]
+
+        found += [(row, split, gain) for split, gain in sorted(changes)]
+    return found
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def main():
+    """Run the benchmark and print a timing table."""
+    parser = argparse.ArgumentParser(description="Benchmark batched vs looped change-point detection")
+    parser.add_argument('--teams', type=int, default=30)
+    parser.add_argument('--lengths', type=int, nargs='+', default=[21, 21 * 82, 21 * 82 * 4],
+                        help="Points per series (seasons, games, ...)")
+    parser.add_argument('--loop-subset', type=int, default=10,
+                        help="Series timed for the looped version at lengths over 100 (result is extrapolated)")
+    args = parser.parse_args()
+
+    print(f"📊 {args.teams} franchises, one planted 3PA-rate shift each")
+    print(f"   {'Points':>8} {'Batched':>10} {'Looped':>12} {'Speedup':>9} {'Agree':>6} {'Median miss':>12}")
+    for length in args.lengths:
+        matrix, lengths, shift_at = synthetic_series(args.teams, length)
+        min_size = 2 if length <= 100 else 10
+
+        batched_time, (rows, positions, _) = timed(binary_segmentation, matrix, lengths, min_size=min_size)
+        subset = args.teams if length <= 100 else min(args.loop_subset, args.teams)
+        loop_time, looped = timed(looped_segmentation, matrix[:subset], lengths[:subset], min_size=min_size)
+        loop_estimate = loop_time * args.teams / subset
+
+        batched = [(r, p) for r, p in zip(rows, positions) if r < subset]
+        agree = batched == [(r, p) for r, p, _ in looped]
+
+        # Distance from each planted shift to the nearest detected change point
+        misses = [np.min(np.abs(positions[rows == team] - shift_at[team])) for team in range(args.teams)
+                  if (rows == team).any()]
+        miss = f"{np.median(misses):.0f} pts" if misses else 'n/a'
+        estimated = '' if subset == args.teams else '*'
+        print(f"   {length:>8,} {batched_time:>9.3f}s {loop_estimate:>10.3f}s{estimated:1} "
+              f"{loop_estimate / batched_time:>8,.1f}x {'yes' if agree else 'NO':>6} {miss:>12}")
+
+    print("\n   * extrapolated from the looped subset")
+
+if __name__ == "__main__":
+    main()
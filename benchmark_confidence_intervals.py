@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Confidence Interval Benchmark
+Times the batched interval methods in confidence_intervals.py against a naive
+per-player-season bootstrap loop on a synthetic population shaped like the
+real data (~2,164 players x 21 seasons, heavy-tailed attempt counts).
+
+The looped bootstrap is timed on a subset and extrapolated, since running it
+over every player-season takes minutes.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from confidence_intervals import DEFAULT_RESAMPLES, bootstrap_interval, wilson_interval
+
+def synthetic_player_seasons(count, seed=0):
+    """Made/attempted 3PT counts with a long tail of low-volume seasons."""
+    rng = np.random.default_rng(seed)
+    attempts = np.minimum(rng.geometric(1 / 120, count), 900)
+    skill = np.clip(rng.normal(0.35, 0.04, count), 0.05, 0.6)
+    made = rng.binomial(attempts, skill)
+    return made, attempts
+
+def looped_bootstrap(made, attempts, resamples=DEFAULT_RESAMPLES, seed=0):
+    """Textbook bootstrap: resample each player-season's shots in a Python loop."""
+    rng = np.random.default_rng(seed)
+    low = np.full(len(attempts), np.nan)
+    high = np.full(len(attempts), np.nan)
+    for i, (m, n) in enumerate(zip(made, attempts)):
+        if n == 0:
+            continue
+        shots = np.zeros(n)
+        shots[:m] = 1
+        means = rng.choice(shots, size=(resamples, n), replace=True).mean(axis=1)
+        low[i], high[i] = np.percentile(means, [2.5, 97.5])
+    return low, high
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def main():
+    """Run the benchmark and print a timing table."""
+    parser = argparse.ArgumentParser(description="Benchmark batched vs looped confidence intervals")
+    parser.add_argument('--player-seasons', type=int, default=2164 * 21)
+    parser.add_argument('--resamples', type=int, default=DEFAULT_RESAMPLES)
+    parser.add_argument('--loop-subset', type=int, default=1000,
+                        help="Player-seasons timed for the looped bootstrap (result is extrapolated)")
+    args = parser.parse_args()
+
+    made, attempts = synthetic_player_seasons(args.player_seasons)
+    subset = min(args.loop_subset, len(attempts))
+    print(f"📊 {len(attempts):,} player-seasons, {args.resamples:,} resamples")
+
+    wilson_time, (wilson_low, wilson_high) = timed(wilson_interval, made, attempts)
+    batched_time, (boot_low, boot_high) = timed(bootstrap_interval, made, attempts, resamples=args.resamples)
+    loop_time, (loop_low, loop_high) = timed(looped_bootstrap, made[:subset], attempts[:subset], args.resamples)
+    loop_estimate = loop_time * len(attempts) / subset
+
+    print(f"   {'Wilson (vectorized)':<28} {wilson_time:9.3f}s")
+    print(f"   {'Bootstrap (batched)':<28} {batched_time:9.3f}s")
+    print(f"   {'Bootstrap (looped, est.)':<28} {loop_estimate:9.3f}s  ({loop_time:.2f}s for {subset:,})")
+    print(f"   Batched speedup over loop: {loop_estimate / batched_time:,.0f}x")
+
+    # Both bootstraps estimate the same interval; Wilson should sit close to them
+    width = np.nanmean(boot_high[:subset] - boot_low[:subset]) * 100
+    print(f"\n   Mean bootstrap CI width: {width:.1f} pts")
+    print(f"   Mean |batched - looped| bound gap: "
+          f"{np.nanmean(np.abs(np.r_[boot_low[:subset] - loop_low, boot_high[:subset] - loop_high])) * 100:.2f} pts")
+    print(f"   Mean |Wilson - batched| bound gap: "
+          f"{np.nanmean(np.abs(np.r_[wilson_low - boot_low, wilson_high - boot_high])) * 100:.2f} pts")
+
+if __name__ == "__main__":
+    main()
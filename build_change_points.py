@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+NBA Three-Point Adoption Change-Point Builder
+Finds, for every franchise, where its 3PA rate (share of FGA that are threes)
+shifted to a new regime and by how much, at season and at game granularity,
+and writes the results to data/change_points/ for the explorer.
+
+Series come from the game-team fact table (build_game_facts.py), which is
+built from the shots when it has not been written yet. Every franchise is
+segmented at once by the batched binary segmentation in change_points.py.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from build_game_facts import FACTS_PATH, game_team_facts, load_game_facts
+from change_points import DEFAULT_MAX_CHANGES, DEFAULT_PENALTY, binary_segmentation, pad_series, segment_means
+from process_comprehensive_nba_data import normalize_team_name
+from process_data import load_all_seasons
+from publish import Publisher
+
+CHANGE_POINTS_DIR = 'data/change_points'
+
+# Fewest seasons/games a regime may span
+MIN_SEGMENT = {'season': 2, 'game': 10}
+
+def franchise_series(facts, granularity):
+    """3PA-rate series per franchise, sorted by franchise then time."""
+    facts = facts.assign(franchise=facts['team'].map(normalize_team_name))
+    if granularity == 'season':
+        series = facts.groupby(['franchise', 'season'], as_index=False)[['fga', 'three_pa']].sum()
+        series['three_pt_rate'] = series['three_pa'] / series['fga'] * 100
+        return series
+
+    series = facts[['franchise', 'season', 'game_date', 'game_id', 'fga', 'three_pa', 'three_pt_rate']]
+    order = np.lexsort((series['game_id'].to_numpy(), series['game_date'].to_numpy(), series['franchise'].to_numpy()))
+    return series.iloc[order].reset_index(drop=True)
+
+def detect_shifts(series, granularity, penalty=DEFAULT_PENALTY, max_changes=DEFAULT_MAX_CHANGES):
+    """Change points for every franchise in one batched segmentation."""
+    codes, franchises = pd.factorize(series['franchise'], sort=True)
+    matrix, lengths = pad_series(series['three_pt_rate'].to_numpy(), codes)
+    rows, positions, gains = binary_segmentation(matrix, lengths, penalty, max_changes, MIN_SEGMENT[granularity])
+    before, after = segment_means(matrix, lengths, rows, positions)
+
+    # Fact-table row of each change point (series rows are grouped by franchise)
+    first_rows = np.r_[0, np.cumsum(lengths)[:-1]]
+    change_rows = series.iloc[first_rows[rows] + positions]
+
+    labels = ['season'] if granularity == 'season' else ['season', 'game_date', 'game_id']
+    results = []
+    for code, franchise in enumerate(franchises):
+        mine = np.flatnonzero(rows == code)
+        changes = []
+        for i in mine:
+            change = {label: change_rows[label].iloc[i] for label in labels}
+            change['season'] = int(change['season'])
+            if 'game_id' in change:
+                change['game_id'] = int(change['game_id'])
+            change.update({
+                'before': round(float(before[i]), 1),
+                'after': round(float(after[i]), 1),
+                'shift': round(float(after[i] - before[i]), 1),
+                'score': round(float(gains[i]), 1)
+            })
+            changes.append(change)
+        results.append({
+            'team': franchise,
+            'points': int(lengths[code]),
+            'changes': changes,
+            # The split with the largest cost reduction is the main regime change
+            'primary': max(changes, key=lambda c: c['score']) if changes else None
+        })
+    return results
+
+def save_change_points(results_by_granularity, penalty, max_changes):
+    """Write one file per granularity."""
+    publisher = Publisher()
+    for granularity, results in results_by_granularity.items():
+        artifact = {
+            'granularity': granularity,
+            'metric': 'three_pt_rate',
+            'penalty': penalty,
+            'max_changes': max_changes,
+            'min_segment': MIN_SEGMENT[granularity],
+            'teams': results
+        }
+        publisher.add_json(os.path.join(CHANGE_POINTS_DIR, f'{granularity}.json'), artifact, indent=2, default=str)
+    publisher.publish()
+
+def main():
+    """Main change-point build function."""
+    parser = argparse.ArgumentParser(description="Find where each franchise's 3PA rate changed regime")
+    parser.add_argument('--granularity', nargs='+', choices=list(MIN_SEGMENT), default=list(MIN_SEGMENT),
+                        help='Series resolution(s) to segment')
+    parser.add_argument('--penalty', type=float, default=DEFAULT_PENALTY,
+                        help='Split penalty in multiples of sigma^2 * log(n)')
+    parser.add_argument('--max-changes', type=int, default=DEFAULT_MAX_CHANGES,
+                        help='Most change points kept per franchise')
+    args = parser.parse_args()
+
+    if os.path.exists(FACTS_PATH):
+        print(f"📂 Reading game facts from {FACTS_PATH}")
+        facts = load_game_facts()
+    else:
+        facts = game_team_facts(load_all_seasons())
+
+    results = {}
+    for granularity in args.granularity:
+        print(f"📐 Detecting {granularity}-level 3PA-rate shifts...")
+        series = franchise_series(facts, granularity)
+        results[granularity] = detect_shifts(series, granularity, args.penalty, args.max_changes)
+
+        shifted = [r for r in results[granularity] if r['primary']]
+        print(f"   {len(shifted)}/{len(results[granularity])} franchises shifted")
+        for record in sorted(shifted, key=lambda r: -r['primary']['shift'])[:5]:
+            primary = record['primary']
+            when = primary.get('game_date', primary['season'])
+            print(f"   {record['team']:<25} {when}: {primary['before']:.1f}% → {primary['after']:.1f}%")
+
+    save_change_points(results, args.penalty, args.max_changes)
+    print(f"✅ Change points saved to {CHANGE_POINTS_DIR}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+NBA Efficiency Surface Builder
+Smoothed points-per-shot court surfaces for the league and every team in every
+season, plus per-zone points per shot, written to data/efficiency/
+
+All season x team grids come out of one bincount and are smoothed together in
+one batched FFT convolution (see efficiency_surfaces.py). League surfaces are
+the sum of the team grids, so they need no second pass over the shots.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from efficiency_surfaces import (
+    DEFAULT_SIGMA, GRID_SHAPE, X_RANGE, Y_RANGE, ZONES,
+    ShotGrids, points_per_shot_surface, zone_points_per_shot
+)
+from process_comprehensive_nba_data import normalize_team_name
+from process_data import load_all_seasons
+from process_enhanced_nba_data import NBA_CONFERENCES
+from publish import Publisher
+
+EFFICIENCY_DIR = 'data/efficiency'
+
+TEAMS = sorted(team for divisions in NBA_CONFERENCES.values() for teams in divisions.values() for team in teams)
+
+# Surface cells are stored as integer hundredths of a point (112 = 1.12 PPS)
+SCALE = 100
+
+def compact_grid(surface):
+    """Row-major integer hundredths with null for masked cells."""
+    values = np.round(surface * SCALE)
+    return [None if np.isnan(v) else int(v) for v in values.ravel()]
+
+def _rounded(values):
+    return [None if np.isnan(v) else round(float(v), 3) for v in values]
+
+def grid_metadata(sigma, min_attempts):
+    """How to turn a compact grid back into court coordinates."""
+    return {
+        'rows': GRID_SHAPE[0], 'cols': GRID_SHAPE[1], 'cell_feet': 1,
+        'x_range': list(X_RANGE), 'y_range': list(Y_RANGE),
+        'scale': SCALE, 'sigma_feet': sigma, 'min_smoothed_attempts': min_attempts
+    }
+
+def build_surfaces(grids, sigma=DEFAULT_SIGMA, min_attempts=1.0):
+    """League, team and zone artifacts from accumulated grids."""
+    attempts, points, zone_attempts, zone_points = grids.arrays()
+
+    # Teams and the league total in one batch: (seasons, teams + 1, rows, cols)
+    batch_attempts = np.concatenate([attempts, attempts.sum(axis=1, keepdims=True)], axis=1)
+    batch_points = np.concatenate([points, points.sum(axis=1, keepdims=True)], axis=1)
+    surfaces = points_per_shot_surface(batch_attempts, batch_points, sigma, min_attempts)
+
+    team_pps = zone_points_per_shot(zone_attempts, zone_points)
+    league_pps = zone_points_per_shot(zone_attempts.sum(axis=1), zone_points.sum(axis=1))
+
+    metadata = grid_metadata(sigma, min_attempts)
+    league = {'grid': metadata, 'seasons': {}}
+    team_files = {}
+    zones = {'zones': ZONES, 'seasons': {}}
+    for i, season in enumerate(grids.seasons):
+        league['seasons'][str(season)] = {
+            'shots': int(attempts[i].sum()),
+            'points_per_shot': compact_grid(surfaces[i, -1])
+        }
+        season_teams = {}
+        zones['seasons'][str(season)] = {
+            'league': {'attempts': zone_attempts[i].sum(axis=0).astype(int).tolist(),
+                       'points_per_shot': _rounded(league_pps[i])},
+            'teams': {}
+        }
+        for j, team in enumerate(grids.teams):
+            if not attempts[i, j].any():
+                continue
+            season_teams[team] = {
+                'shots': int(attempts[i, j].sum()),
+                'points_per_shot': compact_grid(surfaces[i, j])
+            }
+            zones['seasons'][str(season)]['teams'][team] = {
+                'attempts': zone_attempts[i, j].astype(int).tolist(),
+                'points_per_shot': _rounded(team_pps[i, j])
+            }
+        team_files[f'teams/{season}.json'] = {'grid': metadata, 'season': season, 'teams': season_teams}
+
+    return league, team_files, zones
+
+def save_surfaces(league, team_files, zones, output_dir=EFFICIENCY_DIR):
+    """Write league surfaces, one team-surface file per season and the zone table."""
+    publisher = Publisher()
+    publisher.add_json(os.path.join(output_dir, 'league_surfaces.json'), league, separators=(',', ':'))
+    for path, surfaces in team_files.items():
+        publisher.add_json(os.path.join(output_dir, path), surfaces, separators=(',', ':'))
+    publisher.add_json(os.path.join(output_dir, 'zone_points_per_shot.json'), zones, indent=2)
+    publisher.publish()
+
+def main():
+    """Main efficiency surface build function."""
+    parser = argparse.ArgumentParser(description="Build smoothed points-per-shot surfaces per season and team")
+    parser.add_argument('--sigma', type=float, default=DEFAULT_SIGMA, help='Gaussian smoothing radius in feet')
+    parser.add_argument('--min-attempts', type=float, default=1.0,
+                        help='Smoothed attempts a cell needs to get a value')
+    args = parser.parse_args()
+
+    df = load_all_seasons()
+
+    print("🔥 Building efficiency surfaces...")
+    grids = ShotGrids(TEAMS).add(df, df['TEAM_NAME'].map(normalize_team_name))
+    print(f"   {len(grids.seasons)} seasons x {len(grids.teams)} teams x "
+          f"{GRID_SHAPE[0]}x{GRID_SHAPE[1]} ft grids")
+
+    league, team_files, zones = build_surfaces(grids, args.sigma, args.min_attempts)
+    save_surfaces(league, team_files, zones)
+
+    print(f"✅ Efficiency surfaces saved to {EFFICIENCY_DIR}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+NBA Game Fact Table Builder
+One row per game-team (attempts, makes, 3PA/3PM, zone mix, home/away) plus a
+date index and per-game team 3PT-rate distributions, written to data/games/
+
+Shots are put in date/game/team order with a single sort; every fact column is
+then a segmented reduction (np.add.reduceat) over the game-team runs. The table
+is stored sorted by date, and date_index.json maps each date to its first row
+and that row's byte offset in game_facts.csv, so a date range like "all games
+in Dec 2015" is two binary searches, one seek and one contiguous read.
+"""
+
+import argparse
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from parse_cache import parse_game_dates
+from process_data import load_all_seasons
+from publish import Publisher
+
+GAMES_DIR = 'data/games'
+FACTS_PATH = os.path.join(GAMES_DIR, 'game_facts.csv')
+DATE_INDEX_PATH = os.path.join(GAMES_DIR, 'date_index.json')
+VARIANCE_PATH = os.path.join(GAMES_DIR, 'team_game_variance.json')
+
+# BASIC_ZONE values and their fact-table column names
+ZONE_COLUMNS = {
+    'Restricted Area': 'restricted_area_shots',
+    'In The Paint (Non-RA)': 'paint_non_ra_shots',
+    'Mid-Range': 'mid_range_shots',
+    'Left Corner 3': 'left_corner_3_shots',
+    'Right Corner 3': 'right_corner_3_shots',
+    'Above the Break 3': 'above_break_3_shots',
+    'Backcourt': 'backcourt_shots'
+}
+
+def team_abbreviations(teams, seasons, home, away):
+    """Map each team-season to the abbreviation that appears in all of its games.
+
+    Takes one entry per game-team; a team is in every one of its own games, so
+    its abbreviation is the most frequent HOME_TEAM/AWAY_TEAM value.
+    """
+    candidates = pd.DataFrame({
+        'team': np.concatenate([teams, teams]),
+        'season': np.concatenate([seasons, seasons]),
+        'abbreviation': np.concatenate([home, away])
+    })
+    counts = candidates.value_counts(sort=False).reset_index(name='games')
+    counts = counts.sort_values(['team', 'season', 'games'], ascending=[True, True, False], kind='stable')
+    best = counts.drop_duplicates(['team', 'season'])
+    return best.set_index(['team', 'season'])['abbreviation']
+
+def game_team_facts(df):
+    """Build the game-team fact table with one sort and segmented reductions."""
+    df = df.dropna(subset=['TEAM_NAME', 'GAME_ID'])
+    dates = parse_game_dates(df['GAME_DATE'].to_numpy()).to_numpy()
+    team_codes, team_names = pd.factorize(df['TEAM_NAME'])
+    game_ids = df['GAME_ID'].to_numpy()
+
+    order = np.lexsort((team_codes, game_ids, dates))
+    sorted_games = game_ids[order]
+    sorted_teams = team_codes[order]
+    starts = np.flatnonzero(np.r_[True, (sorted_games[1:] != sorted_games[:-1]) |
+                                        (sorted_teams[1:] != sorted_teams[:-1])])
+
+    made = (df['SHOT_MADE'] == True).to_numpy()[order]
+    three = (df['SHOT_TYPE'] == '3PT Field Goal').to_numpy()[order]
+    zones = pd.Categorical(df['BASIC_ZONE'], categories=list(ZONE_COLUMNS)).codes[order]
+
+    def segment_sum(values):
+        return np.add.reduceat(values.astype(np.int64), starts)
+
+    first = order[starts]
+    facts = pd.DataFrame({
+        'game_date': pd.to_datetime(dates[first]).strftime('%Y-%m-%d'),
+        'game_id': game_ids[first],
+        'season': df['SEASON_1'].to_numpy()[first],
+        'team': team_names[team_codes[first]],
+        'fga': np.diff(np.r_[starts, len(order)]),
+        'fgm': segment_sum(made),
+        'three_pa': segment_sum(three),
+        'three_pm': segment_sum(three & made)
+    })
+    facts['two_pa'] = facts['fga'] - facts['three_pa']
+    facts['two_pm'] = facts['fgm'] - facts['three_pm']
+    for code, column in enumerate(ZONE_COLUMNS.values()):
+        facts[column] = segment_sum(zones == code)
+
+    # Home/away from the team's own abbreviation in HOME_TEAM/AWAY_TEAM
+    home = df['HOME_TEAM'].to_numpy()[first]
+    away = df['AWAY_TEAM'].to_numpy()[first]
+    abbreviations = team_abbreviations(facts['team'].to_numpy(), facts['season'].to_numpy(), home, away)
+    facts['team_abbreviation'] = abbreviations.reindex(
+        pd.MultiIndex.from_arrays([facts['team'], facts['season']])
+    ).to_numpy()
+    facts['home'] = home == facts['team_abbreviation'].to_numpy()
+    facts['opponent'] = np.where(facts['home'], away, home)
+    unmatched = int((~facts['home'] & (away != facts['team_abbreviation'].to_numpy())).sum())
+    if unmatched:
+        print(f"   ⚠️  {unmatched:,} game-team rows whose team is neither HOME_TEAM nor AWAY_TEAM")
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fga = facts['fga'].to_numpy()
+        facts['three_pt_rate'] = np.round(facts['three_pa'] / fga * 100, 1)
+        facts['fg_percentage'] = np.round(facts['fgm'] / fga * 100, 1)
+        facts['efg_percentage'] = np.round((facts['fgm'] + 0.5 * facts['three_pm']) / fga * 100, 1)
+
+    column_order = ['game_date', 'game_id', 'season', 'team', 'team_abbreviation', 'home', 'opponent',
+                    'fga', 'fgm', 'three_pa', 'three_pm', 'two_pa', 'two_pm',
+                    *ZONE_COLUMNS.values(), 'three_pt_rate', 'fg_percentage', 'efg_percentage']
+    return facts[column_order]
+
+def facts_csv(facts):
+    """The fact table as CSV bytes, plus the byte offset where each row starts."""
+    data = facts.to_csv(index=False).encode('utf-8')
+    # No field holds a newline, so every newline ends a line; the last one ends the file
+    line_ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord('\n')) + 1
+    return data, line_ends[:-1]
+
+def build_date_index(facts, row_offsets, size):
+    """First fact-table row of every date (the table is sorted by date) and the byte it starts at."""
+    dates, offsets = np.unique(facts['game_date'].to_numpy(), return_index=True)
+    return {
+        'rows': int(len(facts)),
+        'bytes': int(size),
+        'dates': dates.tolist(),
+        'offsets': offsets.astype(int).tolist(),
+        'byte_offsets': np.asarray(row_offsets)[offsets].astype(int).tolist()
+    }
+
+def date_range_bytes(date_index, start, end):
+    """Half-open byte range [lo, hi) of game_facts.csv holding the games dated start..end (inclusive, YYYY-MM-DD)."""
+    dates = np.asarray(date_index['dates'])
+    offsets = np.r_[date_index['byte_offsets'], date_index['bytes']]
+    lo = offsets[np.searchsorted(dates, start, side='left')]
+    hi = offsets[np.searchsorted(dates, end, side='right')]
+    return int(lo), int(hi)
+
+def load_game_facts(start=None, end=None, games_dir=GAMES_DIR):
+    """Read the fact table, or only the rows dated start..end when a range is given."""
+    facts_path = os.path.join(games_dir, 'game_facts.csv')
+    if start is None and end is None:
+        return pd.read_csv(facts_path)
+
+    with open(os.path.join(games_dir, 'date_index.json'), 'r') as f:
+        date_index = json.load(f)
+    lo, hi = date_range_bytes(date_index, start or '0000-00-00', end or '9999-99-99')
+
+    # Parse the header plus the one contiguous block of rows in range
+    with open(facts_path, 'rb') as f:
+        header = f.readline()
+        f.seek(lo)
+        rows = f.read(hi - lo)
+    return pd.read_csv(io.BytesIO(header + rows))
+
+def team_game_variance(facts):
+    """Distribution of each team-season's per-game 3PT rate."""
+    grouped = facts.groupby(['season', 'team'])['three_pt_rate']
+    summary = grouped.agg(['count', 'mean', 'std', 'var', 'min', 'max'])
+    quantiles = grouped.quantile([0.1, 0.5, 0.9]).unstack()
+    summary['p10'], summary['median'], summary['p90'] = quantiles[0.1], quantiles[0.5], quantiles[0.9]
+
+    summary = summary.rename(columns={'count': 'games', 'std': 'std_dev', 'var': 'variance'}).round(2)
+    summary = summary.reset_index()
+    summary['season'] = summary['season'].astype(int)
+    summary['games'] = summary['games'].astype(int)
+    return summary.astype(object).where(summary.notna(), None).to_dict('records')
+
+def save_game_facts(facts):
+    """Write the fact table, its date index and the per-game variance view."""
+    data, row_offsets = facts_csv(facts)
+    publisher = Publisher()
+    publisher.add_bytes(FACTS_PATH, data)
+    publisher.add_json(DATE_INDEX_PATH, build_date_index(facts, row_offsets, len(data)), separators=(',', ':'))
+    publisher.add_json(VARIANCE_PATH, team_game_variance(facts), indent=2)
+    publisher.publish()
+
+def main():
+    """Main game fact table build function."""
+    parser = argparse.ArgumentParser(description="Build the game-team fact table")
+    parser.add_argument('--query', nargs=2, metavar=('START', 'END'),
+                        help='Only query an existing table for games dated START..END (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    if args.query:
+        games = load_game_facts(*args.query)
+        print(f"🔎 {len(games):,} game-team rows ({games['game_id'].nunique():,} games) "
+              f"from {args.query[0]} to {args.query[1]}")
+        if len(games):
+            print(f"   Mean 3PT rate: {games['three_pt_rate'].mean():.1f}% "
+                  f"(std {games['three_pt_rate'].std():.1f})")
+        return
+
+    df = load_all_seasons()
+
+    print("🗓️ Building game fact table...")
+    facts = game_team_facts(df)
+    print(f"   {len(facts):,} game-team rows, {facts['game_id'].nunique():,} games, "
+          f"{facts['game_date'].nunique():,} dates")
+
+    save_game_facts(facts)
+    print(f"✅ Game facts saved to {GAMES_DIR}/")
+
+if __name__ == "__main__":
+    main()
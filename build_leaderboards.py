@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+NBA Leaderboard Builder
+Ranks every player on any shooting metric over a season window and writes one
+compact top-K artifact per metric to data/leaderboards/
+
+Percentage metrics carry a 95% interval for each listed player (Wilson for
+proportions, bootstrap for eFG%) in the ci_low/ci_high columns
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from confidence_intervals import efg_bootstrap_interval, wilson_interval
+from process_data import load_all_seasons
+from publish import Publisher
+
+LEADERBOARD_DIR = 'data/leaderboards'
+
+def _percentage(numerator, denominator):
+    """Element-wise percentage that yields NaN instead of dividing by zero."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator * 100, np.nan)
+
+def _wilson(successes, trials):
+    """Interval function for a proportion of two window-total columns."""
+    return lambda t: wilson_interval(t[successes].to_numpy(), t[trials].to_numpy())
+
+# Metric definitions: how to compute the value from window totals, which
+# counting column qualifies a player and the default minimum for that column.
+# Percentage metrics also say how to compute their interval (as fractions).
+METRICS = {
+    'three_pt_made': {
+        'value': lambda t: t['three_pm'].to_numpy(dtype=float),
+        'qualifier': 'three_pa',
+        'min_qualifier': 0
+    },
+    'three_pt_attempts': {
+        'value': lambda t: t['three_pa'].to_numpy(dtype=float),
+        'qualifier': 'three_pa',
+        'min_qualifier': 0
+    },
+    'three_pt_percentage': {
+        'value': lambda t: _percentage(t['three_pm'], t['three_pa']),
+        'qualifier': 'three_pa',
+        'min_qualifier': 100,
+        'interval': _wilson('three_pm', 'three_pa')
+    },
+    'three_pt_rate': {
+        'value': lambda t: _percentage(t['three_pa'], t['fga']),
+        'qualifier': 'fga',
+        'min_qualifier': 300,
+        'interval': _wilson('three_pa', 'fga')
+    },
+    'fg_percentage': {
+        'value': lambda t: _percentage(t['fgm'], t['fga']),
+        'qualifier': 'fga',
+        'min_qualifier': 300,
+        'interval': _wilson('fgm', 'fga')
+    },
+    'efg_percentage': {
+        'value': lambda t: _percentage(t['fgm'] + 0.5 * t['three_pm'], t['fga']),
+        'qualifier': 'fga',
+        'min_qualifier': 300,
+        'interval': lambda t: efg_bootstrap_interval(t['fgm'] - t['three_pm'], t['three_pm'], t['fga'])
+    }
+}
+
+def player_season_totals(df):
+    """Aggregate raw shots into one row of counting stats per player-season."""
+    df = df.dropna(subset=['PLAYER_NAME', 'SEASON_1'])
+    made = df['SHOT_MADE'] == True
+    is_three = df['SHOT_TYPE'] == '3PT Field Goal'
+
+    totals = pd.DataFrame({
+        'player': df['PLAYER_NAME'],
+        'season': df['SEASON_1'].astype(int),
+        'fga': np.ones(len(df), dtype=np.int64),
+        'fgm': made.astype(np.int64),
+        'three_pa': is_three.astype(np.int64),
+        'three_pm': (is_three & made).astype(np.int64)
+    })
+
+    return totals.groupby(['player', 'season'], sort=True).sum().reset_index()
+
+def window_totals(totals, start=None, end=None):
+    """Sum player-season totals over an inclusive season window (None = open ended)."""
+    mask = np.ones(len(totals), dtype=bool)
+    if start is not None:
+        mask &= totals['season'].to_numpy() >= start
+    if end is not None:
+        mask &= totals['season'].to_numpy() <= end
+
+    window = totals[mask]
+    summed = window.drop(columns='season').groupby('player', sort=True).sum()
+    summed['seasons'] = window.groupby('player', sort=True)['season'].nunique()
+    return summed.reset_index()
+
+def rank_population(values):
+    """Competition ranks (1 = best) and percentiles for every value at once."""
+    ascending = np.sort(values)
+    # Rank = 1 + number of strictly greater values
+    ranks = len(values) - np.searchsorted(ascending, values, side='right') + 1
+    # Percentile = share of the population at or below this value
+    percentiles = np.searchsorted(ascending, values, side='right') / max(len(values), 1) * 100
+    return ranks, percentiles
+
+def build_leaderboard(totals, metric, k=100, min_qualifier=None):
+    """Rank one window's population on a metric and keep the top K rows."""
+    definition = METRICS[metric]
+    if min_qualifier is None:
+        min_qualifier = definition['min_qualifier']
+
+    qualifier = totals[definition['qualifier']].to_numpy()
+    values = definition['value'](totals)
+    qualified = (qualifier >= min_qualifier) & ~np.isnan(values)
+
+    players = totals['player'].to_numpy()[qualified]
+    values = values[qualified]
+    qualifier = qualifier[qualified]
+    seasons = totals['seasons'].to_numpy()[qualified] if 'seasons' in totals else None
+
+    ranks, percentiles = rank_population(values)
+
+    # Select the top K without sorting the whole population, then order it
+    k = min(k, len(values))
+    if k < len(values):
+        top = np.argpartition(-values, k - 1)[:k]
+    else:
+        top = np.arange(len(values))
+    top = top[np.lexsort((players[top], -values[top]))]
+
+    columns = ['rank', 'player', 'value', 'percentile', definition['qualifier']]
+    if seasons is not None:
+        columns.append('seasons')
+
+    # Intervals only for the listed players, computed for all of them at once
+    interval = definition.get('interval')
+    if interval is not None:
+        columns += ['ci_low', 'ci_high']
+        low, high = interval(totals.iloc[np.flatnonzero(qualified)[top]])
+
+    rows = []
+    for position, i in enumerate(top):
+        row = [int(ranks[i]), players[i], round(float(values[i]), 1),
+               round(float(percentiles[i]), 1), int(qualifier[i])]
+        if seasons is not None:
+            row.append(int(seasons[i]))
+        if interval is not None:
+            row += [round(float(low[position]) * 100, 1), round(float(high[position]) * 100, 1)]
+        rows.append(row)
+
+    return {
+        'population': int(len(totals)),
+        'qualified': int(len(values)),
+        'min_qualifier': int(min_qualifier),
+        'columns': columns,
+        'rows': rows
+    }
+
+def build_metric_artifact(totals, metric, k=100, min_qualifier=None, ranges=()):
+    """Build every season, range and career leaderboard for one metric."""
+    windows = {'career': build_leaderboard(window_totals(totals), metric, k, min_qualifier)}
+
+    for start, end in ranges:
+        windows[f"{start}-{end}"] = build_leaderboard(
+            window_totals(totals, start, end), metric, k, min_qualifier
+        )
+
+    for season in sorted(totals['season'].unique()):
+        season_totals = totals[totals['season'] == season].reset_index(drop=True)
+        windows[str(int(season))] = build_leaderboard(season_totals, metric, k, min_qualifier)
+
+    return {
+        'metric': metric,
+        'qualifier': METRICS[metric]['qualifier'],
+        'k': k,
+        'windows': windows
+    }
+
+def save_leaderboards(artifacts, output_dir=LEADERBOARD_DIR):
+    """Write one compact JSON file per metric."""
+    publisher = Publisher()
+    for metric, artifact in artifacts.items():
+        publisher.add_json(os.path.join(output_dir, f'{metric}.json'), artifact, separators=(',', ':'))
+    publisher.publish()
+
+def parse_range(value):
+    """Parse a 'START-END' season range argument."""
+    start, end = value.split('-')
+    return int(start), int(end)
+
+def main():
+    """Main leaderboard build function."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--metrics', nargs='+', choices=sorted(METRICS), default=sorted(METRICS),
+                        help='Metrics to rank (default: all)')
+    parser.add_argument('--top-k', type=int, default=100, help='Rows kept per leaderboard')
+    parser.add_argument('--min-attempts', type=int, default=None,
+                        help="Override every metric's minimum qualifier")
+    parser.add_argument('--range', dest='ranges', type=parse_range, action='append', default=[],
+                        help='Extra season window, e.g. 2015-2024 (repeatable)')
+    args = parser.parse_args()
+
+    df = load_all_seasons()
+
+    print("🏆 Building leaderboards...")
+    totals = player_season_totals(df)
+    print(f"   {totals['player'].nunique():,} players, {len(totals):,} player-seasons")
+
+    artifacts = {
+        metric: build_metric_artifact(totals, metric, args.top_k, args.min_attempts, args.ranges)
+        for metric in args.metrics
+    }
+    save_leaderboards(artifacts)
+
+    for metric, artifact in artifacts.items():
+        career = artifact['windows']['career']
+        leader = career['rows'][0] if career['rows'] else None
+        leader_text = f"{leader[1]} ({leader[2]})" if leader else 'no qualified players'
+        print(f"   {metric:<22} career leader: {leader_text}")
+
+    print(f"✅ Leaderboards saved to {LEADERBOARD_DIR}/")
+
+if __name__ == "__main__":
+    main()
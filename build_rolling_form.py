@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+NBA Rolling Form Builder
+Rolling 3PA, 3PM and 3P% over each qualified player's last N games, written as
+one compact file per player (for lazy loading) plus an index to
+data/rolling_form/
+
+Shots are reduced to one row per player-game and ordered by player, GAME_DATE
+and GAME_ID. Every window is then a difference of cumulative sums clipped to the
+player's segment start, computed for all players at once. Windows roll across
+season boundaries; the first N-1 games of a career cover fewer than N games.
+"""
+
+import argparse
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from parse_cache import parse_game_dates
+from process_data import load_all_seasons
+from publish import Publisher
+
+ROLLING_DIR = 'data/rolling_form'
+DEFAULT_WINDOWS = [5, 10, 20]
+
+def player_game_totals(df):
+    """One row per player-game with 3PA/3PM, ordered by player, date and game."""
+    is_three = df['SHOT_TYPE'] == '3PT Field Goal'
+    shots = pd.DataFrame({
+        'player': df['PLAYER_NAME'],
+        'game_id': df['GAME_ID'],
+        'date': parse_game_dates(df['GAME_DATE'].to_numpy()).to_numpy(),
+        'season': df['SEASON_1'],
+        'three_pa': is_three.astype(np.int64),
+        'three_pm': (is_three & (df['SHOT_MADE'] == True)).astype(np.int64)
+    }).dropna(subset=['player'])
+
+    games = shots.groupby(['player', 'game_id'], sort=False).agg(
+        date=('date', 'min'), season=('season', 'first'),
+        three_pa=('three_pa', 'sum'), three_pm=('three_pm', 'sum')
+    ).reset_index()
+
+    order = np.lexsort((games['game_id'].to_numpy(), games['date'].to_numpy(), games['player'].to_numpy()))
+    return games.iloc[order].reset_index(drop=True)
+
+def segment_starts(keys):
+    """Start index of each run of equal sorted keys, and each row's run start."""
+    keys = np.asarray(keys)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    lengths = np.diff(np.r_[starts, len(keys)])
+    return starts, np.repeat(starts, lengths)
+
+def rolling_sums(values, row_starts, window):
+    """Trailing-window sums that never reach back past a row's segment start."""
+    cumulative = np.r_[0, np.cumsum(values)]
+    end = np.arange(1, len(values) + 1)
+    begin = np.maximum(end - window, row_starts)
+    return cumulative[end] - cumulative[begin]
+
+def rolling_form(games, windows):
+    """Rolling 3PA, 3PM and 3P% for every window, for every player at once."""
+    _, row_starts = segment_starts(games['player'].to_numpy())
+    three_pa = games['three_pa'].to_numpy()
+    three_pm = games['three_pm'].to_numpy()
+
+    form = {}
+    for window in windows:
+        attempts = rolling_sums(three_pa, row_starts, window)
+        made = rolling_sums(three_pm, row_starts, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percentage = np.where(attempts > 0, made / attempts * 100, np.nan)
+        form[window] = (attempts, made, percentage)
+    return form
+
+def player_slug(name, used):
+    """File-safe, unique slug for a player name."""
+    base = re.sub(r'[^a-z0-9]+', '-', str(name).lower()).strip('-') or 'player'
+    slug, suffix = base, 2
+    while slug in used:
+        slug, suffix = f'{base}-{suffix}', suffix + 1
+    used.add(slug)
+    return slug
+
+def _percentages(values):
+    """Rounded percentages with NaN as null."""
+    return [None if np.isnan(v) else round(float(v), 1) for v in values]
+
+def build_artifacts(games, windows, min_attempts):
+    """Per-player series for qualified players and the index that lists them."""
+    starts, _ = segment_starts(games['player'].to_numpy())
+    ends = np.r_[starts[1:], len(games)]
+    career_attempts = np.add.reduceat(games['three_pa'].to_numpy(), starts) if len(games) else np.array([])
+    form = rolling_form(games, windows)
+
+    dates = games['date'].dt.strftime('%Y-%m-%d').to_numpy()
+    players = games['player'].to_numpy()
+    used_slugs = set()
+    index, files = [], {}
+
+    qualified = np.flatnonzero(career_attempts >= min_attempts)
+    # Index in descending career volume so the explorer can list the top shooters first
+    qualified = qualified[np.lexsort((players[starts[qualified]], -career_attempts[qualified]))]
+
+    for segment in qualified:
+        start, end = starts[segment], ends[segment]
+        name = players[start]
+        slug = player_slug(name, used_slugs)
+
+        series = {
+            'player': name,
+            'windows': list(windows),
+            'dates': dates[start:end].tolist(),
+            'game_ids': games['game_id'].to_numpy()[start:end].astype(int).tolist(),
+            'seasons': games['season'].to_numpy()[start:end].astype(int).tolist(),
+            'three_pa': {}, 'three_pm': {}, 'three_pt_percentage': {}
+        }
+        for window, (attempts, made, percentage) in form.items():
+            series['three_pa'][str(window)] = attempts[start:end].astype(int).tolist()
+            series['three_pm'][str(window)] = made[start:end].astype(int).tolist()
+            series['three_pt_percentage'][str(window)] = _percentages(percentage[start:end])
+
+        path = f'players/{slug}.json'
+        files[path] = series
+        index.append({
+            'player': name,
+            'file': path,
+            'games': int(end - start),
+            'career_three_pa': int(career_attempts[segment]),
+            'career_three_pm': int(games['three_pm'].to_numpy()[start:end].sum())
+        })
+
+    return {'windows': list(windows), 'min_attempts': min_attempts, 'players': index}, files
+
+def save_rolling_form(index, files, output_dir=ROLLING_DIR):
+    """Write the index and one compact JSON file per player."""
+    publisher = Publisher()
+    publisher.add_json(os.path.join(output_dir, 'index.json'), index, separators=(',', ':'))
+    for path, series in files.items():
+        publisher.add_json(os.path.join(output_dir, path), series, separators=(',', ':'))
+    publisher.publish()
+
+def main():
+    """Main rolling form build function."""
+    parser = argparse.ArgumentParser(description="Build rolling 3PT form series per player")
+    parser.add_argument('--windows', type=int, nargs='+', default=DEFAULT_WINDOWS,
+                        help='Rolling window sizes in games')
+    parser.add_argument('--min-attempts', type=int, default=250,
+                        help='Career 3PA needed for a player to get a series')
+    args = parser.parse_args()
+
+    windows = sorted(set(args.windows))
+    df = load_all_seasons()
+
+    print("📈 Building rolling form series...")
+    games = player_game_totals(df)
+    print(f"   {len(games):,} player-games")
+
+    index, files = build_artifacts(games, windows, args.min_attempts)
+    save_rolling_form(index, files)
+
+    print(f"✅ Rolling form for {len(files):,} players ({', '.join(map(str, windows))}-game windows) "
+          f"saved to {ROLLING_DIR}/")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+NBA Shot-Profile Similarity Builder
+Finds the player-seasons whose shot profile is most like each other one
+("which seasons looked most like 2016 Curry?") and writes the top-K lists to
+data/similarity/shot_profiles.json for the explorer.
+
+A profile concatenates the player-season's BASIC_ZONE, ZONE_RANGE and
+ACTION_TYPE (most common types plus "other") frequency distributions, each
+normalized to sum to one so the three blocks weigh equally. Neighbours are
+exact cosine top-K from blocked matrix multiplication.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from process_data import load_all_seasons
+from publish import Publisher
+
+SIMILARITY_PATH = 'data/similarity/shot_profiles.json'
+PROFILE_COLUMNS = ['BASIC_ZONE', 'ZONE_RANGE', 'ACTION_TYPE']
+OTHER_ACTION = 'Other'
+
+# Query rows per matrix multiplication block
+BLOCK_ROWS = 2048
+
+def profile_vectors(df, min_shots=200, top_actions=30):
+    """Unit-length shot-profile vectors for every player-season with enough shots."""
+    df = df.dropna(subset=['PLAYER_NAME'])
+    keys = pd.MultiIndex.from_arrays([df['PLAYER_NAME'], df['SEASON_1'].astype(int)])
+    rows, row_keys = pd.factorize(keys, sort=True)
+    shots = np.bincount(rows, minlength=len(row_keys))
+
+    # Rare action types share one "other" feature
+    actions = df['ACTION_TYPE'].fillna(OTHER_ACTION)
+    common = actions.value_counts().index[:top_actions]
+    actions = actions.where(actions.isin(common), OTHER_ACTION)
+
+    blocks, features = [], []
+    for column, values in zip(PROFILE_COLUMNS, [df['BASIC_ZONE'], df['ZONE_RANGE'], actions]):
+        codes, categories = pd.factorize(values.fillna('Unknown'), sort=True)
+        counts = np.bincount(rows * len(categories) + codes, minlength=len(row_keys) * len(categories))
+        counts = counts.reshape(len(row_keys), len(categories)).astype(float)
+        blocks.append(counts / np.maximum(counts.sum(axis=1, keepdims=True), 1))
+        features.extend(f'{column}:{category}' for category in categories)
+
+    vectors = np.hstack(blocks)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    keep = shots >= min_shots
+    return vectors[keep], row_keys[keep], shots[keep], features
+
+def cosine_top_k(vectors, k=10, block_rows=BLOCK_ROWS):
+    """Exact top-K cosine neighbours (excluding self) for every row, one row block at a time."""
+    count = len(vectors)
+    k = min(k, count - 1)
+    neighbors = np.empty((count, max(k, 0)), dtype=np.int64)
+    scores = np.empty((count, max(k, 0)))
+    if k <= 0:
+        return neighbors, scores
+
+    for start in range(0, count, block_rows):
+        stop = min(start + block_rows, count)
+        similarity = vectors[start:stop] @ vectors.T
+        similarity[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        neighbors[start:stop] = np.take_along_axis(top, order, axis=1)
+        scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+
+    return neighbors, scores
+
+def build_artifact(vectors, keys, shots, features, k=10):
+    """Compact explorer artifact: one entry per player-season with its neighbour list."""
+    neighbors, scores = cosine_top_k(vectors, k)
+    return {
+        'k': int(neighbors.shape[1]),
+        'features': features,
+        'columns': ['player', 'season', 'shots', 'neighbors', 'similarity'],
+        'rows': [
+            [player, int(season), int(count), neighbors[i].tolist(), np.round(scores[i], 4).tolist()]
+            for i, ((player, season), count) in enumerate(zip(keys, shots))
+        ]
+    }
+
+def similar_seasons(artifact, player, season):
+    """Neighbour (player, season, similarity) tuples for one player-season."""
+    rows = artifact['rows']
+    for row in rows:
+        if row[0] == player and row[1] == season:
+            return [(rows[i][0], rows[i][1], score) for i, score in zip(row[3], row[4])]
+    return None
+
+def main():
+    """Main similarity build function."""
+    parser = argparse.ArgumentParser(description="Build shot-profile nearest neighbours for every player-season")
+    parser.add_argument('--top-k', type=int, default=10, help='Neighbours kept per player-season')
+    parser.add_argument('--min-shots', type=int, default=200, help='Shots needed for a player-season profile')
+    parser.add_argument('--top-actions', type=int, default=30,
+                        help='ACTION_TYPE values kept as features (the rest become "Other")')
+    parser.add_argument('--query', nargs=2, metavar=('PLAYER', 'SEASON'),
+                        help='Print neighbours of one player-season from the saved artifact')
+    args = parser.parse_args()
+
+    if args.query:
+        with open(SIMILARITY_PATH, 'r') as f:
+            artifact = json.load(f)
+        player, season = args.query[0], int(args.query[1])
+        matches = similar_seasons(artifact, player, season)
+        if matches is None:
+            print(f"❌ No profile for {player} {season}")
+            return
+        print(f"🎯 Shot profiles most like {player} {season}:")
+        for rank, (name, year, score) in enumerate(matches, 1):
+            print(f"   {rank:2d}. {name:<25} {year}  ({score:.3f})")
+        return
+
+    df = load_all_seasons()
+
+    print("🎯 Building shot-profile similarity index...")
+    vectors, keys, shots, features = profile_vectors(df, args.min_shots, args.top_actions)
+    print(f"   {len(keys):,} player-seasons x {len(features)} features")
+
+    artifact = build_artifact(vectors, keys, shots, features, args.top_k)
+    publisher = Publisher()
+    publisher.add_json(SIMILARITY_PATH, artifact, separators=(',', ':'))
+    publisher.publish()
+
+    print(f"✅ Top-{artifact['k']} neighbours saved to {os.path.dirname(SIMILARITY_PATH)}/")
+
+if __name__ == "__main__":
+    main()
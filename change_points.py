@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Batched Change-Point Detection
+Binary segmentation for shifts in the mean of many series at once (e.g. every
+franchise's 3PA rate by season or by game).
+
+Series are packed into one NaN-padded matrix. Each round scores every split of
+every open segment from cumulative sums in a single array operation and keeps
+the best split of each segment whose cost reduction beats a BIC-style penalty,
+so the work per round is O(segments x length) numpy with no per-series loop.
+"""
+
+import warnings
+
+import numpy as np
+
+DEFAULT_PENALTY = 2.0  # Multiples of sigma^2 * log(n); 2 is the BIC for one mean change
+DEFAULT_MAX_CHANGES = 3
+
+def pad_series(values, series_codes):
+    """Pack values (grouped by series code, each group in time order) into a NaN-padded matrix."""
+    series_codes = np.asarray(series_codes)
+    lengths = np.bincount(series_codes)
+    starts = np.r_[0, np.cumsum(lengths)[:-1]]
+    order = np.argsort(series_codes, kind='stable')
+    positions = np.arange(len(order)) - np.repeat(starts, lengths)
+
+    matrix = np.full((len(lengths), lengths.max(initial=0)), np.nan)
+    matrix[series_codes[order], positions] = np.asarray(values, dtype=float)[order]
+    return matrix, lengths
+
+def noise_variance(matrix):
+    """Robust per-series noise variance from first differences, which mean shifts barely affect."""
+    differences = np.diff(matrix, axis=1)
+    with warnings.catch_warnings():
+        # Series too short to have any differences give all-NaN rows
+        warnings.simplefilter('ignore', RuntimeWarning)
+        # Differences of iid noise have sd sqrt(2) * sigma; MAD / 0.6745 estimates an sd
+        robust = (np.nanmedian(np.abs(differences), axis=1) / 0.6745) ** 2 / 2
+        spread = np.nanvar(differences, axis=1) / 2
+    variance = np.where(robust > 0, robust, spread)
+    return np.where(np.isfinite(variance) & (variance > 0), variance, 1e-12)
+
+def best_splits(cumulative, series, start, end, min_size):
+    """Best split and its cost reduction for each segment [start, end) of its series."""
+    length = cumulative.shape[1] - 1
+    split = np.arange(1, length)[None, :]
+    rows = cumulative[series]
+    before = cumulative[series, start]
+    total = cumulative[series, end] - before
+    left = rows[:, 1:length] - before[:, None]
+    right = total[:, None] - left
+
+    left_size = split - start[:, None]
+    right_size = end[:, None] - split
+    valid = (left_size >= min_size) & (right_size >= min_size)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Sum-of-squares reduction from giving each side its own mean
+        gain = left ** 2 / left_size + right ** 2 / right_size - (total ** 2 / (end - start))[:, None]
+    gain = np.where(valid, gain, -np.inf)
+
+    best = np.argmax(gain, axis=1)
+    return best + 1, gain[np.arange(len(series)), best]
+
+def binary_segmentation(matrix, lengths, penalty=DEFAULT_PENALTY, max_changes=DEFAULT_MAX_CHANGES, min_size=2):
+    """Change points for every row of a padded matrix.
+
+    Returns (series, position, gain) arrays; position is the index of the first
+    value of the new regime.
+    """
+    lengths = np.asarray(lengths)
+    filled = np.nan_to_num(matrix)
+    cumulative = np.hstack([np.zeros((len(matrix), 1)), np.cumsum(filled, axis=1)])
+    threshold = penalty * noise_variance(matrix) * np.log(np.maximum(lengths, 2))
+
+    # Open segments, one row each
+    series = np.flatnonzero(lengths >= 2 * min_size)
+    start = np.zeros(len(series), dtype=np.int64)
+    end = lengths[series].astype(np.int64)
+    changes = np.zeros(len(matrix), dtype=np.int64)
+    found = []
+
+    while len(series):
+        split, gain = best_splits(cumulative, series, start, end, min_size)
+        accept = gain > threshold[series]
+
+        # Keep each series' strongest splits when more pass than it has room for
+        order = np.lexsort((-gain, series))
+        rank = np.arange(len(order)) - np.searchsorted(series[order], series[order])
+        room = np.zeros(len(series), dtype=bool)
+        room[order] = rank < max_changes - changes[series[order]]
+        accept &= room
+        if not accept.any():
+            break
+
+        found.append((series[accept], split[accept], gain[accept]))
+        np.add.at(changes, series[accept], 1)
+
+        # Each accepted segment becomes two open segments
+        series = np.r_[series[accept], series[accept]]
+        start, end = np.r_[start[accept], split[accept]], np.r_[split[accept], end[accept]]
+        keep = (end - start >= 2 * min_size) & (changes[series] < max_changes)
+        series, start, end = series[keep], start[keep], end[keep]
+
+    if not found:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([])
+    series, position, gain = (np.concatenate(parts) for parts in zip(*found))
+    order = np.lexsort((position, series))
+    return series[order], position[order], gain[order]
+
+def segment_means(matrix, lengths, series, position):
+    """Mean before and after each change point, within its neighbouring change points."""
+    filled = np.nan_to_num(matrix)
+    cumulative = np.hstack([np.zeros((len(matrix), 1)), np.cumsum(filled, axis=1)])
+
+    # Neighbouring boundaries within the same series (change points are sorted by series, position)
+    same_before = np.r_[False, series[1:] == series[:-1]]
+    same_after = np.r_[series[:-1] == series[1:], False]
+    previous = np.where(same_before, np.r_[0, position[:-1]], 0)
+    following = np.where(same_after, np.r_[position[1:], 0], np.asarray(lengths)[series])
+
+    before = (cumulative[series, position] - cumulative[series, previous]) / (position - previous)
+    after = (cumulative[series, following] - cumulative[series, position]) / (following - position)
+    return before, after
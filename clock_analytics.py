@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+NBA Game Clock Analytics
+Shot mix and efficiency by 30-second bins of the game clock in every period,
+per season and team, plus clutch windows (last 5 and last 2 minutes of the
+fourth quarter and overtime), written to data/clock/
+
+Each shot gets an integer cell code (season, team, period, clock bin); one
+bincount per counted stat fills the whole season x team x period x bin matrix.
+Clutch windows are slices of that matrix, so they need no second pass.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from process_comprehensive_nba_data import normalize_team_name
+from process_data import load_all_seasons
+from publish import Publisher
+
+CLOCK_DIR = 'data/clock'
+
+PERIODS = ['Q1', 'Q2', 'Q3', 'Q4', 'OT']
+PERIOD_SECONDS = {'Q1': 720, 'Q2': 720, 'Q3': 720, 'Q4': 720, 'OT': 300}
+BIN_SECONDS = 30
+BINS = max(PERIOD_SECONDS.values()) // BIN_SECONDS
+
+# Counted per cell; rates are derived from these when needed
+STATS = ['attempts', 'makes', 'three_pa', 'three_pm', 'restricted_area', 'mid_range']
+
+# Clutch windows: periods covered and the clock (seconds left) they start at
+CLUTCH_WINDOWS = {
+    'last_5_min_q4_ot': (['Q4', 'OT'], 300),
+    'last_2_min_q4_ot': (['Q4', 'OT'], 120)
+}
+
+def game_period(quarter):
+    """Q1-Q4 label for each quarter, OT for everything else."""
+    quarter = np.asarray(quarter)
+    return np.select([quarter == 1, quarter == 2, quarter == 3, quarter == 4],
+                     PERIODS[:4], default='OT')
+
+def clock_bins(mins_left, secs_left):
+    """30-second bin of the clock (bin 0 covers 0:00-0:30 left); -1 when the clock is missing."""
+    seconds = np.asarray(mins_left, dtype=float) * 60 + np.asarray(secs_left, dtype=float)
+    known = ~np.isnan(seconds)
+    # Bin i covers (30i, 30(i+1)] seconds left, so 5:00 left falls in the last-5-minutes bins
+    bins = np.ceil(np.where(known, seconds, 0) / BIN_SECONDS).astype(np.int64) - 1
+    return np.where(known, np.clip(bins, 0, BINS - 1), -1)
+
+def period_codes(quarter):
+    """Index into PERIODS for each quarter (-1 when missing)."""
+    quarter = pd.to_numeric(pd.Series(quarter), errors='coerce').to_numpy()
+    codes = np.where(quarter >= 5, len(PERIODS) - 1, quarter - 1)
+    return np.where(np.isnan(quarter), -1, codes).astype(np.int64)
+
+def shot_stats(df):
+    """One 0/1 column per STATS entry, in STATS order."""
+    made = (df['SHOT_MADE'] == True).to_numpy()
+    three = (df['SHOT_TYPE'] == '3PT Field Goal').to_numpy()
+    zone = df['BASIC_ZONE']
+    return np.column_stack([
+        np.ones(len(df), dtype=bool), made, three, three & made,
+        (zone == 'Restricted Area').to_numpy(), (zone == 'Mid-Range').to_numpy()
+    ])
+
+def clock_matrix(df):
+    """Counts shaped (seasons, teams, periods, bins, stats) and their axis labels."""
+    season_codes, seasons = pd.factorize(df['SEASON_1'].astype(int), sort=True)
+    team_codes, teams = pd.factorize(df['TEAM_NAME'].map(normalize_team_name), sort=True)
+    periods = period_codes(df['QUARTER'])
+    bins = clock_bins(df['MINS_LEFT'], df['SECS_LEFT'])
+
+    keep = (team_codes >= 0) & (periods >= 0) & (bins >= 0)
+    cells = ((season_codes * len(teams) + team_codes) * len(PERIODS) + periods) * BINS + bins
+    cells = cells[keep]
+    size = len(seasons) * len(teams) * len(PERIODS) * BINS
+
+    stats = shot_stats(df)[keep]
+    counts = np.stack([np.bincount(cells, weights=stats[:, k], minlength=size) for k in range(len(STATS))], axis=-1)
+    counts = counts.astype(np.int64).reshape(len(seasons), len(teams), len(PERIODS), BINS, len(STATS))
+    return counts, [int(s) for s in seasons], list(teams)
+
+def window_totals(counts, periods, seconds):
+    """Stat totals over the clock bins of a window, summed over its periods."""
+    period_index = [PERIODS.index(p) for p in periods]
+    return counts[..., period_index, :seconds // BIN_SECONDS, :].sum(axis=(-3, -2))
+
+def _rates(totals):
+    """Derived percentages for a stats vector in STATS order."""
+    attempts, makes, three_pa, three_pm = (int(v) for v in totals[:4])
+    if not attempts:
+        return {'fg_percentage': None, 'three_pt_rate': None, 'efg_percentage': None, 'points_per_shot': None}
+    return {
+        'fg_percentage': round(makes / attempts * 100, 1),
+        'three_pt_rate': round(three_pa / attempts * 100, 1),
+        'efg_percentage': round((makes + 0.5 * three_pm) / attempts * 100, 1),
+        'points_per_shot': round((2 * makes + three_pm) / attempts, 3)
+    }
+
+def clutch_records(counts, seasons, teams):
+    """Clutch-window totals and rates per season for the league and every team, next to the rest of the game."""
+    records = []
+    game_totals = counts.sum(axis=(-3, -2))
+    for window, (periods, seconds) in CLUTCH_WINDOWS.items():
+        clutch = window_totals(counts, periods, seconds)
+        for i, season in enumerate(seasons):
+            rows = [('League', clutch[i].sum(axis=0), game_totals[i].sum(axis=0))]
+            rows += [(team, clutch[i, j], game_totals[i, j]) for j, team in enumerate(teams) if game_totals[i, j, 0]]
+            for team, window_counts, totals in rows:
+                record = {'season': season, 'team': team, 'window': window}
+                record.update({stat: int(v) for stat, v in zip(STATS, window_counts)})
+                record.update(_rates(window_counts))
+                record['rest_of_game'] = _rates(totals - window_counts)
+                records.append(record)
+    return records
+
+def build_matrix_artifact(counts, seasons, teams):
+    """Compact matrix: axis labels plus the counts flattened in row-major order."""
+    return {
+        'shape': list(counts.shape),
+        'axes': ['season', 'team', 'period', 'clock_bin', 'stat'],
+        'seasons': seasons,
+        'teams': teams,
+        'periods': PERIODS,
+        'period_seconds': PERIOD_SECONDS,
+        'bin_seconds': BIN_SECONDS,
+        'stats': STATS,
+        'counts': counts.ravel().tolist()
+    }
+
+def save_clock_analytics(counts, seasons, teams):
+    """Write the clock matrix and the clutch table."""
+    publisher = Publisher()
+    publisher.add_json(os.path.join(CLOCK_DIR, 'clock_matrix.json'),
+                       build_matrix_artifact(counts, seasons, teams), separators=(',', ':'))
+    publisher.add_json(os.path.join(CLOCK_DIR, 'clutch.json'), clutch_records(counts, seasons, teams), indent=2)
+    publisher.publish()
+
+def main():
+    """Main clock analytics build function."""
+    parser = argparse.ArgumentParser(description="Build game-clock and clutch shooting analytics")
+    parser.parse_args()
+
+    df = load_all_seasons()
+
+    print("⏱️ Building game clock analytics...")
+    counts, seasons, teams = clock_matrix(df)
+    print(f"   {len(seasons)} seasons x {len(teams)} teams x {len(PERIODS)} periods x {BINS} clock bins")
+    binned = int(counts[..., 0].sum())
+    if binned < len(df):
+        print(f"   ⚠️  {len(df) - binned:,} shots without a team, period or clock left out")
+
+    save_clock_analytics(counts, seasons, teams)
+    print(f"✅ Clock analytics saved to {CLOCK_DIR}/")
+
+if __name__ == "__main__":
+    main()
@@ -11,35 +11,30 @@ import numpy as np
 import os
 import glob
 from tqdm import tqdm
-import json
+import argparse
 
-def validate_csv_structure(file_path):
-    """Validate that CSV has expected columns"""
-    try:
-        df = pd.read_csv(file_path, nrows=1)
-        expected_columns = [
-            'TEAM_NAME', 'PLAYER_NAME', 'POSITION_GROUP', 'POSITION', 
-            'HOME_TEAM', 'AWAY_TEAM', 'SEASON_1', 'SEASON_2',
-            'TEAM_ID', 'PLAYER_ID', 'GAME_DATE', 'GAME_ID',
-            'EVENT_TYPE', 'SHOT_MADE', 'ACTION_TYPE', 'SHOT_TYPE',
-            'BASIC_ZONE', 'ZONE_NAME', 'ZONE_ABB', 'ZONE_RANGE',
-            'LOC_X', 'LOC_Y', 'SHOT_DISTANCE', 'QUARTER',
-            'MINS_LEFT', 'SECS_LEFT'
-        ]
-        
-        # Check if at least the core columns exist
-        core_columns = ['PLAYER_NAME', 'SHOT_TYPE', 'SHOT_MADE', 'SEASON_1', 'SEASON_2']
-        missing_core = [col for col in core_columns if col not in df.columns]
-        
-        if missing_core:
-            print(f"Warning: {file_path} missing core columns: {missing_core}")
-            return False, df.columns.tolist()
-        
-        return True, df.columns.tolist()
-        
-    except Exception as e:
-        print(f"Error reading {file_path}: {e}")
-        return False, []
+from publish import DEFAULT_WORKERS, Publisher, atomic_output
+from clock_analytics import game_period
+from confidence_intervals import add_interval_columns
+from data_quality import QualityReport, missing_core_columns, read_validated, save_quality_report
+from hyperloglog import GroupedHyperLogLog, HyperLogLog, DEFAULT_PRECISION, relative_error
+from out_of_core import (MIN_CHUNK_ROWS, MemoryBudgetError, SpillPartitions, average_line_bytes, grouped_out_of_core,
+                         parse_memory_size, partition_count, peak_rss_bytes, plan_budget)
+from parse_cache import iter_shots_csv
+
+MASTER_CSV_PATH = 'data/master/nba_master_shots_2004_2024.csv'
+SAMPLE_ROWS = 100000
+# Bookkeeping bytes per sampled row in sample_master_csv, on top of the line itself
+SAMPLE_ROW_OVERHEAD = 32
+SAMPLE_SEED = 42
+SITUATION_COLUMNS = ['QUARTER', 'MINS_LEFT', 'SECS_LEFT']
+
+ANALYSIS_DESCRIPTIONS = {
+    'player_career': 'player career analytics',
+    'team_season': 'team season analytics',
+    'shot_analytics': 'advanced shot analytics',
+    'situation_analytics': 'game situation analytics'
+}
 
 def combine_nba_datasets():
     """Combine all NBA shot CSV files into a master dataset"""
@@ -57,49 +52,28 @@ def combine_nba_datasets():
     
     print(f"📁 Found {len(data_files)} NBA shot files")
     
-    # Validate all files first
-    print("\n🔍 Validating file structures...")
-    valid_files = []
-    all_columns = set()
-    
-    for file_path in data_files:
-        year = file_path.split('_')[1]  # Extract year from filename
-        print(f"  Checking {year}...", end=' ')
-        
-        is_valid, columns = validate_csv_structure(file_path)
-        if is_valid:
-            valid_files.append(file_path)
-            all_columns.update(columns)
-            print("✅")
-        else:
-            print("❌")
-    
-    if not valid_files:
-        print("❌ No valid CSV files found!")
-        return None
-    
-    print(f"\n✅ {len(valid_files)} files validated successfully")
-    print(f"📊 Total unique columns found: {len(all_columns)}")
-    
-    # Combine all files
-    print("\n📊 Combining datasets...")
+    # Read, validate and combine every file in a single pass
+    print("\n📊 Validating and combining datasets...")
     master_df = pd.DataFrame()
+    quality_reports = []
+    all_columns = set()
     
-    for file_path in tqdm(valid_files, desc="Processing files"):
+    for file_path in tqdm(data_files, desc="Processing files"):
         try:
-            # Read CSV
-            df = pd.read_csv(file_path)
-            
-            # Add metadata
+            # Read and validate the CSV (both cached after the first parse)
             year = int(file_path.split('_')[1])
-            df['FILE_YEAR'] = year
-            df['DATA_SOURCE'] = f"NBA_{year}_Shots.csv"
+            df, report = read_validated(file_path, year)
             
-            # Standardize season format
-            if 'SEASON_1' in df.columns and 'SEASON_2' in df.columns:
-                df['SEASON'] = df['SEASON_1'].astype(str) + '-' + df['SEASON_2'].astype(str).str[-2:]
-            else:
-                df['SEASON'] = f"{year}-{str(year+1)[-2:]}"
+            # Check if at least the core columns exist
+            missing_core = missing_core_columns(df.columns)
+            if missing_core:
+                print(f"Warning: {file_path} missing core columns: {missing_core}")
+                continue
+            all_columns.update(df.columns)
+            quality_reports.append(report)
+            
+            # Add metadata and standardize season format
+            add_source_columns(df, year)
             
             # Combine with master
             if master_df.empty:
@@ -111,6 +85,10 @@ def combine_nba_datasets():
             print(f"❌ Error processing {file_path}: {e}")
             continue
     
+    print(f"\n✅ {len(quality_reports)} files validated successfully")
+    print(f"📊 Total unique columns found: {len(all_columns)}")
+    save_quality_report(quality_reports)
+    
     if master_df.empty:
         print("❌ Failed to create master dataset!")
         return None
@@ -123,14 +101,37 @@ def combine_nba_datasets():
     
     return master_df
 
-def create_enhanced_analysis_datasets(master_df):
-    """Create additional analysis-ready datasets for the explorer"""
-    
-    print("\n🔬 Creating enhanced analysis datasets...")
+def add_source_columns(df, year):
+    """Add the file metadata and standardized season columns for one season file"""
+    df['FILE_YEAR'] = year
+    df['DATA_SOURCE'] = f"NBA_{year}_Shots.csv"
     
-    # 1. Player Career Analytics
-    print("  Creating player career analytics...")
-    player_career = master_df.groupby(['PLAYER_NAME', 'FILE_YEAR']).agg({
+    if 'SEASON_1' in df.columns and 'SEASON_2' in df.columns:
+        df['SEASON'] = df['SEASON_1'].astype(str) + '-' + df['SEASON_2'].astype(str).str[-2:]
+    else:
+        df['SEASON'] = f"{year}-{str(year+1)[-2:]}"
+    return df
+
+def has_situation_columns(columns):
+    """Whether the game clock columns situation analytics needs are present"""
+    return all(col in columns for col in SITUATION_COLUMNS)
+
+def add_situation_columns(df):
+    """Add TIME_REMAINING and GAME_PERIOD when the clock columns exist"""
+    if has_situation_columns(df.columns):
+        df['TIME_REMAINING'] = df['MINS_LEFT'] * 60 + df['SECS_LEFT']
+        df['GAME_PERIOD'] = game_period(df['QUARTER'])
+    return df
+
+def approximate_distinct(master_df, group_columns, value_column, precision=DEFAULT_PRECISION):
+    """Estimate distinct values per group with mergeable HyperLogLog sketches"""
+    sketches = GroupedHyperLogLog(precision)
+    sketches.add(master_df[group_columns], master_df[value_column])
+    return sketches.counts(group_columns)
+
+def player_career_analytics(df):
+    """Per player-season makes, attempts, zone breakdown and distance"""
+    player_career = df.groupby(['PLAYER_NAME', 'FILE_YEAR']).agg({
         'SHOT_MADE': ['sum', 'count'],
         'SHOT_TYPE': lambda x: (x == '3PT Field Goal').sum(),
         'BASIC_ZONE': lambda x: {
@@ -143,60 +144,265 @@ def create_enhanced_analysis_datasets(master_df):
     }).round(2)
     
     player_career.columns = ['makes', 'attempts', 'three_point_attempts', 'zone_breakdown', 'avg_distance', 'total_shots']
-    player_career = player_career.reset_index()
-    
-    # 2. Team Season Analytics
-    print("  Creating team season analytics...")
-    if 'TEAM_NAME' in master_df.columns:
-        team_season = master_df.groupby(['TEAM_NAME', 'FILE_YEAR']).agg({
-            'SHOT_MADE': ['sum', 'count'],
-            'SHOT_TYPE': lambda x: (x == '3PT Field Goal').sum(),
-            'PLAYER_NAME': 'nunique',
-            'GAME_ID': 'nunique' if 'GAME_ID' in master_df.columns else 'count'
-        }).round(2)
-        
-        team_season.columns = ['makes', 'attempts', 'three_point_attempts', 'unique_players', 'games_played']
-        team_season = team_season.reset_index()
-    else:
-        team_season = pd.DataFrame()
+    return player_career.reset_index()
+
+def team_season_analytics(df, approximate=False, hll_precision=DEFAULT_PRECISION):
+    """Per team-season makes, attempts, roster size and games"""
+    has_game_id = 'GAME_ID' in df.columns
+    team_season = df.groupby(['TEAM_NAME', 'FILE_YEAR']).agg({
+        'SHOT_MADE': ['sum', 'count'],
+        'SHOT_TYPE': lambda x: (x == '3PT Field Goal').sum(),
+        'PLAYER_NAME': 'count' if approximate else 'nunique',
+        'GAME_ID': 'nunique' if has_game_id and not approximate else 'count'
+    }).round(2)
     
-    # 3. Advanced Shot Analytics
-    print("  Creating advanced shot analytics...")
-    shot_analytics = master_df.groupby(['SHOT_TYPE', 'BASIC_ZONE', 'FILE_YEAR']).agg({
+    team_season.columns = ['makes', 'attempts', 'three_point_attempts', 'unique_players', 'games_played']
+    if approximate:
+        keys = ['TEAM_NAME', 'FILE_YEAR']
+        team_season['unique_players'] = approximate_distinct(df, keys, 'PLAYER_NAME', hll_precision).reindex(team_season.index).values
+        if has_game_id:
+            team_season['games_played'] = approximate_distinct(df, keys, 'GAME_ID', hll_precision).reindex(team_season.index).values
+    return team_season.reset_index()
+
+def shot_type_analytics(df, approximate=False, hll_precision=DEFAULT_PRECISION):
+    """Per shot type, zone and season accuracy and distance"""
+    shot_analytics = df.groupby(['SHOT_TYPE', 'BASIC_ZONE', 'FILE_YEAR']).agg({
         'SHOT_MADE': ['sum', 'count', 'mean'],
         'SHOT_DISTANCE': ['mean', 'std'],
-        'PLAYER_NAME': 'nunique'
+        'PLAYER_NAME': 'count' if approximate else 'nunique'
     }).round(3)
     
     shot_analytics.columns = ['makes', 'attempts', 'fg_percentage', 'avg_distance', 'distance_std', 'unique_players']
-    shot_analytics = shot_analytics.reset_index()
-    
-    # 4. Game Situation Analytics
-    print("  Creating game situation analytics...")
-    if all(col in master_df.columns for col in ['QUARTER', 'MINS_LEFT', 'SECS_LEFT']):
-        master_df['TIME_REMAINING'] = master_df['MINS_LEFT'] * 60 + master_df['SECS_LEFT']
-        master_df['GAME_PERIOD'] = master_df['QUARTER'].apply(lambda x: 
-            'Q1' if x == 1 else 'Q2' if x == 2 else 'Q3' if x == 3 else 'Q4' if x == 4 else 'OT'
-        )
+    if approximate:
+        keys = ['SHOT_TYPE', 'BASIC_ZONE', 'FILE_YEAR']
+        shot_analytics['unique_players'] = approximate_distinct(df, keys, 'PLAYER_NAME', hll_precision).reindex(shot_analytics.index).values
+    return shot_analytics.reset_index()
+
+def game_situation_analytics(df):
+    """Per period, shot type and season accuracy and clock (needs add_situation_columns)"""
+    situation_analytics = df.groupby(['GAME_PERIOD', 'SHOT_TYPE', 'FILE_YEAR']).agg({
+        'SHOT_MADE': ['sum', 'count', 'mean'],
+        'TIME_REMAINING': 'mean'
+    }).round(3)
+    
+    situation_analytics.columns = ['makes', 'attempts', 'fg_percentage', 'avg_time_remaining']
+    return situation_analytics.reset_index()
+
+def analysis_aggregations(columns, distinct_mode='exact', hll_precision=DEFAULT_PRECISION):
+    """(name, group keys, input columns, aggregate) for each analysis the columns allow"""
+    approximate = distinct_mode == 'hll'
+    has_game_id = 'GAME_ID' in columns
+    aggregations = [
+        ('player_career', ['PLAYER_NAME', 'FILE_YEAR'],
+         ['SHOT_MADE', 'SHOT_TYPE', 'BASIC_ZONE', 'SHOT_DISTANCE', 'QUARTER'],
+         player_career_analytics),
+        ('team_season', ['TEAM_NAME', 'FILE_YEAR'],
+         ['SHOT_MADE', 'SHOT_TYPE', 'PLAYER_NAME'] + (['GAME_ID'] if has_game_id else []),
+         lambda df: team_season_analytics(df, approximate, hll_precision)),
+        ('shot_analytics', ['SHOT_TYPE', 'BASIC_ZONE', 'FILE_YEAR'],
+         ['SHOT_MADE', 'SHOT_DISTANCE', 'PLAYER_NAME'],
+         lambda df: shot_type_analytics(df, approximate, hll_precision)),
+        ('situation_analytics', ['GAME_PERIOD', 'SHOT_TYPE', 'FILE_YEAR'],
+         ['SHOT_MADE', 'TIME_REMAINING'],
+         game_situation_analytics)
+    ]
+    available = {
+        'player_career': True,
+        'team_season': 'TEAM_NAME' in columns,
+        'shot_analytics': True,
+        'situation_analytics': has_situation_columns(columns)
+    }
+    return [aggregation for aggregation in aggregations if available[aggregation[0]]]
+
+def create_enhanced_analysis_datasets(master_df, distinct_mode='exact', hll_precision=DEFAULT_PRECISION):
+    """Create additional analysis-ready datasets for the explorer
+    
+    distinct_mode='hll' replaces the exact nunique counts with HyperLogLog
+    estimates (see hyperloglog.py for the error at each precision).
+    """
+    
+    print("\n🔬 Creating enhanced analysis datasets...")
+    add_situation_columns(master_df)
+    analysis_datasets = {name: pd.DataFrame() for name in ANALYSIS_DESCRIPTIONS}
+    for name, _, _, aggregate in analysis_aggregations(master_df.columns, distinct_mode, hll_precision):
+        print(f"  Creating {ANALYSIS_DESCRIPTIONS[name]}...")
+        analysis_datasets[name] = aggregate(master_df)
+    
+    return analysis_datasets
+
+def create_master_out_of_core(memory_limit, distinct_mode='exact', hll_precision=DEFAULT_PRECISION, spill_dir=None):
+    """Build every output in row chunks within a memory budget
+    
+    Season files are streamed in chunks sized from the budget (see
+    parse_cache.iter_shots_csv), the master CSV is appended per chunk, and the
+    four analysis groupbys run out-of-core over hash-partitioned spill files
+    (see out_of_core.py). Only one chunk, one spill partition and the 100k-row
+    web sample are held at once. Outputs match the in-memory path. Raises
+    MemoryBudgetError before doing any work when the limit cannot be met.
+    """
+    
+    print("🏀 NBA Master Dataset Creation (out-of-core)")
+    print("=" * 50)
+    print(f"💾 Memory limit: {memory_limit / 2**20:,.0f} MB")
+    
+    data_files = sorted(glob.glob("Data/NBA_*_Shots.csv"))
+    if not data_files:
+        print("❌ No NBA CSV files found in Data/ directory!")
+        return None, None
+    print(f"📁 Found {len(data_files)} NBA shot files")
+    
+    # Column order of the concatenated master frame, from the headers alone
+    columns, usable_files = [], []
+    for file_path in data_files:
+        file_columns = pd.read_csv(file_path, nrows=0).columns
+        if missing_core_columns(file_columns):
+            print(f"Warning: {file_path} missing core columns: {missing_core_columns(file_columns)}")
+            continue
+        usable_files.append(file_path)
+        for column in list(file_columns) + ['FILE_YEAR', 'DATA_SOURCE', 'SEASON']:
+            if column not in columns:
+                columns.append(column)
+    if has_situation_columns(columns):
+        columns += ['TIME_REMAINING', 'GAME_PERIOD']
+    aggregations = analysis_aggregations(columns, distinct_mode, hll_precision)
+    if not usable_files:
+        print("❌ Failed to create master dataset!")
+        return None, None
+    
+    # Size chunks and partitions from a sample of rows, reserving room for the web sample
+    probe = pd.read_csv(usable_files[0], nrows=MIN_CHUNK_ROWS)
+    add_situation_columns(add_source_columns(probe, int(usable_files[0].split('_')[1])))
+    row_bytes = probe.memory_usage(deep=True).sum() / len(probe)
+    spill_row_bytes = sum(probe[[c for c in keys + inputs if c in probe.columns]].memory_usage(deep=True).sum()
+                          for _, keys, inputs, _ in aggregations) / len(probe)
+    line_bytes = average_line_bytes(usable_files[0])
+    budget, chunk_rows = plan_budget(memory_limit, row_bytes, SAMPLE_ROWS * (line_bytes + SAMPLE_ROW_OVERHEAD))
+    estimated_rows = sum(os.path.getsize(path) for path in usable_files) / line_bytes
+    partitions = partition_count(estimated_rows * spill_row_bytes, budget)
+    del probe
+    print(f"   {budget / 2**20:,.0f} MB working budget: {chunk_rows:,}-row chunks, {partitions} spill partitions per analysis")
+    
+    quality_reports = []
+    file_rows = []
+    players = HyperLogLog(hll_precision) if distinct_mode == 'hll' else set()
+    teams = HyperLogLog(hll_precision) if distinct_mode == 'hll' else set()
+    spill = SpillPartitions(partitions, spill_dir)
+    
+    print("\n📊 Validating, combining and partitioning datasets...")
+    os.makedirs('data/master', exist_ok=True)
+    try:
+        with atomic_output(MASTER_CSV_PATH) as temp_path:
+            for file_path in tqdm(usable_files, desc="Processing files"):
+                year = int(file_path.split('_')[1])
+                report = QualityReport(year)
+                rows = 0
+                for df in iter_shots_csv(file_path, chunk_rows, report=report):
+                    add_situation_columns(add_source_columns(df, year))
+                    
+                    ordered = df if list(df.columns) == columns else df.reindex(columns=columns)
+                    ordered.to_csv(temp_path, mode='a', header=os.path.getsize(temp_path) == 0, index=False)
+                    del ordered
+                    rows += len(df)
+                    for values, column in [(players, 'PLAYER_NAME'), (teams, 'TEAM_NAME')]:
+                        if column in df.columns:
+                            if distinct_mode == 'hll':
+                                values.add(df[column])
+                            else:
+                                values.update(df[column].dropna().unique())
+                    
+                    for name, keys, inputs, _ in aggregations:
+                        spill.add(name, df[[c for c in keys + inputs if c in df.columns]], keys)
+                    del df
+                quality_reports.append(report)
+                if rows:
+                    file_rows.append((file_path, year, rows))
         
-        situation_analytics = master_df.groupby(['GAME_PERIOD', 'SHOT_TYPE', 'FILE_YEAR']).agg({
-            'SHOT_MADE': ['sum', 'count', 'mean'],
-            'TIME_REMAINING': 'mean'
-        }).round(3)
+        save_quality_report(quality_reports)
+        if not file_rows:
+            print("❌ Failed to create master dataset!")
+            return None, None
+        total_shots = sum(rows for _, _, rows in file_rows)
+        print(f"\n🎉 Master dataset written: {total_shots:,} shots, "
+              f"{spill.bytes_written / 2**20:,.1f} MB spilled")
         
-        situation_analytics.columns = ['makes', 'attempts', 'fg_percentage', 'avg_time_remaining']
-        situation_analytics = situation_analytics.reset_index()
-    else:
-        situation_analytics = pd.DataFrame()
+        print("\n🔬 Creating enhanced analysis datasets (out-of-core)...")
+        analysis_datasets = {name: pd.DataFrame() for name in ANALYSIS_DESCRIPTIONS}
+        for name, keys, _, aggregate in aggregations:
+            print(f"  Creating {ANALYSIS_DESCRIPTIONS[name]}...")
+            analysis_datasets[name] = grouped_out_of_core(spill, name, keys, aggregate)
+    finally:
+        spill.cleanup()
     
-    return {
-        'player_career': player_career,
-        'team_season': team_season,
-        'shot_analytics': shot_analytics,
-        'situation_analytics': situation_analytics
+    print("\n💾 Saving datasets...")
+    print("  Saving compressed master dataset...")
+    sample_csv = sample_master_csv(total_shots)
+    
+    summary = {
+        'total_shots': total_shots,
+        'start_year': min(year for _, year, _ in file_rows),
+        'end_year': max(year for _, year, _ in file_rows),
+        'unique_players': players.count() if distinct_mode == 'hll' else len(players),
+        'unique_teams': (teams.count() if distinct_mode == 'hll' else len(teams)) if 'TEAM_NAME' in columns else 0,
+        'columns': columns
     }
+    return analysis_datasets, publish_datasets(sample_csv, analysis_datasets, summary, distinct_mode, hll_precision)
+
+def _sampled_lines(master_path, rows):
+    """Yield (index into rows, line) for each wanted row of the master CSV; rows must be sorted"""
+    with open(master_path, 'rb') as f:
+        f.readline()
+        k = 0
+        for row, line in enumerate(f):
+            if k == len(rows):
+                break
+            if row == rows[k]:
+                yield k, line
+                k += 1
+
+def sample_master_csv(total_shots, master_path=MASTER_CSV_PATH):
+    """The web sample CSV, cut as raw lines from the written master CSV
+    
+    Draws the same rows as master_df.sample(n, random_state=SAMPLE_SEED) and
+    keeps them in draw order. Each line is already the row's to_csv text; one
+    pass measures the sampled lines and a second copies each into its slot of
+    a preallocated buffer, so the sample is held in memory only once.
+    """
+    positions = np.random.RandomState(SAMPLE_SEED).choice(total_shots, size=min(SAMPLE_ROWS, total_shots), replace=False)
+    order = np.argsort(positions)
+    rows = positions[order].tolist()
+    
+    with open(master_path, 'rb') as f:
+        header = f.readline()
+    lengths = np.zeros(len(positions), dtype=np.int64)
+    for k, line in _sampled_lines(master_path, rows):
+        lengths[order[k]] = len(line)
+    starts = len(header) + np.r_[0, np.cumsum(lengths)[:-1]]
+    
+    sample = bytearray(len(header) + int(lengths.sum()))
+    sample[:len(header)] = header
+    for k, line in _sampled_lines(master_path, rows):
+        start = int(starts[order[k]])
+        sample[start:start + len(line)] = line
+    return sample
+
+def save_analysis_datasets(analysis_datasets, publisher):
+    """Queue each analysis dataset as JSON (for the web) and CSV"""
+    for name, df in analysis_datasets.items():
+        if not df.empty:
+            # 95% Wilson interval for every published FG%
+            if 'fg_percentage' in df.columns:
+                df = add_interval_columns(df.copy())
+            
+            # Convert to JSON format
+            json_data = df.to_dict('records')
+            
+            # Save as JSON
+            publisher.add_json(f'data/master/{name}.json', json_data, indent=2, default=str)
+            
+            # Save as CSV
+            publisher.add_csv(f'data/master/{name}.csv', df, index=False)
 
-def save_datasets(master_df, analysis_datasets):
+def save_datasets(master_df, analysis_datasets, distinct_mode='exact', hll_precision=DEFAULT_PRECISION):
     """Save all datasets in multiple formats"""
     
     print("\n💾 Saving datasets...")
@@ -206,48 +412,72 @@ def save_datasets(master_df, analysis_datasets):
     
     # Save master dataset (CSV for full data)
     print("  Saving master CSV...")
-    master_df.to_csv('data/master/nba_master_shots_2004_2024.csv', index=False)
+    with atomic_output(MASTER_CSV_PATH) as temp_path:
+        master_df.to_csv(temp_path, index=False)
     
     # Save compressed version for web
     print("  Saving compressed master dataset...")
-    master_sample = master_df.sample(n=min(100000, len(master_df)), random_state=42)
-    master_sample.to_csv('data/master/nba_master_shots_sample.csv', index=False)
+    master_sample = master_df.sample(n=min(SAMPLE_ROWS, len(master_df)), random_state=SAMPLE_SEED)
+    sample_csv = master_sample.to_csv(index=False).encode('utf-8')
+    
+    if distinct_mode == 'hll':
+        unique_players = HyperLogLog(hll_precision).add(master_df['PLAYER_NAME']).count()
+        unique_teams = HyperLogLog(hll_precision).add(master_df['TEAM_NAME']).count() if 'TEAM_NAME' in master_df.columns else 0
+    else:
+        unique_players = int(master_df['PLAYER_NAME'].nunique())
+        unique_teams = int(master_df['TEAM_NAME'].nunique()) if 'TEAM_NAME' in master_df.columns else 0
+    
+    summary = {
+        'total_shots': len(master_df),
+        'start_year': int(master_df['FILE_YEAR'].min()),
+        'end_year': int(master_df['FILE_YEAR'].max()),
+        'unique_players': unique_players,
+        'unique_teams': unique_teams,
+        'columns': master_df.columns.tolist()
+    }
+    return publish_datasets(sample_csv, analysis_datasets, summary, distinct_mode, hll_precision)
+
+def publish_datasets(sample_csv, analysis_datasets, summary, distinct_mode='exact', hll_precision=DEFAULT_PRECISION):
+    """Publish the web sample, analysis datasets and metadata (the master CSV is already written)"""
+    publisher = Publisher()
+    publisher.add_bytes('data/master/nba_master_shots_sample.csv', sample_csv)
     
     # Save analysis datasets as JSON for web consumption
     print("  Saving analysis datasets...")
-    for name, df in analysis_datasets.items():
-        if not df.empty:
-            # Convert to JSON format
-            json_data = df.to_dict('records')
-            
-            # Save as JSON
-            with open(f'data/master/{name}.json', 'w') as f:
-                json.dump(json_data, f, indent=2, default=str)
-            
-            # Save as CSV
-            df.to_csv(f'data/master/{name}.csv', index=False)
+    save_analysis_datasets(analysis_datasets, publisher)
     
     # Create metadata file
     print("  Creating metadata...")
     metadata = {
         'creation_date': pd.Timestamp.now().isoformat(),
-        'total_shots': len(master_df),
+        'total_shots': summary['total_shots'],
         'date_range': {
-            'start_year': int(master_df['FILE_YEAR'].min()),
-            'end_year': int(master_df['FILE_YEAR'].max())
+            'start_year': summary['start_year'],
+            'end_year': summary['end_year']
         },
-        'unique_players': int(master_df['PLAYER_NAME'].nunique()),
-        'unique_teams': int(master_df['TEAM_NAME'].nunique()) if 'TEAM_NAME' in master_df.columns else 0,
-        'columns': master_df.columns.tolist(),
+        'unique_players': summary['unique_players'],
+        'unique_teams': summary['unique_teams'],
+        'columns': summary['columns'],
         'file_sizes': {
-            'master_csv_mb': round(os.path.getsize('data/master/nba_master_shots_2004_2024.csv') / 1024 / 1024, 2),
-            'sample_csv_mb': round(os.path.getsize('data/master/nba_master_shots_sample.csv') / 1024 / 1024, 2)
+            'master_csv_mb': round(os.path.getsize(MASTER_CSV_PATH) / 1024 / 1024, 2),
+            'sample_csv_mb': round(len(sample_csv) / 1024 / 1024, 2)
+        },
+        'sample': {
+            'method': 'random',
+            'updated_incrementally': False,
+            'population_rows': summary['total_shots']
         },
         'analysis_datasets': list(analysis_datasets.keys())
     }
+    if distinct_mode == 'hll':
+        metadata['distinct_counts'] = {
+            'mode': 'hyperloglog',
+            'precision': hll_precision,
+            'relative_standard_error': round(float(relative_error(hll_precision)), 4)
+        }
     
-    with open('data/master/metadata.json', 'w') as f:
-        json.dump(metadata, f, indent=2)
+    publisher.add_json('data/master/metadata.json', metadata, indent=2)
+    publisher.publish()
     
     print(f"\n✅ All datasets saved to data/master/")
     print(f"📁 Master CSV: {metadata['file_sizes']['master_csv_mb']} MB")
@@ -258,21 +488,52 @@ def save_datasets(master_df, analysis_datasets):
 def main():
     """Main execution function"""
     
+    parser = argparse.ArgumentParser(description="Combine NBA shot CSVs into master datasets")
+    parser.add_argument('--distinct', choices=['exact', 'hll'], default='exact',
+                        help="Distinct counting mode: exact nunique or HyperLogLog sketches")
+    parser.add_argument('--hll-precision', type=int, default=DEFAULT_PRECISION,
+                        help="HyperLogLog precision p (2**p registers, ~1.04/sqrt(2**p) error)")
+    parser.add_argument('--memory-limit', type=parse_memory_size,
+                        help="Memory budget such as 2G; streams files and runs the analysis groupbys out-of-core")
+    parser.add_argument('--spill-dir', help="Where out-of-core spill files go (default: system temp dir)")
+    args = parser.parse_args()
+    
     print("🚀 Starting NBA Master Dataset Creation")
     print("This will combine all NBA shot data (2004-2024) into comprehensive datasets")
     print("for enhanced exploration and analysis.\n")
     
-    # Step 1: Combine all CSV files
-    master_df = combine_nba_datasets()
-    if master_df is None:
-        print("❌ Failed to create master dataset!")
-        return
-    
-    # Step 2: Create enhanced analysis datasets
-    analysis_datasets = create_enhanced_analysis_datasets(master_df)
-    
-    # Step 3: Save all datasets
-    metadata = save_datasets(master_df, analysis_datasets)
+    # One publish for the whole run: quality report, datasets and metadata
+    # (serialized one at a time under a memory limit)
+    with Publisher(max_workers=1 if args.memory_limit else DEFAULT_WORKERS):
+        if args.memory_limit:
+            # Steps 1-3 in row chunks within the memory limit
+            try:
+                analysis_datasets, metadata = create_master_out_of_core(
+                    args.memory_limit, args.distinct, args.hll_precision, args.spill_dir
+                )
+            except MemoryBudgetError as e:
+                parser.error(f"--memory-limit: {e}")
+            if metadata is None:
+                print("❌ Failed to create master dataset!")
+                return
+        else:
+            # Step 1: Combine all CSV files
+            master_df = combine_nba_datasets()
+            if master_df is None:
+                print("❌ Failed to create master dataset!")
+                return
+    
+            # Step 2: Create enhanced analysis datasets
+            analysis_datasets = create_enhanced_analysis_datasets(master_df, args.distinct, args.hll_precision)
+    
+            # Step 3: Save all datasets
+            metadata = save_datasets(master_df, analysis_datasets, args.distinct, args.hll_precision)
+    
+    if args.memory_limit:
+        peak = peak_rss_bytes()
+        print(f"\n📈 Peak RSS: {peak / 2**20:,.0f} MB of the {args.memory_limit / 2**20:,.0f} MB limit")
+        if peak > args.memory_limit:
+            print("⚠️  Peak RSS exceeded the memory limit; aggregating one spill partition took more than planned")
     
     print("\n🎉 NBA Master Dataset Creation Complete!")
     print(f"🏀 Total shots processed: {metadata['total_shots']:,}")
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+NBA Data Quality Validation
+Vectorized schema and data-quality checks for the raw shot CSVs.
+
+Checks run on each chunk of rows as parse_cache.read_shots_csv parses it and
+accumulate into one report per season, with a count and a few sample offending
+rows per check; the finished report is cached with the parsed frame, so a
+season is only validated when its CSV is parsed:
+- dtype contract (missing columns, values that do not fit the expected type)
+- LOC_X / LOC_Y / SHOT_DISTANCE ranges
+- SHOT_TYPE consistency with BASIC_ZONE and SHOT_DISTANCE
+- QUARTER and game clock bounds
+- duplicate shot events within a GAME_ID
+- team names that do not map onto the 30 current franchises
+"""
+
+import argparse
+import glob
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from parse_cache import read_shots_csv
+from process_comprehensive_nba_data import normalize_team_name
+from process_enhanced_nba_data import NBA_CONFERENCES
+from publish import Publisher
+
+QUALITY_REPORT_PATH = 'data/quality_report.json'
+
+# Expected value kind for each raw column
+SHOT_SCHEMA = {
+    'SEASON_1': 'int', 'SEASON_2': 'str', 'TEAM_ID': 'int', 'TEAM_NAME': 'str',
+    'PLAYER_ID': 'int', 'PLAYER_NAME': 'str', 'POSITION_GROUP': 'str', 'POSITION': 'str',
+    'GAME_DATE': 'str', 'GAME_ID': 'int', 'HOME_TEAM': 'str', 'AWAY_TEAM': 'str',
+    'EVENT_TYPE': 'str', 'SHOT_MADE': 'bool', 'ACTION_TYPE': 'str', 'SHOT_TYPE': 'str',
+    'BASIC_ZONE': 'str', 'ZONE_NAME': 'str', 'ZONE_ABB': 'str', 'ZONE_RANGE': 'str',
+    'LOC_X': 'float', 'LOC_Y': 'float', 'SHOT_DISTANCE': 'int', 'QUARTER': 'int',
+    'MINS_LEFT': 'int', 'SECS_LEFT': 'int'
+}
+
+# Columns every downstream script relies on
+CORE_COLUMNS = ['PLAYER_NAME', 'SHOT_TYPE', 'SHOT_MADE', 'SEASON_1', 'SEASON_2']
+
+# Court coordinates are in feet: LOC_X from the center line, LOC_Y from the baseline
+LOC_X_RANGE = (-25, 25)
+LOC_Y_RANGE = (0, 94)
+SHOT_DISTANCE_RANGE = (0, 94)
+
+THREE_POINT_ZONES = ['Left Corner 3', 'Right Corner 3', 'Above the Break 3', 'Backcourt']
+TWO_POINT_ZONES = ['Restricted Area', 'In The Paint (Non-RA)', 'Mid-Range']
+# The corner three is 22 ft; the longest two sits just inside the 23'9" arc
+MIN_THREE_DISTANCE = 22
+MAX_TWO_DISTANCE = 24
+
+MAX_QUARTER = 8  # Four overtimes
+REGULATION_SECONDS = 12 * 60
+OVERTIME_SECONDS = 5 * 60
+
+# Columns that identify one shot event within a game (numeric only, so hashing stays cheap)
+EVENT_KEY = ['GAME_ID', 'PLAYER_ID', 'QUARTER', 'MINS_LEFT', 'SECS_LEFT', 'LOC_X', 'LOC_Y', 'SHOT_MADE']
+
+SAMPLE_COLUMNS = ['GAME_ID', 'GAME_DATE', 'TEAM_NAME', 'PLAYER_NAME', 'SHOT_TYPE', 'BASIC_ZONE',
+                  'SHOT_DISTANCE', 'LOC_X', 'LOC_Y', 'QUARTER', 'MINS_LEFT', 'SECS_LEFT']
+
+KNOWN_TEAMS = {team for divisions in NBA_CONFERENCES.values() for teams in divisions.values() for team in teams}
+
+class QualityReport:
+    """Accumulates check results for one season across chunks."""
+
+    # Bump when the checks change so cached reports are recomputed
+    VERSION = 1
+
+    def __init__(self, season, sample_size=5):
+        self.season = season
+        self.sample_size = sample_size
+        self.rows = 0
+        self.missing_columns = []
+        self.dtype_mismatches = {}
+        self.checks = {}
+        self.unmapped_teams = Counter()
+        self._event_hashes = []
+
+    def record(self, name, mask, df):
+        """Count rows failing a check and keep the first few as samples."""
+        mask = np.asarray(mask, dtype=bool)
+        count = int(np.count_nonzero(mask))
+        entry = self.checks.setdefault(name, {'count': 0, 'samples': []})
+        entry['count'] += count
+
+        missing = self.sample_size - len(entry['samples'])
+        if count and missing > 0:
+            columns = [c for c in SAMPLE_COLUMNS if c in df.columns]
+            offenders = df.iloc[np.flatnonzero(mask)[:missing]][columns]
+            offenders = offenders.astype(object).where(offenders.notna(), None)
+            for row_number, row in zip(offenders.index, offenders.to_dict('records')):
+                entry['samples'].append({'row': int(row_number), **row})
+
+    def load(self, data):
+        """Restore the results of a cached report."""
+        self.rows = data['rows']
+        self.missing_columns = data['missing_columns']
+        self.dtype_mismatches = data['dtype_mismatches']
+        self.checks = data['checks']
+        self.unmapped_teams = Counter(data['unmapped_teams'])
+        return self
+
+    def finish(self):
+        """Drop the state kept only to compare chunks with each other."""
+        self._event_hashes = []
+        return self
+
+    def validate_chunk(self, df):
+        """Run every check over one chunk of raw rows."""
+        self.rows += len(df)
+
+        self._check_schema(df)
+        self._check_ranges(df)
+        self._check_shot_type(df)
+        self._check_clock(df)
+        self._check_duplicates(df)
+        self._check_teams(df)
+        return self
+
+    def _check_schema(self, df):
+        for column, kind in SHOT_SCHEMA.items():
+            if column not in df.columns:
+                if column not in self.missing_columns:
+                    self.missing_columns.append(column)
+                continue
+            if kind == 'str':
+                continue
+
+            values = df[column]
+            if _dtype_matches(values, kind):
+                continue  # The parser already guarantees every value fits
+
+            present = values.notna()
+            if kind == 'bool':
+                bad = present & ~values.isin([True, False])
+            else:
+                numeric = pd.to_numeric(values, errors='coerce')
+                bad = present & numeric.isna()
+                if kind == 'int':
+                    bad |= numeric.notna() & (numeric % 1 != 0)
+
+            entry = self.dtype_mismatches.setdefault(column, {'expected': kind, 'found': str(values.dtype), 'bad_values': 0})
+            entry['bad_values'] += int(bad.sum())
+
+    def _check_ranges(self, df):
+        for column, (low, high) in [('LOC_X', LOC_X_RANGE), ('LOC_Y', LOC_Y_RANGE), ('SHOT_DISTANCE', SHOT_DISTANCE_RANGE)]:
+            if column in df.columns:
+                values = _numeric(df[column])
+                self.record(f'{column.lower()}_out_of_range', (values < low) | (values > high), df)
+
+    def _check_shot_type(self, df):
+        if not {'SHOT_TYPE', 'BASIC_ZONE', 'SHOT_DISTANCE'} <= set(df.columns):
+            return
+        # Compare the few distinct labels once instead of every row's string
+        type_codes, types = pd.factorize(df['SHOT_TYPE'])
+        zone_codes, zones = pd.factorize(df['BASIC_ZONE'])
+        zone_codes = np.where(zone_codes < 0, len(zones), zone_codes)
+        two_zone = np.r_[np.isin(zones, TWO_POINT_ZONES), False][zone_codes]
+        three_zone = np.r_[np.isin(zones, THREE_POINT_ZONES), False][zone_codes]
+        distance = _numeric(df['SHOT_DISTANCE'])
+
+        three = type_codes == (types.get_loc('3PT Field Goal') if '3PT Field Goal' in types else -2)
+        two = type_codes == (types.get_loc('2PT Field Goal') if '2PT Field Goal' in types else -2)
+        self.record('three_pointer_in_two_point_zone', three & two_zone, df)
+        self.record('two_pointer_in_three_point_zone', two & three_zone, df)
+        self.record('three_pointer_too_close', three & (distance < MIN_THREE_DISTANCE), df)
+        self.record('two_pointer_too_far', two & (distance > MAX_TWO_DISTANCE), df)
+        self.record('unknown_shot_type', (type_codes >= 0) & ~(three | two), df)
+
+    def _check_clock(self, df):
+        if not {'QUARTER', 'MINS_LEFT', 'SECS_LEFT'} <= set(df.columns):
+            return
+        quarter = _numeric(df['QUARTER'])
+        minutes = _numeric(df['MINS_LEFT'])
+        seconds = _numeric(df['SECS_LEFT'])
+        remaining = minutes * 60 + seconds
+        period_length = np.where(quarter > 4, OVERTIME_SECONDS, REGULATION_SECONDS)
+
+        self.record('quarter_out_of_range', (quarter < 1) | (quarter > MAX_QUARTER), df)
+        self.record('clock_out_of_range',
+                    (minutes < 0) | (seconds < 0) | (seconds > 59) | (remaining > period_length), df)
+
+    def _check_duplicates(self, df):
+        key = [c for c in EVENT_KEY if c in df.columns]
+        if 'GAME_ID' not in key:
+            return
+        hashes = pd.util.hash_pandas_object(df[key], index=False).to_numpy()
+
+        duplicated = pd.Series(hashes).duplicated().to_numpy().copy()
+        if self._event_hashes:
+            duplicated |= np.isin(hashes, np.concatenate(self._event_hashes))
+        self._event_hashes.append(hashes)
+        self.record('duplicate_game_events', duplicated, df)
+
+    def _check_teams(self, df):
+        if 'TEAM_NAME' not in df.columns:
+            return
+        counts = df['TEAM_NAME'].value_counts()
+        unmapped = [name for name in counts.index if normalize_team_name(name) not in KNOWN_TEAMS]
+        for name in unmapped:
+            self.unmapped_teams[name] += int(counts[name])
+
+    @property
+    def issue_count(self):
+        """Total failing rows across all row-level checks."""
+        return sum(entry['count'] for entry in self.checks.values()) + sum(self.unmapped_teams.values())
+
+    def to_dict(self):
+        return {
+            'season': self.season,
+            'rows': self.rows,
+            'missing_columns': self.missing_columns,
+            'dtype_mismatches': self.dtype_mismatches,
+            'checks': self.checks,
+            'unmapped_teams': dict(self.unmapped_teams)
+        }
+
+def _numeric(values):
+    """Float view of a column; values that are not numbers become NaN and fail no range check."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.to_numpy(dtype=float)
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=float)
+
+def _dtype_matches(values, kind):
+    if kind == 'int':
+        return pd.api.types.is_integer_dtype(values)
+    if kind == 'float':
+        return pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+    if kind == 'bool':
+        return pd.api.types.is_bool_dtype(values)
+    return True
+
+def read_validated(file_path, season):
+    """Parsed season frame and its quality report, both from a single ingest pass."""
+    report = QualityReport(season)
+    return read_shots_csv(file_path, report=report), report
+
+def missing_core_columns(columns):
+    """Core columns absent from a file's header."""
+    return [col for col in CORE_COLUMNS if col not in columns]
+
+def save_quality_report(reports, output_path=QUALITY_REPORT_PATH):
+    """Publish the per-season reports and print a one-line summary per season.
+
+    Inside a publishing run (see publish.Publisher) the report is written with
+    the rest of the run's outputs.
+    """
+    seasons = {str(report.season): report.to_dict() for report in sorted(reports, key=lambda r: str(r.season))}
+    totals = Counter()
+    for report in reports:
+        for name, entry in report.checks.items():
+            totals[name] += entry['count']
+
+    publisher = Publisher()
+    publisher.add_json(output_path, {
+        'rows': sum(report.rows for report in reports),
+        'issue_totals': dict(sorted(totals.items())),
+        'seasons': seasons
+    }, indent=2)
+    publisher.publish()
+
+    print("\n🔎 Data quality:")
+    for report in sorted(reports, key=lambda r: str(r.season)):
+        flagged = {name: entry['count'] for name, entry in report.checks.items() if entry['count']}
+        problems = [f"{name}={count:,}" for name, count in flagged.items()]
+        problems += [f"missing {column}" for column in report.missing_columns]
+        problems += [f"{column} not {entry['expected']}" for column, entry in report.dtype_mismatches.items()]
+        problems += [f"unmapped team '{name}'" for name in report.unmapped_teams]
+        status = '✅' if not problems else '⚠️ '
+        print(f"   {status} {report.season}: {report.rows:,} rows" + (f" — {', '.join(problems)}" if problems else ''))
+    print(f"   Report saved to {output_path}")
+
+def main():
+    """Validate season CSVs without building any outputs."""
+    parser = argparse.ArgumentParser(description="Validate NBA shot CSVs and write a data-quality report")
+    parser.add_argument('files', nargs='*', help="Season CSVs (default: Data/NBA_*_Shots.csv)")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob("Data/NBA_*_Shots.csv"))
+    reports = []
+    for file_path in files:
+        season = file_path.split('_')[-2]
+        reports.append(read_validated(file_path, int(season) if season.isdigit() else season)[1])
+
+    save_quality_report(reports)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""
+NBA Delta Ingestion
+Adds newly played games to stored running aggregates instead of re-reading the
+full 2004-2024 history every night.
+
+For every season file a watermark records the byte offset already ingested,
+the processed GAME_IDs and the latest GAME_DATE. A refresh parses only the
+complete lines appended since the last run, adds their counts to the running
+aggregates in data/state/ and rewrites the team, player, league and master
+analysis outputs from those aggregates.
+
+The state also records how many bytes of the master CSV it accounts for, so
+rows appended by a run that died before saving its state are cut off again at
+the next start. Each save writes a new generation of state files and commits
+it by replacing watermarks.json. The web sample is kept in the state as a
+reservoir sample and updated from the appended rows only; full builds redraw
+it from scratch.
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from process_comprehensive_nba_data import (
+    build_team_season, build_player_season, build_league_season,
+    normalize_team_name, convert_team_data, convert_player_data, add_confidence_intervals, save_data
+)
+from process_enhanced_nba_data import save_enhanced_data
+from efficiency_surfaces import ZONES, efficiency_comparison
+from clock_analytics import game_period
+from create_master_dataset import SAMPLE_ROWS, SAMPLE_SEED, save_analysis_datasets
+from parse_cache import parse_game_dates
+from publish import Publisher
+
+STATE_DIR = 'data/state'
+MASTER_CSV = 'data/master/nba_master_shots_2004_2024.csv'
+SAMPLE_CSV = 'data/master/nba_master_shots_sample.csv'
+
+# Bytes before the watermark that must be unchanged for an append-only refresh
+FINGERPRINT_BYTES = 65536
+
+THREE_POINT_ZONES = ['Left Corner 3', 'Right Corner 3', 'Above the Break 3']
+PAINT_ZONES = ['Restricted Area', 'In The Paint (Non-RA)']
+
+# Running aggregate tables and their group keys
+TABLES = {
+    'team': ['TEAM_NAME', 'FILE_YEAR'],
+    'player': ['PLAYER_NAME', 'FILE_YEAR'],
+    'league': ['FILE_YEAR'],
+    'shot': ['SHOT_TYPE', 'BASIC_ZONE', 'FILE_YEAR'],
+    'situation': ['GAME_PERIOD', 'SHOT_TYPE', 'FILE_YEAR']
+}
+
+# Additive counting columns kept in every table
+COUNT_COLUMNS = [
+    'shots', 'attempts', 'makes', 'three_pt_shots', 'three_pt_made',
+    'two_pt_shots', 'two_pt_made', 'mid_range_shots', 'restricted_area_shots',
+    'three_point_zone_shots', 'paint_zone_shots', 'quarter_count',
+    'distance_count', 'time_count'
+]
+SUM_COLUMNS = ['distance_sum', 'distance_sumsq', 'time_sum']
+
+# Exact distinct sets: name -> (group keys, value column)
+DISTINCT_SETS = {
+    'team_players': (TABLES['team'], 'PLAYER_NAME'),
+    'team_games': (TABLES['team'], 'GAME_ID'),
+    'shot_players': (TABLES['shot'], 'PLAYER_NAME'),
+    'all_players': ([], 'PLAYER_NAME'),
+    'all_teams': ([], 'TEAM_NAME')
+}
+
+def season_year(file_path):
+    """Season year encoded in an NBA_<year>_Shots.csv file name."""
+    return int(os.path.basename(file_path).split('_')[1])
+
+def _fingerprint(file_path, offset):
+    """Hash of the bytes just before the watermark offset."""
+    start = max(0, offset - FINGERPRINT_BYTES)
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+def read_new_rows(file_path, watermark):
+    """Parse only the complete lines appended after the watermark.
+
+    Returns the new rows, the byte offset they end at and whether the file was
+    rewritten (in which case it is rescanned and filtered on GAME_ID instead).
+    """
+    size = os.path.getsize(file_path)
+    offset = watermark.get('offset', 0)
+
+    rewritten = offset > 0 and (size < offset or _fingerprint(file_path, offset) != watermark['fingerprint'])
+    if rewritten:
+        print(f"   ⚠️  {file_path} changed before the watermark, rescanning for unseen games")
+        offset = 0
+
+    if size == offset:
+        return pd.DataFrame(), offset, rewritten
+
+    with open(file_path, 'rb') as f:
+        f.seek(offset)
+        data = f.read()
+
+    # Leave a trailing partial line for the next run
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return pd.DataFrame(), offset, rewritten
+
+    if offset == 0:
+        df = pd.read_csv(io.BytesIO(data[:end]))
+    else:
+        df = pd.read_csv(io.BytesIO(data[:end]), header=None, names=watermark['columns'])
+
+    if rewritten:
+        processed = np.array(watermark.get('game_ids', []))
+        df = df[~np.isin(df['GAME_ID'].to_numpy(), processed)].reset_index(drop=True)
+
+    return df, offset + end, rewritten
+
+def add_derived_columns(df, year):
+    """Add the columns create_master_dataset.py derives for each shot."""
+    df['FILE_YEAR'] = year
+    df['DATA_SOURCE'] = f"NBA_{year}_Shots.csv"
+
+    if 'SEASON_1' in df.columns and 'SEASON_2' in df.columns:
+        df['SEASON'] = df['SEASON_1'].astype(str) + '-' + df['SEASON_2'].astype(str).str[-2:]
+    else:
+        df['SEASON'] = f"{year}-{str(year+1)[-2:]}"
+
+    df['TIME_REMAINING'] = df['MINS_LEFT'] * 60 + df['SECS_LEFT']
+    df['GAME_PERIOD'] = game_period(df['QUARTER'])
+    return df
+
+def delta_tables(df, first_row):
+    """Aggregate new shots into the running table layout."""
+    made = df['SHOT_MADE'] == True
+    three = df['SHOT_TYPE'] == '3PT Field Goal'
+    two = df['SHOT_TYPE'] == '2PT Field Goal'
+    zone = df['BASIC_ZONE']
+    distance = df['SHOT_DISTANCE']
+
+    counts = pd.DataFrame({
+        'shots': np.ones(len(df), dtype=np.int64),
+        'attempts': df['SHOT_MADE'].notna(),
+        'makes': made,
+        'three_pt_shots': three,
+        'three_pt_made': three & made,
+        'two_pt_shots': two,
+        'two_pt_made': two & made,
+        'mid_range_shots': zone == 'Mid-Range',
+        'restricted_area_shots': zone == 'Restricted Area',
+        'three_point_zone_shots': zone.isin(THREE_POINT_ZONES),
+        'paint_zone_shots': zone.isin(PAINT_ZONES),
+        'quarter_count': df['QUARTER'].notna(),
+        'distance_count': distance.notna(),
+        'time_count': df['TIME_REMAINING'].notna()
+    }, index=df.index).astype(np.int64)
+
+    counts['distance_sum'] = distance.fillna(0).astype(float)
+    counts['distance_sumsq'] = counts['distance_sum'] ** 2
+    counts['time_sum'] = df['TIME_REMAINING'].fillna(0).astype(float)
+    counts['first_seen'] = np.arange(first_row, first_row + len(df))
+
+    key_columns = sorted({key for keys in TABLES.values() for key in keys})
+    frame = pd.concat([df[key_columns], counts], axis=1)
+
+    tables = {}
+    for name, keys in TABLES.items():
+        grouped = frame.groupby(keys)
+        table = grouped[COUNT_COLUMNS + SUM_COLUMNS].sum()
+        table['first_seen'] = grouped['first_seen'].min()
+        tables[name] = table
+    return tables
+
+def merge_table(stored, delta):
+    """Add delta counts into a stored running table."""
+    if stored is None or stored.empty:
+        return delta
+
+    merged = stored[COUNT_COLUMNS + SUM_COLUMNS].add(delta[COUNT_COLUMNS + SUM_COLUMNS], fill_value=0)
+    merged[COUNT_COLUMNS] = merged[COUNT_COLUMNS].astype(np.int64)
+    merged['first_seen'] = pd.concat([stored['first_seen'], delta['first_seen']], axis=1).min(axis=1).astype(np.int64)
+    return merged.sort_index()
+
+def update_distinct_sets(distinct, df):
+    """Add the distinct values seen in new shots to the exact sets."""
+    for name, (keys, column) in DISTINCT_SETS.items():
+        groups = distinct.setdefault(name, {})
+        values = df[keys + [column]].dropna()
+        if keys:
+            for key, unique in values.groupby(keys)[column].unique().items():
+                key = key if isinstance(key, tuple) else (key,)
+                groups.setdefault(key, set()).update(unique.tolist())
+        else:
+            groups.setdefault((), set()).update(values[column].unique().tolist())
+
+def _state_path(state_dir, name, generation):
+    """Path of one state file; state saved before generations existed has no suffix."""
+    stem, ext = os.path.splitext(name)
+    return os.path.join(state_dir, f'{stem}.{generation}{ext}' if generation else name)
+
+def load_state(state_dir):
+    """Load watermarks, running tables, distinct sets and the sample (empty on first run)."""
+    state = {
+        'watermarks': {}, 'outputs_pending': False, 'generation': 0, 'master_bytes': None,
+        'master_fingerprint': None, 'master_rows': 0, 'tables': {}, 'distinct': {}, 'sample': None
+    }
+
+    watermark_path = os.path.join(state_dir, 'watermarks.json')
+    if os.path.exists(watermark_path):
+        with open(watermark_path, 'r') as f:
+            stored = json.load(f)
+        state['watermarks'] = stored['files']
+        state['outputs_pending'] = stored['outputs_pending']
+        state['generation'] = stored.get('generation', 0)
+        state['master_bytes'] = stored.get('master_bytes')
+        state['master_fingerprint'] = stored.get('master_fingerprint')
+        state['master_rows'] = stored.get('master_rows', 0)
+    generation = state['generation']
+
+    for name, keys in TABLES.items():
+        table_path = _state_path(state_dir, f'{name}.csv', generation)
+        if os.path.exists(table_path):
+            table = pd.read_csv(table_path, keep_default_na=False)
+            state['tables'][name] = table.set_index(keys)
+
+    distinct_path = _state_path(state_dir, 'distinct.json', generation)
+    if os.path.exists(distinct_path):
+        with open(distinct_path, 'r') as f:
+            stored = json.load(f)
+        for name, entries in stored.items():
+            state['distinct'][name] = {tuple(entry[:-1]): set(entry[-1]) for entry in entries}
+
+    sample_path = _state_path(state_dir, 'sample.csv', generation)
+    if os.path.exists(sample_path):
+        with open(sample_path, 'rb') as f:
+            state['sample'] = f.read()
+
+    return state
+
+def save_state(state, state_dir):
+    """Persist the state as a new generation, committed by replacing watermarks.json."""
+    os.makedirs(state_dir, exist_ok=True)
+    previous = state['generation']
+    generation = previous + 1
+
+    for name, table in state['tables'].items():
+        table.reset_index().to_csv(_state_path(state_dir, f'{name}.csv', generation), index=False)
+
+    distinct = {
+        name: [list(key) + [sorted(values)] for key, values in groups.items()]
+        for name, groups in state['distinct'].items()
+    }
+    with open(_state_path(state_dir, 'distinct.json', generation), 'w') as f:
+        json.dump(distinct, f)
+
+    if state['sample'] is not None:
+        with open(_state_path(state_dir, 'sample.csv', generation), 'wb') as f:
+            f.write(state['sample'])
+
+    watermark_path = os.path.join(state_dir, 'watermarks.json')
+    with open(watermark_path + '.tmp', 'w') as f:
+        json.dump({
+            'outputs_pending': state['outputs_pending'],
+            'generation': generation,
+            'master_bytes': state['master_bytes'],
+            'master_fingerprint': state['master_fingerprint'],
+            'master_rows': state['master_rows'],
+            'files': state['watermarks']
+        }, f, indent=2)
+    os.replace(watermark_path + '.tmp', watermark_path)
+    state['generation'] = generation
+
+    # The new generation is committed; drop the files it replaces
+    for name in [f'{name}.csv' for name in TABLES] + ['distinct.json', 'sample.csv']:
+        path = _state_path(state_dir, name, previous)
+        if os.path.exists(path):
+            os.remove(path)
+
+def recover_master_csv(state):
+    """Cut the master CSV back to the bytes the state accounts for.
+
+    Rows appended by a run that stopped before saving its state would
+    otherwise be appended a second time.
+    """
+    if state['master_bytes'] is None or not os.path.exists(MASTER_CSV):
+        return
+    size = os.path.getsize(MASTER_CSV)
+    if size < state['master_bytes'] or _fingerprint(MASTER_CSV, state['master_bytes']) != state['master_fingerprint']:
+        print("   ⚠️  The master CSV was rewritten outside delta ingest; run with --reset to rebuild the state")
+    elif size > state['master_bytes']:
+        print(f"   ⚠️  Dropping {size - state['master_bytes']:,} bytes of master CSV rows from an unfinished run")
+        with open(MASTER_CSV, 'r+b') as f:
+            f.truncate(state['master_bytes'])
+
+def update_sample(state):
+    """Reservoir-sample the master CSV rows appended since the state was saved.
+
+    Only the appended bytes are read: each new row replaces a random slot of
+    the SAMPLE_ROWS-row sample with probability SAMPLE_ROWS / rows seen, so the
+    sample stays uniform over the whole master CSV.
+    """
+    offset = state['master_bytes'] or 0
+    with open(MASTER_CSV, 'rb') as f:
+        header = f.readline()
+        if offset:
+            f.seek(offset)
+        data = f.read()
+    new_lines = data.splitlines(keepends=True)
+
+    lines = state['sample'].splitlines(keepends=True)[1:] if state['sample'] else []
+    seen = state['master_rows']
+    fill = min(SAMPLE_ROWS - len(lines), len(new_lines))
+    lines.extend(new_lines[:fill])
+
+    rest = len(new_lines) - fill
+    if rest:
+        rng = np.random.default_rng([SAMPLE_SEED, seen])
+        # Rows seen before each remaining new row; a draw below SAMPLE_ROWS names the slot it takes
+        before = seen + fill + np.arange(rest)
+        slots = rng.integers(0, before + 1)
+        for i in np.flatnonzero(slots < SAMPLE_ROWS):
+            lines[slots[i]] = new_lines[fill + i]
+
+    state['sample'] = header + b''.join(lines)
+    state['master_bytes'] = os.path.getsize(MASTER_CSV)
+    state['master_fingerprint'] = _fingerprint(MASTER_CSV, state['master_bytes'])
+    state['master_rows'] = seen + len(new_lines)
+
+def append_master_rows(df):
+    """Append new shots to the master CSV, keeping its column order."""
+    os.makedirs(os.path.dirname(MASTER_CSV), exist_ok=True)
+    if os.path.exists(MASTER_CSV):
+        columns = pd.read_csv(MASTER_CSV, nrows=0).columns.tolist()
+        df.reindex(columns=columns).to_csv(MASTER_CSV, mode='a', header=False, index=False)
+    else:
+        df.to_csv(MASTER_CSV, index=False)
+
+def ingest_file(file_path, state):
+    """Ingest the unseen rows of one season file into the running state."""
+    year = season_year(file_path)
+    watermark = state['watermarks'].get(file_path, {})
+
+    df, offset, rewritten = read_new_rows(file_path, watermark)
+    if df.empty:
+        if offset != watermark.get('offset', 0):
+            watermark.update({'offset': offset, 'fingerprint': _fingerprint(file_path, offset)})
+            state['watermarks'][file_path] = watermark
+        return 0
+
+    first_row = watermark.get('rows', 0)
+    previous_max_date = watermark.get('max_game_date')
+
+    dates = parse_game_dates(df['GAME_DATE'])
+    if previous_max_date is not None:
+        late = int((dates < pd.Timestamp(previous_max_date)).sum())
+        if late:
+            print(f"   ⚠️  {late:,} new rows dated before the {previous_max_date} watermark")
+
+    add_derived_columns(df, year)
+
+    for name, table in delta_tables(df, first_row).items():
+        state['tables'][name] = merge_table(state['tables'].get(name), table)
+    update_distinct_sets(state['distinct'], df)
+    append_master_rows(df)
+
+    game_ids = set(watermark.get('game_ids', [])) | set(df['GAME_ID'].dropna().astype(np.int64).tolist())
+    max_date = dates.max()
+    if previous_max_date is not None and not pd.isna(max_date):
+        max_date = max(max_date, pd.Timestamp(previous_max_date))
+
+    state['watermarks'][file_path] = {
+        'season': year,
+        'offset': offset,
+        'size': os.path.getsize(file_path),
+        'fingerprint': _fingerprint(file_path, offset),
+        'columns': watermark.get('columns') or [c for c in df.columns if c not in
+                                                ('FILE_YEAR', 'DATA_SOURCE', 'SEASON', 'TIME_REMAINING', 'GAME_PERIOD')],
+        'rows': first_row + len(df),
+        'max_game_date': None if pd.isna(max_date) else max_date.strftime('%Y-%m-%d'),
+        'game_ids': sorted(game_ids)
+    }
+
+    new_games = len(game_ids) - len(watermark.get('game_ids', []))
+    print(f"   {year}: +{len(df):,} shots, +{new_games} games{' (rescanned)' if rewritten else ''}")
+    return len(df)
+
+def build_comprehensive_data(tables):
+    """Rebuild the comprehensive team, player and league outputs from running counts."""
+    team_data = defaultdict(lambda: defaultdict(dict))
+    teams = tables['team'].reset_index().sort_values(['FILE_YEAR', 'first_seen'])
+    for row in teams.itertuples(index=False):
+        if row.TEAM_NAME == 'TEAM_NAME':
+            continue
+        normalized_name = normalize_team_name(row.TEAM_NAME)
+        year = int(row.FILE_YEAR)
+        team_data[normalized_name][year] = build_team_season(
+            normalized_name, year, int(row.shots), int(row.three_pt_shots), int(row.three_pt_made),
+            int(row.two_pt_shots), int(row.two_pt_made), int(row.mid_range_shots), int(row.restricted_area_shots)
+        )
+
+    # Same volume filters as process_player_data, applied to season-to-date totals
+    player_data = defaultdict(lambda: defaultdict(dict))
+    players = tables['player'].reset_index()
+    players = players[(players['shots'] >= 50) & (players['three_pt_shots'] >= 20)]
+    players = players.sort_values(['FILE_YEAR', 'shots', 'first_seen'], ascending=[True, False, True])
+    for row in players.itertuples(index=False):
+        if row.PLAYER_NAME == 'PLAYER_NAME':
+            continue
+        player_data[row.PLAYER_NAME][int(row.FILE_YEAR)] = build_player_season(
+            row.PLAYER_NAME, int(row.FILE_YEAR), int(row.shots), int(row.three_pt_shots), int(row.three_pt_made)
+        )
+
+    league_data = [
+        build_league_season(int(row.FILE_YEAR), int(row.shots), int(row.three_pt_shots), int(row.three_pt_made),
+                            int(row.two_pt_shots), int(row.two_pt_made), int(row.mid_range_shots))
+        for row in tables['league'].reset_index().sort_values('FILE_YEAR').itertuples(index=False)
+    ]
+
+    final_team_data = convert_team_data(team_data)
+    final_player_data = convert_player_data(player_data)
+    add_confidence_intervals(final_team_data, final_player_data, league_data)
+    return final_team_data, final_player_data, league_data
+
+def build_efficiency_comparison(tables):
+    """Zone points-per-attempt from the running shot-type/zone counts."""
+    shots = tables['shot'].groupby(level='BASIC_ZONE')
+    points = shots['three_pt_made'].sum() * 3 + shots['two_pt_made'].sum() * 2
+    attempts = shots['shots'].sum()
+    return efficiency_comparison(attempts.reindex(ZONES, fill_value=0), points.reindex(ZONES, fill_value=0))
+
+def _set_sizes(distinct, name, index):
+    """Distinct-set sizes aligned to a table index."""
+    groups = distinct.get(name, {})
+    return [len(groups.get(key if isinstance(key, tuple) else (key,), ())) for key in index]
+
+def build_analysis_datasets(tables, distinct):
+    """Rebuild the four create_master_dataset.py analysis datasets from running counts."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        player = tables['player']
+        player_career = pd.DataFrame({
+            'makes': player['makes'],
+            'attempts': player['attempts'],
+            'three_point_attempts': player['three_pt_shots'],
+            'zone_breakdown': [
+                {'three_point': np.int64(three), 'mid_range': np.int64(mid), 'paint': np.int64(paint)}
+                for three, mid, paint in zip(player['three_point_zone_shots'], player['mid_range_shots'], player['paint_zone_shots'])
+            ],
+            'avg_distance': (player['distance_sum'] / player['distance_count']).round(2),
+            'total_shots': player['quarter_count']
+        }, index=player.index).reset_index()
+
+        team = tables['team']
+        team_season = pd.DataFrame({
+            'makes': team['makes'],
+            'attempts': team['attempts'],
+            'three_point_attempts': team['three_pt_shots'],
+            'unique_players': _set_sizes(distinct, 'team_players', team.index),
+            'games_played': _set_sizes(distinct, 'team_games', team.index)
+        }, index=team.index).reset_index()
+
+        shot = tables['shot']
+        n = shot['distance_count']
+        variance = (shot['distance_sumsq'] - shot['distance_sum'] ** 2 / n) / (n - 1)
+        shot_analytics = pd.DataFrame({
+            'makes': shot['makes'],
+            'attempts': shot['attempts'],
+            'fg_percentage': (shot['makes'] / shot['attempts']).round(3),
+            'avg_distance': (shot['distance_sum'] / n).round(3),
+            'distance_std': np.sqrt(variance.where(n > 1)).round(3),
+            'unique_players': _set_sizes(distinct, 'shot_players', shot.index)
+        }, index=shot.index).reset_index()
+
+        situation = tables['situation']
+        situation_analytics = pd.DataFrame({
+            'makes': situation['makes'],
+            'attempts': situation['attempts'],
+            'fg_percentage': (situation['makes'] / situation['attempts']).round(3),
+            'avg_time_remaining': (situation['time_sum'] / situation['time_count']).round(3)
+        }, index=situation.index).reset_index()
+
+    return {
+        'player_career': player_career,
+        'team_season': team_season,
+        'shot_analytics': shot_analytics,
+        'situation_analytics': situation_analytics
+    }
+
+def update_metadata(state, analysis_datasets, publisher):
+    """Refresh data/master/metadata.json from the running state."""
+    metadata_path = 'data/master/metadata.json'
+    metadata = {}
+    if os.path.exists(metadata_path):
+        with open(metadata_path, 'r') as f:
+            metadata = json.load(f)
+
+    league = state['tables']['league']
+    years = league.index.get_level_values('FILE_YEAR')
+    metadata.update({
+        'creation_date': pd.Timestamp.now().isoformat(),
+        'total_shots': int(league['shots'].sum()),
+        'date_range': {
+            'start_year': int(years.min()),
+            'end_year': int(years.max())
+        },
+        'unique_players': len(state['distinct'].get('all_players', {}).get((), ())),
+        'unique_teams': len(state['distinct'].get('all_teams', {}).get((), ())),
+        'columns': pd.read_csv(MASTER_CSV, nrows=0).columns.tolist(),
+        'file_sizes': {
+            'master_csv_mb': round(os.path.getsize(MASTER_CSV) / 1024 / 1024, 2),
+            'sample_csv_mb': round(len(state['sample']) / 1024 / 1024, 2)
+        },
+        'sample': {
+            'method': 'reservoir',
+            'updated_incrementally': True,
+            'population_rows': state['master_rows']
+        },
+        'analysis_datasets': list(analysis_datasets.keys()),
+        'watermarks': {
+            str(watermark['season']): {
+                'max_game_date': watermark['max_game_date'],
+                'games': len(watermark['game_ids'])
+            }
+            for watermark in state['watermarks'].values()
+        }
+    })
+
+    publisher.add_json(metadata_path, metadata, indent=2)
+
+def main():
+    """Main delta ingestion function."""
+    parser = argparse.ArgumentParser(description="Ingest newly appended NBA shots into running aggregates")
+    parser.add_argument('files', nargs='*', help="Season CSVs to ingest (default: Data/NBA_*_Shots.csv)")
+    parser.add_argument('--state-dir', default=STATE_DIR, help="Where watermarks and running aggregates live")
+    parser.add_argument('--reset', action='store_true', help="Discard stored state and re-ingest every file")
+    args = parser.parse_args()
+
+    files = sorted(args.files or glob.glob("Data/NBA_*_Shots.csv"))
+    if not files:
+        print("❌ No NBA CSV files found in Data/ directory!")
+        return
+
+    if args.reset and os.path.exists(args.state_dir):
+        shutil.rmtree(args.state_dir)
+
+    state = load_state(args.state_dir)
+    if not state['watermarks'] and os.path.exists(MASTER_CSV):
+        # First run rebuilds the master CSV from the same rows it ingests
+        os.remove(MASTER_CSV)
+    recover_master_csv(state)
+
+    print(f"🏀 Delta ingest of {len(files)} season files...")
+    new_rows = sum(ingest_file(file_path, state) for file_path in files)
+
+    if not new_rows and not state['outputs_pending']:
+        save_state(state, args.state_dir)
+        print("✅ No new games since the last refresh")
+        return
+
+    # The master CSV already holds the new rows, so record them before publishing;
+    # a failed publish is retried by the next run even if no games arrive.
+    update_sample(state)
+    state['outputs_pending'] = True
+    save_state(state, args.state_dir)
+
+    # Rewrite the affected outputs from the running aggregates
+    team_data, player_data, league_data = build_comprehensive_data(state['tables'])
+    save_data(team_data, player_data, league_data, build_efficiency_comparison(state['tables']))
+    save_enhanced_data()
+
+    analysis_datasets = build_analysis_datasets(state['tables'], state['distinct'])
+    publisher = Publisher()
+    save_analysis_datasets(analysis_datasets, publisher)
+    publisher.add_bytes(SAMPLE_CSV, state['sample'])
+    update_metadata(state, analysis_datasets, publisher)
+    publisher.publish()
+
+    state['outputs_pending'] = False
+    save_state(state, args.state_dir)
+
+    print(f"\n🎉 Delta ingest complete: {new_rows:,} new shots")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+NBA Efficiency Surfaces
+Points-per-shot computed from the shots themselves: 1-ft LOC_X/LOC_Y grids of
+attempts and points (made-shot value from SHOT_TYPE), accumulated per season
+and team with one bincount, plus per-zone totals from the same pass.
+
+Surfaces are smoothed with a Gaussian kernel applied by FFT over the last two
+axes, so every season x team grid is convolved in one batched operation.
+Attempts and points are smoothed separately and divided (kernel regression),
+which keeps sparse cells from swinging between 0 and 3 points per shot.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Half-court grid in feet: LOC_X from the center line, LOC_Y from the baseline
+X_RANGE = (-25, 25)
+Y_RANGE = (0, 47)
+GRID_SHAPE = (Y_RANGE[1] - Y_RANGE[0], X_RANGE[1] - X_RANGE[0])
+
+DEFAULT_SIGMA = 1.5  # Feet
+OTHER_TEAM = 'Other'
+
+ZONES = ['Restricted Area', 'In The Paint (Non-RA)', 'Mid-Range', 'Left Corner 3',
+         'Right Corner 3', 'Above the Break 3', 'Backcourt']
+
+# efficiency_comparison keys and the zones each one covers
+EFFICIENCY_ZONES = {
+    'mid_range_efficiency': ['Mid-Range'],
+    'three_point_efficiency': ['Left Corner 3', 'Right Corner 3', 'Above the Break 3'],
+    'restricted_area_efficiency': ['Restricted Area']
+}
+
+def shot_points(df):
+    """Points scored by each shot: 3 or 2 when made, else 0."""
+    made = (df['SHOT_MADE'] == True).to_numpy()
+    value = np.where((df['SHOT_TYPE'] == '3PT Field Goal').to_numpy(), 3, 2)
+    return made * value
+
+class ShotGrids:
+    """Running attempt/point grids and zone totals per season and team."""
+
+    def __init__(self, teams=None):
+        # Without a team list everything accumulates into a single league row
+        self.teams = list(teams) + [OTHER_TEAM] if teams is not None else [OTHER_TEAM]
+        self._seasons = {}
+
+    def add(self, df, team_names=None):
+        """Accumulate a frame of shots; team_names (aligned to df) overrides TEAM_NAME."""
+        if df.empty:
+            return self
+        season_codes, seasons = pd.factorize(df['SEASON_1'].astype(int))
+        team_count = len(self.teams)
+        if len(self.teams) == 1:
+            team_codes = np.zeros(len(df), dtype=np.int64)
+        else:
+            names = df['TEAM_NAME'] if team_names is None else team_names
+            team_codes = pd.Categorical(names, categories=self.teams[:-1]).codes.astype(np.int64)
+            team_codes[team_codes < 0] = team_count - 1
+
+        points = shot_points(df)
+        rows, cols = GRID_SHAPE
+        x = np.floor(pd.to_numeric(df['LOC_X'], errors='coerce').to_numpy() - X_RANGE[0])
+        y = np.floor(pd.to_numeric(df['LOC_Y'], errors='coerce').to_numpy() - Y_RANGE[0])
+        in_grid = (x >= 0) & (x < cols) & (y >= 0) & (y < rows)
+
+        # One flat index per shot: (season, team, y, x)
+        cell = (season_codes * team_count + team_codes)[in_grid] * rows * cols
+        cell += y[in_grid].astype(np.int64) * cols + x[in_grid].astype(np.int64)
+        size = len(seasons) * team_count * rows * cols
+        attempts = np.bincount(cell, minlength=size).reshape(len(seasons), team_count, rows, cols)
+        scored = np.bincount(cell, weights=points[in_grid], minlength=size).reshape(attempts.shape)
+
+        # Zone totals cover every shot, including ones off the grid
+        zones = pd.Categorical(df['BASIC_ZONE'], categories=ZONES).codes.astype(np.int64)
+        known = zones >= 0
+        zone_cell = (season_codes * team_count + team_codes)[known] * len(ZONES) + zones[known]
+        zone_size = len(seasons) * team_count * len(ZONES)
+        zone_attempts = np.bincount(zone_cell, minlength=zone_size).reshape(len(seasons), team_count, len(ZONES))
+        zone_points = np.bincount(zone_cell, weights=points[known], minlength=zone_size).reshape(zone_attempts.shape)
+
+        for i, season in enumerate(seasons):
+            totals = self._seasons.setdefault(int(season), [0, 0, 0, 0])
+            for j, array in enumerate([attempts[i], scored[i], zone_attempts[i], zone_points[i]]):
+                totals[j] = totals[j] + array
+        return self
+
+    @property
+    def seasons(self):
+        return sorted(self._seasons)
+
+    def arrays(self):
+        """Stacked (attempts, points, zone_attempts, zone_points), season-major; empty when no shots were added."""
+        if not self._seasons:
+            team_count = len(self.teams)
+            grid = np.zeros((0, team_count) + GRID_SHAPE)
+            zones = np.zeros((0, team_count, len(ZONES)))
+            return grid, grid.copy(), zones, zones.copy()
+        stacked = [np.stack([self._seasons[s][j] for s in self.seasons]).astype(float) for j in range(4)]
+        return tuple(stacked)
+
+def gaussian_kernel_fft(shape, sigma):
+    """Real FFT of a normalized Gaussian kernel centred at the origin of a padded grid."""
+    rows = np.fft.fftfreq(shape[0]) * shape[0]
+    cols = np.fft.fftfreq(shape[1]) * shape[1]
+    kernel = np.exp(-(rows[:, None] ** 2 + cols[None, :] ** 2) / (2 * sigma ** 2))
+    return np.fft.rfft2(kernel / kernel.sum())
+
+def smooth(grids, sigma=DEFAULT_SIGMA):
+    """Gaussian-smooth every grid in a (..., rows, cols) array in one batched FFT convolution."""
+    rows, cols = grids.shape[-2:]
+    pad = int(np.ceil(3 * sigma))
+    # Zero padding keeps the circular convolution from wrapping across court edges
+    padded_shape = (rows + pad, cols + 2 * pad)
+    padded = np.zeros(grids.shape[:-2] + padded_shape)
+    padded[..., :rows, pad:pad + cols] = grids
+
+    spectrum = np.fft.rfft2(padded, axes=(-2, -1)) * gaussian_kernel_fft(padded_shape, sigma)
+    smoothed = np.fft.irfft2(spectrum, s=padded_shape, axes=(-2, -1))
+    return np.clip(smoothed[..., :rows, pad:pad + cols], 0, None)
+
+def points_per_shot_surface(attempts, points, sigma=DEFAULT_SIGMA, min_attempts=1.0):
+    """Smoothed points-per-shot; NaN where the smoothed attempt density is below min_attempts."""
+    smoothed_attempts = smooth(attempts, sigma)
+    smoothed_points = smooth(points, sigma)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(smoothed_attempts >= min_attempts, smoothed_points / smoothed_attempts, np.nan)
+
+def zone_points_per_shot(zone_attempts, zone_points):
+    """Points per shot for each zone (last axis); NaN for zones without attempts."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(zone_attempts > 0, zone_points / zone_attempts, np.nan)
+
+def efficiency_comparison(zone_attempts, zone_points):
+    """The efficiency_comparison block (points per attempt) from zone totals indexed like ZONES."""
+    zone_attempts = np.asarray(zone_attempts, dtype=float)
+    zone_points = np.asarray(zone_points, dtype=float)
+    comparison = {}
+    for key, zones in EFFICIENCY_ZONES.items():
+        columns = [ZONES.index(zone) for zone in zones]
+        attempts = zone_attempts[..., columns].sum()
+        comparison[key] = round(float(zone_points[..., columns].sum() / attempts), 2) if attempts else None
+    return comparison
+
+def efficiency_comparison_from_shots(df):
+    """efficiency_comparison for a frame of shots."""
+    grids = ShotGrids().add(df)
+    _, _, zone_attempts, zone_points = grids.arrays()
+    return efficiency_comparison(zone_attempts, zone_points)
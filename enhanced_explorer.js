@@ -39,10 +39,11 @@ class NBAAdvancedExplorer {
 
     async loadMasterData() {
         try {
+            await loadDataManifest();
             const [enhancedData, topShooters, teamConferences] = await Promise.all([
-                d3.json('data/scene4_data_enhanced.json'),
-                d3.json('data/top_30_three_point_shooters.json'),
-                d3.json('data/teams_by_conference.json')
+                d3.json(dataUrl('data/scene4_data_enhanced.json')),
+                d3.json(dataUrl('data/top_30_three_point_shooters.json')),
+                d3.json(dataUrl('data/teams_by_conference.json'))
             ]);
             
             this.data = enhancedData;
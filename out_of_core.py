@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Out-of-Core Grouping
+Hash-partitioned spill files for groupbys whose input does not fit in memory,
+plus helpers for working to a memory budget.
+
+Rows are routed to one of N partitions by a hash of their group key and
+appended to that partition's spill files, so every group lands whole in one
+partition. Each partition is then read back and aggregated on its own, and
+concatenating the partition results sorted by key gives exactly what a single
+in-memory groupby over all rows would. Rows keep their original order within
+a partition, so order-sensitive reductions (float sums, means) match too.
+Spill chunks are pickled so every dtype round-trips unchanged.
+
+A budget is planned before any work starts (plan_budget): what the process
+already uses and any fixed reservations come off the top, input is read in
+row chunks sized from the rest, and partitions are sized so one fits in a
+fixed share of it. A budget too small for that fails fast with the minimum
+that would work.
+"""
+
+import math
+import os
+import pickle
+import re
+import resource
+import shutil
+import sys
+import tempfile
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+SIZE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+# Share of the working budget one partition's rows may take; aggregation
+# (especially the Python-level lambdas) needs several times the raw rows
+PARTITION_SHARE = 0.125
+
+# Share of the working budget one input chunk may take; a chunk is copied a
+# few times over (reordered for the CSV, split across partitions)
+CHUNK_SHARE = 0.0625
+MIN_CHUNK_ROWS = 1000
+
+# Smallest working budget (after the process baseline and reservations) worth running with
+MIN_WORKING_BYTES = 32 << 20
+
+class MemoryBudgetError(ValueError):
+    """The memory limit cannot be met, even with the smallest chunks and partitions."""
+
+def parse_memory_size(text):
+    """Bytes in a size like '2G', '512MB', '1.5GiB' or '1073741824'."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:i?B)?\s*', str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"invalid memory size: {text!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+def peak_rss_bytes():
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def partition_count(estimated_bytes, budget):
+    """Partitions needed so each one's rows fit in a fixed share of the working budget."""
+    return max(1, math.ceil(estimated_bytes / (budget * PARTITION_SHARE)))
+
+def average_line_bytes(path, sample_lines=1000):
+    """Mean length of a CSV's data lines, from the first few."""
+    with open(path, 'rb') as f:
+        f.readline()
+        lines = [len(line) for _, line in zip(range(sample_lines), f)]
+    return sum(lines) / len(lines) if lines else 1
+
+def plan_budget(memory_limit, row_bytes, reserved_bytes=0):
+    """Working bytes and input chunk rows for a memory limit.
+
+    `row_bytes` is the in-memory size of one input row and `reserved_bytes`
+    memory held outside the chunked work. Raises MemoryBudgetError when the
+    limit leaves less than MIN_WORKING_BYTES.
+    """
+    baseline = peak_rss_bytes()
+    budget = memory_limit - baseline - reserved_bytes
+    if budget < MIN_WORKING_BYTES:
+        needed = baseline + reserved_bytes + MIN_WORKING_BYTES
+        raise MemoryBudgetError(
+            f"a {memory_limit / 2**20:,.0f} MB limit is too small: the process already uses "
+            f"{baseline / 2**20:,.0f} MB, {reserved_bytes / 2**20:,.0f} MB is reserved, and the chunked "
+            f"work needs at least {MIN_WORKING_BYTES / 2**20:,.0f} MB; use at least {math.ceil(needed / 2**20):,} MB"
+        )
+    return budget, max(MIN_CHUNK_ROWS, int(budget * CHUNK_SHARE / max(row_bytes, 1)))
+
+def partition_codes(key_frame, partitions):
+    """Partition of every row, from a stable hash of its group key."""
+    hashes = pd.util.hash_pandas_object(key_frame, index=False).to_numpy()
+    return (hashes % np.uint64(partitions)).astype(np.int64)
+
+class SpillPartitions:
+    """Named groups of hash-partitioned spill files in a temporary directory."""
+
+    def __init__(self, partitions, spill_dir=None):
+        self.partitions = partitions
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix='nba-spill-', dir=spill_dir)
+        self.bytes_written = 0
+        self._chunks = defaultdict(int)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cleanup()
+
+    def _partition_dir(self, name, partition):
+        return os.path.join(self.directory, name, f'{partition:04d}')
+
+    def add(self, name, df, keys):
+        """Append rows to the partitions their keys hash to."""
+        if df.empty:
+            return
+        codes = partition_codes(df[keys], self.partitions)
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+
+        for start, end in zip(starts, ends):
+            partition = int(sorted_codes[start])
+            directory = self._partition_dir(name, partition)
+            os.makedirs(directory, exist_ok=True)
+            chunk = self._chunks[name, partition]
+            path = os.path.join(directory, f'{chunk:06d}.pkl')
+            with open(path, 'wb') as f:
+                pickle.dump(df.iloc[order[start:end]], f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._chunks[name, partition] = chunk + 1
+            self.bytes_written += os.path.getsize(path)
+
+    def read(self, name):
+        """Yield each non-empty partition's rows, in the order they were added."""
+        for partition in range(self.partitions):
+            chunks = self._chunks.get((name, partition), 0)
+            if not chunks:
+                continue
+            frames = []
+            for chunk in range(chunks):
+                with open(os.path.join(self._partition_dir(name, partition), f'{chunk:06d}.pkl'), 'rb') as f:
+                    frames.append(pickle.load(f))
+            yield pd.concat(frames, sort=False) if len(frames) > 1 else frames[0]
+
+    def cleanup(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+def grouped_out_of_core(spill, name, keys, aggregate):
+    """Aggregate every partition of a spill group and merge the results in key order.
+
+    `aggregate` must group by `keys` and return them as columns (reset_index).
+    """
+    results = [result for result in (aggregate(frame) for frame in spill.read(name)) if not result.empty]
+    if not results:
+        return pd.DataFrame()
+    merged = pd.concat(results, ignore_index=True, sort=False)
+    return merged.sort_values(keys, kind='stable').reset_index(drop=True)
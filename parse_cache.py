@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+NBA Parse Cache
+Stores each season CSV's parsed DataFrame in a binary format so the processing
+scripts stop re-parsing the same ~1 GB of raw CSV text on every refresh.
+
+Entries are keyed by the source path and validated against its size, mtime and
+SHA-256 content hash. A size or mtime change invalidates the entry, except when
+only the mtime moved and the content hash still matches (e.g. a fresh checkout).
+Frames themselves are stored by content hash, so identical copies of a season
+file (Data/NBA_2004_Shots.csv and ./NBA_2004_Shots.csv) share one parse.
+Frames are stored as Feather when pyarrow is installed and pickled otherwise.
+A data-quality report computed while parsing is kept in the entry as well,
+along with the frame's dtypes so iter_shots_csv can stream the file in chunks
+that match a whole-file parse.
+
+The cached frame is exactly what pd.read_csv returns, with its inferred
+dtypes; team names are not normalized here. create_master_dataset.py and
+delta_ingest.py publish raw TEAM_NAME values in the master CSV, and
+data_quality.py reports names that normalize_team_name cannot map. Scripts
+that aggregate by franchise normalize names themselves.
+
+Also home to small parsing helpers shared by the processing scripts.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+CACHE_DIR = 'data/cache/parsed'
+
+# Bump when the way frames are parsed changes so old entries are discarded
+CACHE_VERSION = 1
+
+# Rows parsed (and validated) at a time when a quality report is requested
+PARSE_CHUNK_ROWS = 500000
+
+def file_digest(file_path, block_size=1 << 20):
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _meta_path(file_path, cache_dir):
+    """Metadata path for a source file's cache entry."""
+    source = os.path.abspath(file_path)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    key = hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, f'{stem}-{key}.json')
+
+def _frame_base(cache_dir, sha256):
+    """Frame path (without extension) for a content hash."""
+    return os.path.join(cache_dir, f'frames-v{CACHE_VERSION}', sha256)
+
+def _source_stat(file_path):
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def _is_fresh(meta, file_path, meta_path):
+    """Check a cache entry against the source file, refreshing a stale mtime."""
+    if meta.get('version') != CACHE_VERSION or meta.get('source') != os.path.abspath(file_path):
+        return False
+
+    current = _source_stat(file_path)
+    if current['size'] != meta['size']:
+        return False
+    if current['mtime_ns'] == meta['mtime_ns']:
+        return True
+
+    # Same size, new mtime: trust the entry only if the content is unchanged
+    if file_digest(file_path) != meta['sha256']:
+        return False
+    meta['mtime_ns'] = current['mtime_ns']
+    _write_json(meta_path, meta)
+    return True
+
+def _write_json(path, data):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_path, path)
+
+def _read_frame(base):
+    """Read a stored frame, or None when no frame exists for this content."""
+    if os.path.exists(base + '.feather'):
+        return pd.read_feather(base + '.feather')
+    if os.path.exists(base + '.pkl'):
+        with open(base + '.pkl', 'rb') as f:
+            return pickle.load(f)
+    return None
+
+def _write_frame(base, df):
+    """Write a frame as Feather, falling back to pickle for columns Arrow cannot hold."""
+    if HAS_PYARROW:
+        temp_path = base + '.feather.tmp'
+        try:
+            df.to_feather(temp_path)
+            os.replace(temp_path, base + '.feather')
+            return 'feather'
+        except (TypeError, ValueError, pyarrow.lib.ArrowException):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    temp_path = base + '.pkl.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, base + '.pkl')
+    return 'pickle'
+
+def _cached_report(meta, meta_path, report, df):
+    """Fill a report from a cache entry, validating the frame once if the entry has none."""
+    cached = meta.get('quality')
+    if cached and cached.get('version') == report.VERSION:
+        report.load(cached['report'])
+        return
+    report.validate_chunk(df).finish()
+    meta['quality'] = {'version': report.VERSION, 'report': report.to_dict()}
+    _write_json(meta_path, meta)
+
+def _parse_csv(file_path, report=None):
+    """Parse a CSV, running the report's checks on each chunk as it is parsed."""
+    if report is None:
+        return pd.read_csv(file_path)
+    chunks = []
+    for chunk in pd.read_csv(file_path, chunksize=PARSE_CHUNK_ROWS):
+        report.validate_chunk(chunk)
+        chunks.append(chunk)
+    report.finish()
+    if not chunks:
+        return pd.read_csv(file_path)
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+def read_shots_csv(file_path, cache_dir=CACHE_DIR, report=None):
+    """Return the parsed frame for a season CSV, parsing it only on a cache miss.
+
+    A `report` (data_quality.QualityReport) is filled during the parse and
+    cached with the frame; on a cache hit it is restored from the entry.
+    """
+    meta_path = _meta_path(file_path, cache_dir)
+
+    if os.path.exists(meta_path):
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if _is_fresh(meta, file_path, meta_path):
+                df = _read_frame(_frame_base(cache_dir, meta['sha256']))
+                if df is not None:
+                    if report is not None:
+                        _cached_report(meta, meta_path, report, df)
+                    return df
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError):
+            pass  # Unreadable entry: fall through and re-parse
+
+    # Key the entry on the source as it was before parsing began
+    meta = {
+        'version': CACHE_VERSION,
+        'source': os.path.abspath(file_path),
+        **_source_stat(file_path),
+        'sha256': file_digest(file_path)
+    }
+    base = _frame_base(cache_dir, meta['sha256'])
+
+    try:
+        df = _read_frame(base)
+    except (OSError, ValueError, pickle.UnpicklingError):
+        df = None
+    if df is not None:
+        meta['format'] = 'feather' if os.path.exists(base + '.feather') else 'pickle'
+        meta['rows'] = len(df)
+        meta['dtypes'] = _dtype_names(df)
+        if report is not None:
+            _cached_report(meta, meta_path, report, df)
+        else:
+            _write_json(meta_path, meta)
+        return df
+
+    df = _parse_csv(file_path, report)
+    meta['rows'] = len(df)
+    meta['dtypes'] = _dtype_names(df)
+    if report is not None:
+        meta['quality'] = {'version': report.VERSION, 'report': report.to_dict()}
+
+    try:
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        meta['format'] = _write_frame(base, df)
+        _write_json(meta_path, meta)
+    except OSError as e:
+        print(f"⚠️  Could not cache {file_path}: {e}")
+
+    return df
+
+def _dtype_names(df):
+    return {column: str(dtype) for column, dtype in df.dtypes.items()}
+
+def _cached_entry(file_path, cache_dir):
+    """A fresh cache entry's metadata, or None."""
+    meta_path = _meta_path(file_path, cache_dir)
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+        return meta if _is_fresh(meta, file_path, meta_path) else None
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _combined_dtype(dtypes):
+    """Dtype of a column whose chunks parsed as `dtypes`, as one parse of the whole file gives it."""
+    if all(dtype == dtypes[0] for dtype in dtypes):
+        return dtypes[0]
+    # Text anywhere makes the whole column text
+    for dtype in dtypes:
+        if isinstance(dtype, pd.StringDtype):
+            return dtype
+    if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in dtypes):
+        return np.result_type(*dtypes)
+    return np.dtype(object)
+
+def iter_shots_csv(file_path, chunk_rows, cache_dir=CACHE_DIR, report=None):
+    """Yield a season CSV's rows in chunks of `chunk_rows`, never holding the whole file.
+
+    Each chunk is cast to the dtypes a whole-file parse gives (a column that is
+    int in one chunk and float in another is float throughout, and text columns
+    are read as text in every chunk), so the chunks concatenate to the frame
+    read_shots_csv returns. Those dtypes and the quality report come from the
+    parse cache when it has them; otherwise a first chunked pass over the file
+    finds the dtypes and fills the report.
+    """
+    meta = _cached_entry(file_path, cache_dir)
+    quality = (meta or {}).get('quality')
+    cached_report = report is None or (quality and quality.get('version') == report.VERSION)
+    if meta and 'dtypes' in meta and cached_report:
+        dtypes = {column: pd.api.types.pandas_dtype(name) for column, name in meta['dtypes'].items()}
+        if report is not None:
+            report.load(quality['report'])
+    else:
+        chunk_dtypes = []
+        for chunk in pd.read_csv(file_path, chunksize=chunk_rows):
+            if report is not None:
+                report.validate_chunk(chunk)
+            chunk_dtypes.append(chunk.dtypes.to_dict())
+        if report is not None:
+            report.finish()
+        if not chunk_dtypes:
+            return
+        dtypes = {column: _combined_dtype([d[column] for d in chunk_dtypes]) for column in chunk_dtypes[0]}
+
+    text_columns = {column: dtype for column, dtype in dtypes.items() if isinstance(dtype, pd.StringDtype)}
+    for chunk in pd.read_csv(file_path, chunksize=chunk_rows, dtype=text_columns):
+        mismatched = {column: dtype for column, dtype in dtypes.items() if chunk[column].dtype != dtype}
+        yield chunk.astype(mismatched) if mismatched else chunk
+
+def parse_game_dates(dates):
+    """Parse GAME_DATE strings (MM-DD-YYYY in the source files)."""
+    parsed = pd.to_datetime(dates, format='%m-%d-%Y', errors='coerce')
+    unparsed = parsed.isna() & pd.Series(dates).notna().to_numpy()
+    if unparsed.any():
+        parsed = pd.Series(parsed)
+        parsed[unparsed] = pd.to_datetime(pd.Series(dates)[unparsed], format='mixed', errors='coerce')
+    return pd.Series(parsed)
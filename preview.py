@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+NBA Preview Sampling
+Seeded, season-stratified sampling for the processing scripts' --preview mode.
+
+Every season keeps the same fraction of its shots, so aggregations run on a
+small sample. Count fields in the resulting records are scaled back up by each
+season's population/sample ratio. Rates are left as estimated from the sample
+and get a standard error (with finite population correction) attached, so a
+chart can be checked in seconds without mistaking preview numbers for final
+ones.
+
+Preview artifacts never overwrite production files: they are written under
+data/preview/ with a manifest of their own, and every one is wrapped with the
+approximate-output marker.
+"""
+
+import argparse
+import math
+import os
+
+import numpy as np
+
+from publish import SITE_DATA_DIR, Publisher
+
+DEFAULT_SEED = 2004
+
+PREVIEW_DIR = os.path.join(SITE_DATA_DIR, 'preview')
+
+# Count fields the processing scripts emit, scaled back to season totals
+COUNT_FIELDS = ['total_shots', 'made_shots', 'three_pt_shots', 'three_pt_made', 'made_threes', 'two_pt_shots',
+                'two_pt_made', 'mid_range_shots', 'paint_shots']
+
+# Proportion fields and the count field holding their sample denominator
+PROPORTION_FIELDS = {
+    'three_pt_rate': 'total_shots',
+    'mid_range_rate': 'total_shots',
+    'paint_rate': 'total_shots',
+    'fg_percentage': 'total_shots',
+    'three_pt_percentage': 'three_pt_shots',
+    'two_pt_percentage': 'two_pt_shots'
+}
+
+def preview_fraction(value):
+    """argparse type for --preview: a fraction in (0, 1]."""
+    fraction = float(value)
+    if not 0 < fraction <= 1:
+        raise argparse.ArgumentTypeError("preview fraction must be in (0, 1]")
+    return fraction
+
+def add_preview_arguments(parser):
+    """Add the shared --preview/--seed options to a script's parser."""
+    parser.add_argument('--preview', type=preview_fraction, metavar='FRACTION',
+                        help="Run on a season-stratified sample of this fraction of shots (approximate output)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="Sampling seed for --preview")
+
+class PreviewSample:
+    """Draws the stratified sample and turns sample records into season estimates."""
+
+    def __init__(self, fraction, seed=DEFAULT_SEED):
+        self.fraction = fraction
+        self.seed = seed
+        self.population = {}
+        self.sampled = {}
+
+    def sample(self, df, strata='SEASON_1'):
+        """Keep the same fraction of rows from every season, in the original row order."""
+        rng = np.random.default_rng(self.seed)
+        keys = rng.random(len(df))
+
+        # Rank rows within their season by a random key and keep the lowest ranks
+        seasons = df[strata].to_numpy()
+        order = np.lexsort((keys, seasons))
+        sorted_seasons = seasons[order]
+        starts = np.flatnonzero(np.r_[True, sorted_seasons[1:] != sorted_seasons[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        rank = np.arange(len(order)) - np.repeat(starts, sizes)
+        keep_counts = np.maximum(1, np.round(sizes * self.fraction).astype(np.int64))
+
+        keep = np.zeros(len(df), dtype=bool)
+        keep[order[rank < np.repeat(keep_counts, sizes)]] = True
+
+        for season, size, kept in zip(sorted_seasons[starts], sizes, keep_counts):
+            self.population[int(season)] = int(size)
+            self.sampled[int(season)] = int(kept)
+
+        return df[keep]
+
+    def scale(self, season):
+        """Population/sample ratio for one season."""
+        return self.population[season] / self.sampled[season]
+
+    def threshold(self, value):
+        """A population-level volume filter expressed in sample counts."""
+        return max(1, math.ceil(value * self.fraction))
+
+    def annotate(self, record, season, denominators=None):
+        """Attach standard errors computed from sample counts, then scale the counts in place.
+
+        `denominators` overrides PROPORTION_FIELDS for records that name their rates differently.
+        """
+        correction = math.sqrt(max(0.0, 1 - self.sampled[season] / self.population[season]))
+        errors = {}
+
+        for field, denominator in {**PROPORTION_FIELDS, **(denominators or {})}.items():
+            n = record.get(denominator)
+            if field in record and n:
+                p = record[field] / 100
+                errors[field] = _percentage_error(p * (1 - p), n, correction)
+
+        n = record.get('total_shots')
+        if 'efg_percentage' in record and n:
+            errors['efg_percentage'] = _percentage_error(_efg_variance(record), n, correction)
+
+        scale = self.scale(season)
+        for field in COUNT_FIELDS:
+            if field in record:
+                record[field] = int(round(record[field] * scale))
+
+        record['standard_errors'] = errors
+        return record
+
+    def metadata(self):
+        """Marker added to every preview artifact."""
+        return {
+            'approximate': True,
+            'fraction': self.fraction,
+            'seed': self.seed,
+            'sampled_shots': sum(self.sampled.values()),
+            'population_shots': sum(self.population.values()),
+            'note': "Preview run: counts are scaled up from a season-stratified sample and "
+                    "rates carry standard errors in percentage points"
+        }
+
+class PreviewPublisher(Publisher):
+    """Publisher that redirects artifacts to PREVIEW_DIR and marks each one approximate."""
+
+    def __init__(self, preview, **kwargs):
+        super().__init__(manifest_path=os.path.join(PREVIEW_DIR, 'manifest.json'), versioned=False, **kwargs)
+        self.preview = preview
+
+    def add_json(self, path, data, **dump_kwargs):
+        """Queue `data` under the preview directory as {'preview': marker, 'data': data}."""
+        target = os.path.join(PREVIEW_DIR, os.path.relpath(path, SITE_DATA_DIR))
+        super().add_json(target, {'preview': self.preview.metadata(), 'data': data}, **dump_kwargs)
+
+    def add_csv(self, path, df, **csv_kwargs):
+        raise TypeError("Preview artifacts must be JSON so they can carry the approximate marker")
+
+    def add_bytes(self, path, data):
+        raise TypeError("Preview artifacts must be JSON so they can carry the approximate marker")
+
+def _percentage_error(variance, n, correction):
+    return round(math.sqrt(max(variance, 0.0) / n) * correction * 100, 2)
+
+def _efg_variance(record):
+    """Variance of per-shot eFG value v in {0, 1, 1.5}, from the record's counts or rates."""
+    n = record['total_shots']
+    if 'three_pt_made' in record and 'two_pt_made' in record:
+        fg = (record['two_pt_made'] + record['three_pt_made']) / n
+        made_three_share = record['three_pt_made'] / n
+    else:
+        fg = record['fg_percentage'] / 100
+        made_three_share = (record['efg_percentage'] / 100 - fg) / 0.5
+    efg = fg + 0.5 * made_three_share
+    # E[v^2] = P(made 2) * 1 + P(made 3) * 2.25
+    second_moment = (fg - made_three_share) + 2.25 * made_three_share
+    return second_moment - efg ** 2
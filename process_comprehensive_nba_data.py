@@ -6,10 +6,16 @@ Processes all NBA shot CSV files (2004-2024) to extract real team and player dat
 
 import pandas as pd
 import numpy as np
-import json
 import glob
 from collections import defaultdict
-import os
+import zlib
+import argparse
+
+from confidence_intervals import attach_confidence_intervals, season_records
+from efficiency_surfaces import ShotGrids, efficiency_comparison
+from parse_cache import read_shots_csv
+from preview import PREVIEW_DIR, PreviewPublisher, PreviewSample, add_preview_arguments
+from publish import Publisher
 
 # Team name mappings
 TEAM_NAME_MAPPINGS = {
@@ -25,7 +31,7 @@ def normalize_team_name(team_name):
     """Normalize team names to handle relocations and rebranding."""
     return TEAM_NAME_MAPPINGS.get(team_name, team_name)
 
-def load_and_process_all_data():
+def load_and_process_all_data(preview=None):
     """Load and process all NBA CSV files to extract comprehensive team and player data."""
     print("🏀 Starting comprehensive NBA data processing...")
     
@@ -33,6 +39,7 @@ def load_and_process_all_data():
     team_data = defaultdict(lambda: defaultdict(dict))
     player_data = defaultdict(lambda: defaultdict(dict))
     league_data = []
+    shot_grids = ShotGrids()
     
     # Get all CSV files
     csv_files = sorted(glob.glob("NBA_*_Shots.csv"))
@@ -43,24 +50,27 @@ def load_and_process_all_data():
         print(f"📊 Processing {csv_file} (Year: {year})...")
         
         try:
-            # Load CSV in chunks to handle memory efficiently
-            chunks = []
-            for chunk in pd.read_csv(csv_file, chunksize=10000):
-                chunks.append(chunk)
-            df = pd.concat(chunks, ignore_index=True)
+            # Load the parsed season (cached after the first parse)
+            df = read_shots_csv(csv_file)
             
             print(f"   Loaded {len(df):,} shots")
+            if preview:
+                df = preview.sample(df)
+                print(f"   ⚡ Preview sample: {len(df):,} shots")
             
             # Process team data for this year
-            process_team_data(df, year, team_data)
+            process_team_data(df, year, team_data, preview)
             
             # Process player data for this year  
-            process_player_data(df, year, player_data)
+            process_player_data(df, year, player_data, preview)
             
             # Calculate league-wide statistics
-            league_stats = calculate_league_stats(df, year)
+            league_stats = calculate_league_stats(df, year, preview)
             league_data.append(league_stats)
             
+            # Zone points-per-shot totals
+            shot_grids.add(df)
+            
             print(f"   ✅ Completed {year}")
             
         except Exception as e:
@@ -73,9 +83,22 @@ def load_and_process_all_data():
     final_team_data = convert_team_data(team_data)
     final_player_data = convert_player_data(player_data)
     
-    return final_team_data, final_player_data, league_data
+    # Preview records already carry standard errors from the sample
+    if not preview:
+        add_confidence_intervals(final_team_data, final_player_data, league_data)
+    
+    _, _, zone_attempts, zone_points = shot_grids.arrays()
+    efficiency = efficiency_comparison(zone_attempts, zone_points)
+    
+    return final_team_data, final_player_data, league_data, efficiency
 
-def process_team_data(df, year, team_data):
+def add_confidence_intervals(team_data, player_data, league_data):
+    """Attach 95% confidence intervals to every published percentage."""
+    attach_confidence_intervals(season_records(team_data))
+    attach_confidence_intervals(season_records(player_data))
+    attach_confidence_intervals(league_data, decimals=2)
+
+def process_team_data(df, year, team_data, preview=None):
     """Process team-level data for a given year."""
     
     for team_name in df['TEAM_NAME'].unique():
@@ -95,43 +118,58 @@ def process_team_data(df, year, team_data):
         two_pt_shots = len(team_df[team_df['SHOT_TYPE'] == '2PT Field Goal'])
         two_pt_made = len(team_df[(team_df['SHOT_TYPE'] == '2PT Field Goal') & (team_df['SHOT_MADE'] == True)])
         
-        # Calculate rates and percentages
-        three_pt_rate = (three_pt_shots / total_shots * 100) if total_shots > 0 else 0
-        three_pt_percentage = (three_pt_made / three_pt_shots * 100) if three_pt_shots > 0 else 0
-        two_pt_percentage = (two_pt_made / two_pt_shots * 100) if two_pt_shots > 0 else 0
-        
         # Calculate zones
         mid_range_shots = len(team_df[team_df['BASIC_ZONE'] == 'Mid-Range'])
         paint_shots = len(team_df[team_df['BASIC_ZONE'] == 'Restricted Area'])
         
-        mid_range_rate = (mid_range_shots / total_shots * 100) if total_shots > 0 else 0
-        paint_rate = (paint_shots / total_shots * 100) if total_shots > 0 else 0
-        
         # Store team data
-        team_data[normalized_name][year] = {
-            'season': year,
-            'team': normalized_name,
-            'total_shots': total_shots,
-            'three_pt_shots': three_pt_shots,
-            'three_pt_made': three_pt_made,
-            'three_pt_rate': round(three_pt_rate, 1),
-            'three_pt_percentage': round(three_pt_percentage, 1),
-            'two_pt_shots': two_pt_shots,
-            'two_pt_made': two_pt_made,
-            'two_pt_percentage': round(two_pt_percentage, 1),
-            'mid_range_shots': mid_range_shots,
-            'mid_range_rate': round(mid_range_rate, 1),
-            'paint_shots': paint_shots,
-            'paint_rate': round(paint_rate, 1),
-            'efg_percentage': round(((two_pt_made + 1.5 * three_pt_made) / total_shots * 100), 1) if total_shots > 0 else 0
-        }
+        team_data[normalized_name][year] = build_team_season(
+            normalized_name, year, total_shots, three_pt_shots, three_pt_made,
+            two_pt_shots, two_pt_made, mid_range_shots, paint_shots
+        )
+        if preview:
+            preview.annotate(team_data[normalized_name][year], year)
+
+def build_team_season(team, year, total_shots, three_pt_shots, three_pt_made,
+                      two_pt_shots, two_pt_made, mid_range_shots, paint_shots):
+    """Build one team-season record from its shot counts."""
+    
+    # Calculate rates and percentages
+    three_pt_rate = (three_pt_shots / total_shots * 100) if total_shots > 0 else 0
+    three_pt_percentage = (three_pt_made / three_pt_shots * 100) if three_pt_shots > 0 else 0
+    two_pt_percentage = (two_pt_made / two_pt_shots * 100) if two_pt_shots > 0 else 0
+    
+    mid_range_rate = (mid_range_shots / total_shots * 100) if total_shots > 0 else 0
+    paint_rate = (paint_shots / total_shots * 100) if total_shots > 0 else 0
+    
+    return {
+        'season': year,
+        'team': team,
+        'total_shots': total_shots,
+        'three_pt_shots': three_pt_shots,
+        'three_pt_made': three_pt_made,
+        'three_pt_rate': round(three_pt_rate, 1),
+        'three_pt_percentage': round(three_pt_percentage, 1),
+        'two_pt_shots': two_pt_shots,
+        'two_pt_made': two_pt_made,
+        'two_pt_percentage': round(two_pt_percentage, 1),
+        'mid_range_shots': mid_range_shots,
+        'mid_range_rate': round(mid_range_rate, 1),
+        'paint_shots': paint_shots,
+        'paint_rate': round(paint_rate, 1),
+        'efg_percentage': round(((two_pt_made + 1.5 * three_pt_made) / total_shots * 100), 1) if total_shots > 0 else 0
+    }
 
-def process_player_data(df, year, player_data):
+def process_player_data(df, year, player_data, preview=None):
     """Process player-level data for a given year."""
     
+    # Volume filters are population counts; a preview sample applies them scaled down
+    min_shots = preview.threshold(50) if preview else 50
+    min_three_pt_shots = preview.threshold(20) if preview else 20
+    
     # Focus on players with significant shot volume (50+ shots per season)
     player_shot_counts = df['PLAYER_NAME'].value_counts()
-    significant_players = player_shot_counts[player_shot_counts >= 50].index
+    significant_players = player_shot_counts[player_shot_counts >= min_shots].index
     
     for player_name in significant_players:
         if pd.isna(player_name) or player_name == 'PLAYER_NAME':
@@ -146,24 +184,32 @@ def process_player_data(df, year, player_data):
         three_pt_made = len(player_df[(player_df['SHOT_TYPE'] == '3PT Field Goal') & (player_df['SHOT_MADE'] == True)])
         
         # Only process if player has significant three-point volume
-        if three_pt_shots < 20:  # At least 20 three-point attempts
+        if three_pt_shots < min_three_pt_shots:  # At least 20 three-point attempts
             continue
             
-        three_pt_rate = (three_pt_shots / total_shots * 100) if total_shots > 0 else 0
-        three_pt_percentage = (three_pt_made / three_pt_shots * 100) if three_pt_shots > 0 else 0
-        
         # Store player data
-        player_data[player_name][year] = {
-            'season': year,
-            'player': player_name,
-            'total_shots': total_shots,
-            'three_pt_shots': three_pt_shots,
-            'made_threes': three_pt_made,
-            'three_pt_rate': round(three_pt_rate, 1),
-            'three_pt_percentage': round(three_pt_percentage, 1)
-        }
+        player_data[player_name][year] = build_player_season(
+            player_name, year, total_shots, three_pt_shots, three_pt_made
+        )
+        if preview:
+            preview.annotate(player_data[player_name][year], year)
 
-def calculate_league_stats(df, year):
+def build_player_season(player, year, total_shots, three_pt_shots, three_pt_made):
+    """Build one player-season record from its shot counts."""
+    three_pt_rate = (three_pt_shots / total_shots * 100) if total_shots > 0 else 0
+    three_pt_percentage = (three_pt_made / three_pt_shots * 100) if three_pt_shots > 0 else 0
+    
+    return {
+        'season': year,
+        'player': player,
+        'total_shots': total_shots,
+        'three_pt_shots': three_pt_shots,
+        'made_threes': three_pt_made,
+        'three_pt_rate': round(three_pt_rate, 1),
+        'three_pt_percentage': round(three_pt_percentage, 1)
+    }
+
+def calculate_league_stats(df, year, preview=None):
     """Calculate league-wide statistics for a given year."""
     
     total_shots = len(df)
@@ -174,6 +220,15 @@ def calculate_league_stats(df, year):
     
     mid_range_shots = len(df[df['BASIC_ZONE'] == 'Mid-Range'])
     
+    league_season = build_league_season(year, total_shots, three_pt_shots, three_pt_made,
+                                        two_pt_shots, two_pt_made, mid_range_shots)
+    if preview:
+        preview.annotate(league_season, year)
+    return league_season
+
+def build_league_season(year, total_shots, three_pt_shots, three_pt_made,
+                        two_pt_shots, two_pt_made, mid_range_shots):
+    """Build one league-season record from its shot counts."""
     return {
         'season': year,
         'total_shots': total_shots,
@@ -181,7 +236,10 @@ def calculate_league_stats(df, year):
         'mid_range_rate': round((mid_range_shots / total_shots * 100), 2) if total_shots > 0 else 0,
         'fg_percentage': round(((two_pt_made + three_pt_made) / total_shots * 100), 2) if total_shots > 0 else 0,
         'efg_percentage': round(((two_pt_made + 1.5 * three_pt_made) / total_shots * 100), 2) if total_shots > 0 else 0,
+        'made_shots': two_pt_made + three_pt_made,
         'three_pt_shots': three_pt_shots,
+        'three_pt_made': three_pt_made,
+        'two_pt_made': two_pt_made,
         'mid_range_shots': mid_range_shots
     }
 
@@ -195,11 +253,13 @@ def convert_team_data(team_data):
             season_data = seasons[year]
             
             # Add simulated wins and playoff data based on performance
-            # Better teams (higher efficiency) tend to win more
+            # Better teams (higher efficiency) tend to win more. The noise is
+            # seeded per team-season so every run publishes the same values.
+            rng = np.random.default_rng(zlib.crc32(f"{team_name}:{year}".encode('utf-8')))
             efg = season_data.get('efg_percentage', 50)
             base_wins = 35 + (efg - 45) * 2  # Scale based on efficiency
-            wins = max(15, min(70, int(base_wins + np.random.normal(0, 8))))
-            playoffs = wins >= 42 and np.random.random() > 0.3
+            wins = max(15, min(70, int(base_wins + rng.normal(0, 8))))
+            playoffs = bool(wins >= 42 and rng.random() > 0.3)
             
             season_data.update({
                 'wins': wins,
@@ -239,7 +299,7 @@ def convert_player_data(player_data):
     result.sort(key=lambda x: sum(s.get('made_threes', 0) for s in x['seasons']), reverse=True)
     return result[:50]  # Top 50 three-point shooters
 
-def save_data(team_data, player_data, league_data):
+def save_data(team_data, player_data, league_data, efficiency, preview=None):
     """Save processed data to JSON files."""
     
     print("💾 Saving processed data...")
@@ -249,34 +309,23 @@ def save_data(team_data, player_data, league_data):
         'league_trends': league_data,
         'team_data': team_data,
         'player_data': player_data,
-        'efficiency_comparison': {
-            'mid_range_efficiency': 0.8,
-            'three_point_efficiency': 1.1,
-            'restricted_area_efficiency': 1.2
-        }
+        'efficiency_comparison': efficiency
     }
     
-    # Save to data directory
-    os.makedirs('data', exist_ok=True)
-    
-    with open('data/scene4_data_enhanced.json', 'w') as f:
-        json.dump(scene4_enhanced, f, indent=2)
+    # Save to data directory (preview runs go to data/preview/ instead)
+    publisher = PreviewPublisher(preview) if preview else Publisher()
+    publisher.add_json('data/scene4_data_enhanced.json', scene4_enhanced, indent=2)
     
     # Also update the existing scene4_data.json
-    with open('data/scene4_data.json', 'w') as f:
-        json.dump(scene4_enhanced, f, indent=2)
+    publisher.add_json('data/scene4_data.json', scene4_enhanced, indent=2)
     
     # Save individual files for easier analysis
-    with open('data/comprehensive_team_data.json', 'w') as f:
-        json.dump(team_data, f, indent=2)
-    
-    with open('data/comprehensive_player_data.json', 'w') as f:
-        json.dump(player_data, f, indent=2)
+    publisher.add_json('data/comprehensive_team_data.json', team_data, indent=2)
+    publisher.add_json('data/comprehensive_player_data.json', player_data, indent=2)
+    publisher.add_json('data/comprehensive_league_data.json', league_data, indent=2)
+    publisher.publish()
     
-    with open('data/comprehensive_league_data.json', 'w') as f:
-        json.dump(league_data, f, indent=2)
-    
-    print("✅ Data saved successfully!")
+    print("✅ Data saved successfully!" if not preview else f"✅ Approximate data saved to {PREVIEW_DIR}/")
     
     # Print summary statistics
     print(f"\n📊 Data Summary:")
@@ -296,12 +345,20 @@ def save_data(team_data, player_data, league_data):
 
 def main():
     """Main processing function."""
+    parser = argparse.ArgumentParser(description="Process all NBA shot CSVs into comprehensive team, player and league data")
+    add_preview_arguments(parser)
+    args = parser.parse_args()
+    
+    preview = PreviewSample(args.preview, args.seed) if args.preview else None
+    if preview:
+        print(f"⚡ Preview mode: sampling {args.preview:.1%} of each season — outputs are approximate")
+    
     try:
         # Process all data
-        team_data, player_data, league_data = load_and_process_all_data()
+        team_data, player_data, league_data, efficiency = load_and_process_all_data(preview)
         
         # Save processed data
-        save_data(team_data, player_data, league_data)
+        save_data(team_data, player_data, league_data, efficiency, preview)
         
         print("\n🎉 Comprehensive NBA data processing completed successfully!")
         print("   Ready to enhance the exploration interface with real data.")
@@ -1,24 +1,37 @@
 import pandas as pd
 import numpy as np
-import json
 import glob
+import argparse
+import zlib
 from collections import defaultdict
 
-def load_all_seasons():
-    """Load and combine all NBA shot data from 2004-2024."""
+from confidence_intervals import attach_confidence_intervals, season_records
+from efficiency_surfaces import efficiency_comparison_from_shots
+from parse_cache import read_shots_csv
+from preview import PREVIEW_DIR, PreviewPublisher, PreviewSample, add_preview_arguments
+from publish import Publisher
+
+# scene1's "percentages" are shares of all shots, each with its shot count
+SCENE1_SHARES = {'three_pt_percentage': 'three_pt_shots', 'mid_range_percentage': 'mid_range_shots'}
+
+def load_all_seasons(preview=None):
+    """Load and combine all NBA shot data from 2004-2024; a preview keeps only its sample of each season."""
     all_data = []
     
     print("Loading NBA shot data...")
     for file_path in sorted(glob.glob("Data/NBA_*_Shots.csv")):
         print(f"Loading {file_path}...")
-        df = pd.read_csv(file_path)
+        df = read_shots_csv(file_path)
+        if preview:
+            # Sample each season as it is read so the full history is never combined
+            df = preview.sample(df)
         all_data.append(df)
     
     combined_df = pd.concat(all_data, ignore_index=True)
     print(f"Total shots loaded: {len(combined_df):,}")
     return combined_df
 
-def calculate_league_trends(df):
+def calculate_league_trends(df, preview=None):
     """Calculate league-wide shot trends by season."""
     trends = []
     
@@ -37,16 +50,21 @@ def calculate_league_trends(df):
         fg_percentage = (made_shots / total_shots) * 100
         efg_percentage = ((made_shots + 0.5 * made_threes) / total_shots) * 100
         
-        trends.append({
+        trend = {
             'season': int(season),
             'total_shots': int(total_shots),
             'three_pt_rate': round(float(three_pt_rate), 2),
             'mid_range_rate': round(float(mid_range_rate), 2),
             'fg_percentage': round(float(fg_percentage), 2),
             'efg_percentage': round(float(efg_percentage), 2),
+            'made_shots': int(made_shots),
+            'made_threes': int(made_threes),
             'three_pt_shots': int(three_pt_shots),
             'mid_range_shots': int(mid_range_shots)
-        })
+        }
+        if preview:
+            preview.annotate(trend, int(season))
+        trends.append(trend)
     
     return trends
 
@@ -83,16 +101,19 @@ def get_top_players_by_volume(df, min_seasons=3, min_total_3pt=300):
     qualified_players.sort(key=lambda x: x['total_3pt'], reverse=True)
     return [p['player'] for p in qualified_players[:20]]  # Top 20 players
 
-def find_key_players(df):
+def find_key_players(df, preview=None):
     """Identify key players who led the 3-point revolution."""
     player_stats = []
     
     # Get top players by volume plus some key revolution leaders
-    top_players = get_top_players_by_volume(df)
+    if preview:
+        top_players = get_top_players_by_volume(df, min_total_3pt=preview.threshold(300))
+    else:
+        top_players = get_top_players_by_volume(df)
     key_revolution_players = ['Stephen Curry', 'James Harden', 'Klay Thompson', 'Ray Allen', 'Damian Lillard', 'Kyle Korver', 'JJ Redick']
     
-    # Combine and deduplicate
-    all_key_players = list(set(top_players + key_revolution_players))
+    # Combine and deduplicate (order-preserving so output is reproducible)
+    all_key_players = list(dict.fromkeys(top_players + key_revolution_players))
     
     for player in all_key_players:
         player_data = df[df['PLAYER_NAME'] == player]
@@ -111,14 +132,17 @@ def find_key_players(df):
                 three_pt_rate = (three_pt_shots / total_shots) * 100
                 three_pt_percentage = (made_threes / three_pt_shots * 100) if three_pt_shots > 0 else 0
                 
-                player_seasons.append({
+                player_season = {
                     'season': int(season),
                     'total_shots': int(total_shots),
                     'three_pt_shots': int(three_pt_shots),
                     'made_threes': int(made_threes),
                     'three_pt_rate': round(float(three_pt_rate), 2),
                     'three_pt_percentage': round(float(three_pt_percentage), 2)
-                })
+                }
+                if preview:
+                    preview.annotate(player_season, int(season))
+                player_seasons.append(player_season)
         
         if player_seasons:
             player_stats.append({
@@ -128,7 +152,11 @@ def find_key_players(df):
     
     return player_stats
 
-def get_team_data(df):
+def stable_hash(text):
+    """Hash that, unlike hash(), is identical in every Python process."""
+    return zlib.crc32(text.encode('utf-8'))
+
+def get_team_data(league_trends):
     """Extract team-based statistics for team analysis."""
     team_stats = []
     
@@ -142,18 +170,18 @@ def get_team_data(df):
         team_seasons = []
         for season in range(2004, 2025):
             # Simulate team data based on league trends
-            league_season = next((s for s in calculate_league_trends(df) if s['season'] == season), None)
+            league_season = next((s for s in league_trends if s['season'] == season), None)
             if league_season:
                 # Add some variation for different teams
-                variation = hash(team + str(season)) % 20 - 10  # ±10% variation
+                variation = stable_hash(team + str(season)) % 20 - 10  # ±10% variation
                 three_pt_rate = max(10, league_season['three_pt_rate'] + variation)
                 
                 team_seasons.append({
                     'season': season,
                     'three_pt_rate': round(three_pt_rate, 1),
                     'total_shots': league_season['total_shots'] // 30,  # Approximate per team
-                    'wins': 41 + (hash(team + str(season)) % 41),  # Random wins 41-82
-                    'playoffs': (hash(team + str(season)) % 100) > 50  # 50% playoff rate
+                    'wins': 41 + (stable_hash(team + str(season)) % 41),  # Random wins 41-82
+                    'playoffs': (stable_hash(team + str(season)) % 100) > 50  # 50% playoff rate
                 })
         
         team_stats.append({
@@ -163,16 +191,12 @@ def get_team_data(df):
     
     return team_stats
 
-def calculate_efficiency_comparison():
-    """Calculate scoring efficiency for different shot zones."""
+def calculate_efficiency_comparison(df):
+    """Calculate scoring efficiency (points per attempt) for different shot zones."""
     # This will be used to show why teams shifted to 3-pointers
-    return {
-        'mid_range_efficiency': 0.8,  # Approximate points per attempt
-        'three_point_efficiency': 1.1,  # Approximate points per attempt
-        'restricted_area_efficiency': 1.2  # Approximate points per attempt
-    }
+    return efficiency_comparison_from_shots(df)
 
-def create_scene_data(df):
+def create_scene_data(df, preview=None):
     """Create processed data for each scene of the narrative."""
     print("Processing data for visualization scenes...")
     
@@ -191,20 +215,31 @@ def create_scene_data(df):
         scene1_data[str(year)] = {
             'three_pt_percentage': round(float((three_pt_shots / total_shots) * 100), 1),
             'mid_range_percentage': round(float((mid_range_shots / total_shots) * 100), 1),
-            'total_shots': int(total_shots)
+            'total_shots': int(total_shots),
+            'three_pt_shots': int(three_pt_shots),
+            'mid_range_shots': int(mid_range_shots)
         }
+        if preview:
+            preview.annotate(scene1_data[str(year)], year, dict.fromkeys(SCENE1_SHARES, 'total_shots'))
     
     # Scene 2: League trends over time
-    scene2_data = calculate_league_trends(df)
+    scene2_data = calculate_league_trends(df, preview)
     
     # Scene 3: Key players
-    scene3_data = find_key_players(df)
+    scene3_data = find_key_players(df, preview)
+    
+    # Preview records already carry standard errors from the sample
+    if not preview:
+        attach_confidence_intervals(list(scene1_data.values()),
+                                    fields={field: [(count, 'total_shots')] for field, count in SCENE1_SHARES.items()})
+        attach_confidence_intervals(scene2_data, decimals=2)
+        attach_confidence_intervals(season_records(scene3_data), decimals=2)
     
     # Scene 4: Enhanced explorer data
     scene4_data = {
         'league_trends': scene2_data,  # Reuse league trends for efficiency visualization
-        'efficiency_comparison': calculate_efficiency_comparison(),
-        'team_data': get_team_data(df),
+        'efficiency_comparison': calculate_efficiency_comparison(df),
+        'team_data': get_team_data(scene2_data),
         'player_data': scene3_data  # Include all player data for enhanced search
     }
     
@@ -217,30 +252,33 @@ def create_scene_data(df):
 
 def main():
     """Main processing function."""
+    parser = argparse.ArgumentParser(description="Process NBA shot data for the narrative scenes")
+    add_preview_arguments(parser)
+    args = parser.parse_args()
+    
+    preview = PreviewSample(args.preview, args.seed) if args.preview else None
+    
     # Load all data
-    df = load_all_seasons()
+    df = load_all_seasons(preview)
+    if preview:
+        print(f"⚡ Preview mode: {len(df):,} sampled shots ({args.preview:.1%} of each season) — outputs are approximate")
     
     # Create visualization data
-    viz_data = create_scene_data(df)
+    viz_data = create_scene_data(df, preview)
     
     # Save processed data as JSON files
     print("Saving processed data...")
+    publisher = PreviewPublisher(preview) if preview else Publisher()
     
-    with open('data/scene1_data.json', 'w') as f:
-        json.dump(viz_data['scene1'], f, indent=2)
-    
-    with open('data/scene2_data.json', 'w') as f:
-        json.dump(viz_data['scene2'], f, indent=2)
-    
-    with open('data/scene3_data.json', 'w') as f:
-        json.dump(viz_data['scene3'], f, indent=2)
-    
-    with open('data/scene4_data.json', 'w') as f:
-        json.dump(viz_data['scene4'], f, indent=2)
+    publisher.add_json('data/scene1_data.json', viz_data['scene1'], indent=2)
+    publisher.add_json('data/scene2_data.json', viz_data['scene2'], indent=2)
+    publisher.add_json('data/scene3_data.json', viz_data['scene3'], indent=2)
+    publisher.add_json('data/scene4_data.json', viz_data['scene4'], indent=2)
     
     # Create a summary for quick reference
     summary = {
-        'total_shots_analyzed': int(len(df)),
+        # A preview reports the shots its sample stands for, like its other counts
+        'total_shots_analyzed': sum(preview.population.values()) if preview else int(len(df)),
         'seasons_covered': [int(x) for x in sorted(df['SEASON_1'].unique())],
         'three_pt_evolution': {
             '2004_rate': float(viz_data['scene1']['2004']['three_pt_percentage']),
@@ -249,8 +287,10 @@ def main():
         }
     }
     
-    with open('data/summary.json', 'w') as f:
-        json.dump(summary, f, indent=2)
+    publisher.add_json('data/summary.json', summary, indent=2)
+    publisher.publish()
+    if preview:
+        print(f"⚡ Approximate outputs written to {PREVIEW_DIR}/ (production files untouched)")
     
     print(f"Data processing complete!")
     print(f"3-point rate increased from {summary['three_pt_evolution']['2004_rate']}% in 2004 to {summary['three_pt_evolution']['2024_rate']}% in 2024")
@@ -9,6 +9,9 @@ import json
 import glob
 from collections import defaultdict
 
+from confidence_intervals import attach_confidence_intervals
+from publish import Publisher
+
 # NBA Conference structure (2024 alignment)
 NBA_CONFERENCES = {
     "Eastern Conference": {
@@ -55,6 +58,9 @@ def process_enhanced_player_data():
     enhanced_players.sort(key=lambda x: x['career_threes'], reverse=True)
     top_100_players = enhanced_players[:100]
     
+    # 95% interval for each career 3PT%
+    attach_confidence_intervals(top_100_players, fields={'career_accuracy': [('career_threes', 'career_attempts')]})
+    
     print(f"✅ Enhanced data for top {len(top_100_players)} players")
     return top_100_players
 
@@ -107,17 +113,17 @@ def create_enhanced_scene4_data():
     with open('data/comprehensive_league_data.json', 'r') as f:
         league_data = json.load(f)
     
+    # Zone efficiency computed by the comprehensive processor
+    with open('data/scene4_data_enhanced.json', 'r') as f:
+        efficiency = json.load(f)['efficiency_comparison']
+    
     # Create enhanced scene4 data
     enhanced_data = {
         'league_trends': league_data,
         'team_data': all_teams,  # Keep flat structure for backward compatibility
         'team_conferences': conference_teams,  # New conference organization
         'player_data': top_100_players,
-        'efficiency_comparison': {
-            'mid_range_efficiency': 0.8,
-            'three_point_efficiency': 1.1,
-            'restricted_area_efficiency': 1.2
-        },
+        'efficiency_comparison': efficiency,
         'metadata': {
             'total_teams': len(all_teams),
             'total_players': len(top_100_players),
@@ -136,15 +142,13 @@ def save_enhanced_data():
     enhanced_data = create_enhanced_scene4_data()
     
     # Save enhanced data
-    with open('data/scene4_data.json', 'w') as f:
-        json.dump(enhanced_data, f, indent=2)
+    publisher = Publisher()
+    publisher.add_json('data/scene4_data.json', enhanced_data, indent=2)
     
     # Also save individual components for easier debugging
-    with open('data/top_100_players.json', 'w') as f:
-        json.dump(enhanced_data['player_data'], f, indent=2)
-    
-    with open('data/teams_by_conference.json', 'w') as f:
-        json.dump(enhanced_data['team_conferences'], f, indent=2)
+    publisher.add_json('data/top_100_players.json', enhanced_data['player_data'], indent=2)
+    publisher.add_json('data/teams_by_conference.json', enhanced_data['team_conferences'], indent=2)
+    publisher.publish()
     
     print("✅ Enhanced data saved successfully!")
     
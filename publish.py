@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+NBA Output Publisher
+Content-addressed publishing for the JSON/CSV artifacts the site loads.
+
+Artifacts are serialized in memory and hashed; a file is only rewritten when
+its SHA-256 differs from what is already on disk, and every published file's
+hash is recorded in data/manifest.json. The front end requests
+`<path>?v=<hash>` using that manifest, so unchanged files keep their URL and
+can stay in browser and CDN caches across deploys.
+
+Artifacts are serialized and written concurrently on a thread pool. Each file
+is written to a temporary file in the same directory, fsynced and renamed over
+the old one, so readers see either the old or the new file, never a partial
+one.
+
+Used as a context manager, a Publisher is the run's publisher: every other
+Publisher for the same manifest published while it is open hands it its
+artifacts instead, and the whole run is written (and its manifest updated)
+once on exit.
+
+data/ always stays a plain directory, as the repo and GitHub Pages expect.
+With NBA_VERSIONED_OUTPUT=1 each publish also snapshots every manifest file
+into a new directory under data.versions/ and commits it by atomically
+repointing the data.live symlink, which a server can expose as the site's
+data/ route. Snapshot files are copies, never hard links into data/, whose
+files can be rewritten in place (the master CSV, delta state); only files
+unchanged since the previous snapshot are hard-linked from it, as snapshots
+are never modified once committed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+MANIFEST_PATH = 'data/manifest.json'
+SITE_DATA_DIR = 'data'
+
+# Characters of the SHA-256 used in manifest entries and URLs
+HASH_LENGTH = 16
+
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+
+VERSIONED_OUTPUT = os.environ.get('NBA_VERSIONED_OUTPUT') == '1'
+VERSIONS_DIR = 'data.versions'
+LIVE_LINK = 'data.live'
+KEEP_VERSIONS = 5
+
+# Publisher collecting every artifact of the current run, if one is open
+_run = None
+
+# mkstemp creates 0600 files; published files get the usual umask-based mode
+_umask = os.umask(0)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+
+def content_hash(data):
+    """Short SHA-256 hex digest of serialized content."""
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+def file_hash(path, block_size=1 << 20):
+    """Content hash of a file on disk, or None when it does not exist."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+def load_manifest(manifest_path=MANIFEST_PATH):
+    """Load the hash manifest (empty when none has been published yet)."""
+    if not os.path.exists(manifest_path):
+        return {'files': {}}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+def _fsync_path(path, flags=os.O_RDONLY):
+    fd = os.open(path, flags)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # Some filesystems do not support fsync on directories
+    finally:
+        os.close(fd)
+
+@contextmanager
+def atomic_output(path):
+    """Yield a temporary path next to `path`; on success fsync it and rename it into place."""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        yield temp_path
+        os.chmod(temp_path, FILE_MODE)
+        _fsync_path(temp_path)
+        os.replace(temp_path, path)
+        _fsync_path(directory)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def atomic_write_bytes(path, data):
+    """Atomically replace a file's contents."""
+    with atomic_output(path) as temp_path:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+
+class Publisher:
+    """Collects artifacts and writes only the ones whose content changed."""
+
+    def __init__(self, manifest_path=MANIFEST_PATH, max_workers=DEFAULT_WORKERS, versioned=None):
+        self.manifest_path = manifest_path
+        self.max_workers = max_workers
+        self.versioned = VERSIONED_OUTPUT if versioned is None else versioned
+        self.artifacts = {}
+
+    def add_json(self, path, data, **dump_kwargs):
+        """Queue a JSON artifact; keyword arguments go to json.dumps."""
+        self.artifacts[path] = lambda: json.dumps(data, **dump_kwargs).encode('utf-8')
+
+    def add_csv(self, path, df, **csv_kwargs):
+        """Queue a DataFrame as a CSV artifact; keyword arguments go to to_csv."""
+        self.artifacts[path] = lambda: df.to_csv(**csv_kwargs).encode('utf-8')
+
+    def add_bytes(self, path, data):
+        """Queue already-serialized content."""
+        self.artifacts[path] = lambda: data
+
+    def _publish_one(self, path, serialize):
+        """Write one artifact if its hash changed; returns (hash, size, written)."""
+        data = serialize()
+        digest = content_hash(data)
+        if file_hash(path) == digest:
+            return digest, len(data), False
+
+        atomic_write_bytes(path, data)
+        return digest, len(data), True
+
+    def __enter__(self):
+        global _run
+        if _run is not None:
+            raise RuntimeError("A publish run is already open")
+        _run = self
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        global _run
+        _run = None
+        if exc_type is None:
+            self.publish()
+
+    def _snapshot_version(self, manifest):
+        """Copy every manifest file into a new version directory and make it live."""
+        parent = os.path.dirname(os.path.abspath(SITE_DATA_DIR))
+        previous = os.path.realpath(LIVE_LINK) if os.path.islink(LIVE_LINK) else None
+        previous_files = load_manifest(os.path.join(previous, 'manifest.json'))['files'] if previous else {}
+
+        os.makedirs(VERSIONS_DIR, exist_ok=True)
+        stage = tempfile.mkdtemp(dir=VERSIONS_DIR, prefix=f"{time.strftime('%Y%m%d-%H%M%S')}-")
+        for path, entry in list(manifest['files'].items()) + [(self.manifest_path, None)]:
+            relative = os.path.relpath(path, SITE_DATA_DIR)
+            if relative.startswith(os.pardir):
+                raise ValueError(f"Versioned publishing only covers {SITE_DATA_DIR}/, got {path}")
+            target = os.path.join(stage, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if entry is not None and previous_files.get(path, {}).get('hash') == entry['hash']:
+                os.link(os.path.join(previous, relative), target)
+            elif os.path.exists(path):
+                shutil.copy2(path, target)
+        os.chmod(stage, 0o777 & ~_umask)
+        _fsync_path(stage)
+
+        temp_link = f'{LIVE_LINK}.link-{os.getpid()}'
+        os.symlink(os.path.relpath(stage, parent), temp_link)
+        os.replace(temp_link, LIVE_LINK)
+        _fsync_path(parent)
+
+        live = os.path.realpath(LIVE_LINK)
+        versions = sorted(os.listdir(VERSIONS_DIR), key=lambda name: os.path.getmtime(os.path.join(VERSIONS_DIR, name)))
+        for name in versions[:-KEEP_VERSIONS]:
+            path = os.path.join(VERSIONS_DIR, name)
+            if os.path.realpath(path) != live:
+                shutil.rmtree(path)
+        return stage
+
+    def publish(self):
+        """Write changed artifacts and record every artifact's hash in the manifest."""
+        if _run is not None and _run is not self and _run.manifest_path == self.manifest_path:
+            # Leave the writing to the run's publisher
+            _run.artifacts.update(self.artifacts)
+            print(f"   📦 Queued {len(self.artifacts)} files for the end of the run")
+            self.artifacts = {}
+            return []
+
+        manifest = load_manifest(self.manifest_path)
+
+        def publish_artifact(item):
+            path, serialize = item
+            return path, self._publish_one(path, serialize)
+
+        written = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for path, (digest, size, changed) in pool.map(publish_artifact, self.artifacts.items()):
+                manifest['files'][path] = {'hash': digest, 'bytes': size}
+                if changed:
+                    written.append(path)
+
+        manifest['files'] = dict(sorted(manifest['files'].items()))
+        self._publish_one(self.manifest_path, lambda: json.dumps(manifest, indent=2).encode('utf-8'))
+
+        if self.versioned and (written or not os.path.islink(LIVE_LINK)):
+            stage = self._snapshot_version(manifest)
+            print(f"   📁 {LIVE_LINK} now points at {stage}/")
+
+        print(f"   📦 Published {len(self.artifacts)} files ({len(written)} changed, "
+              f"{len(self.artifacts) - len(written)} unchanged)")
+        self.artifacts = {}
+        return written
@@ -165,6 +165,12 @@ const utils = {
         if (num >= 1000000) return (num / 1000000).toFixed(1) + 'M';
         if (num >= 1000) return (num / 1000).toFixed(1) + 'K';
         return num.toString();
+    },
+    
+    // Format a record's 95% confidence interval for a field (empty when absent)
+    formatInterval: function(d, field) {
+        const interval = d.confidence_intervals && d.confidence_intervals[field];
+        return interval ? ` (95% CI ${interval[0]}–${interval[1]}%)` : '';
     }
 };
 
@@ -193,14 +199,36 @@ document.addEventListener('DOMContentLoaded', async function() {
     }
 });
 
+// Content-hash manifest written by publish.py. Data files are requested as
+// `<path>?v=<hash>`, so files that did not change keep their cached copy.
+let dataManifest = null;
+
+async function loadDataManifest() {
+    if (!dataManifest) {
+        try {
+            dataManifest = await d3.json('data/manifest.json', { cache: 'no-cache' });
+        } catch (error) {
+            console.warn('⚠️ Data manifest unavailable, loading unversioned files');
+            dataManifest = { files: {} };
+        }
+    }
+    return dataManifest;
+}
+
+function dataUrl(path) {
+    const entry = dataManifest && dataManifest.files[path];
+    return entry ? `${path}?v=${entry.hash}` : path;
+}
+
 // Data loading
 async function loadAllData() {
     try {
+        await loadDataManifest();
         const [scene1, scene2, scene3, scene4] = await Promise.all([
-            d3.json('data/scene1_data.json'),
-            d3.json('data/scene2_data.json'), 
-            d3.json('data/scene3_data.json'),
-            d3.json('data/scene4_data.json')
+            d3.json(dataUrl('data/scene1_data.json')),
+            d3.json(dataUrl('data/scene2_data.json')), 
+            d3.json(dataUrl('data/scene3_data.json')),
+            d3.json(dataUrl('data/scene4_data.json'))
         ]);
         
         state.data = { scene1, scene2, scene3, scene4 };
@@ -1004,7 +1032,7 @@ function drawScene2_Players() {
                 3-Point Rate: <span style="color: ${CONFIG.colors.threePt}">${d.three_pt_rate}%</span><br/>
                 Made 3-Pointers: ${d.made_threes}<br/>
                 Total Attempts: ${d.three_pt_shots}<br/>
-                Shooting %: ${d.three_pt_percentage}%
+                Shooting %: ${d.three_pt_percentage}%${utils.formatInterval(d, 'three_pt_percentage')}
             `);
             d3.select(this).transition().duration(200).attr('r', 10);
         })
@@ -1536,7 +1564,7 @@ function drawPlayerComparison(g, width, height) {
                     <strong>${playerData.player} - ${d.season}</strong><br/>
                     3-Point Rate: <span style="color: ${colors[index]}">${d.three_pt_rate}%</span><br/>
                     Made 3-Pointers: ${d.made_threes}<br/>
-                    Shooting %: ${d.three_pt_percentage}%<br/>
+                    Shooting %: ${d.three_pt_percentage}%${utils.formatInterval(d, 'three_pt_percentage')}<br/>
                     Total Shots: ${d.total_shots}
                 `);
                 d3.select(this).transition().duration(200).attr('r', 8);
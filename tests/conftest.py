@@ -0,0 +1,63 @@
+"""Shared test setup: the scripts import each other as top-level modules and
+read their inputs (Data/NBA_<year>_Shots.csv) relative to the working directory."""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEAMS = [('Atlanta Hawks', 'ATL'), ('Boston Celtics', 'BOS'), ('Golden State Warriors', 'GSW'),
+         ('Houston Rockets', 'HOU'), ('Miami Heat', 'MIA'), ('New Jersey Nets', 'NJN')]
+ZONES = ['Restricted Area', 'In The Paint (Non-RA)', 'Mid-Range', 'Left Corner 3', 'Right Corner 3', 'Above the Break 3']
+
+def make_season(year, games=12, seed=0):
+    """Synthetic shots for one season with the columns of the real season files."""
+    rng = np.random.default_rng(seed + year)
+    start = pd.Timestamp(f'{year - 1}-10-28')
+    frames = []
+    for game in range(games):
+        home, away = rng.choice(len(TEAMS), 2, replace=False)
+        for side in (home, away):
+            team = TEAMS[side][0]
+            n = int(rng.integers(30, 50))
+            three = rng.random(n) < 0.15 + 0.01 * (year - 2004)
+            distance = np.where(three, rng.integers(22, 30, n), rng.integers(0, 22, n))
+            made = rng.random(n) < np.where(three, 0.36, 0.5)
+            angle = rng.uniform(0, np.pi, n)
+            quarter = rng.choice([1, 2, 3, 4], n)
+            players = [f"{team.split()[-1]} Player{i}" for i in rng.integers(0, 8, n)]
+            frames.append(pd.DataFrame({
+                'SEASON_1': year, 'SEASON_2': f'{year - 1}-{str(year)[-2:]}',
+                'TEAM_ID': 1610612700 + side, 'TEAM_NAME': team,
+                'PLAYER_ID': [1000 + int(p[-1]) + 10 * side for p in players], 'PLAYER_NAME': players,
+                'POSITION_GROUP': 'G', 'POSITION': 'PG',
+                'GAME_DATE': (start + pd.Timedelta(days=game * 3)).strftime('%m-%d-%Y'),
+                'GAME_ID': int(f'2{str(year)[-2:]}{game:05d}'),
+                'HOME_TEAM': TEAMS[home][1], 'AWAY_TEAM': TEAMS[away][1],
+                'EVENT_TYPE': np.where(made, 'Made Shot', 'Missed Shot'), 'SHOT_MADE': made,
+                'ACTION_TYPE': 'Jump Shot',
+                'SHOT_TYPE': np.where(three, '3PT Field Goal', '2PT Field Goal'),
+                'BASIC_ZONE': np.where(three, rng.choice(ZONES[3:], n), rng.choice(ZONES[:3], n)),
+                'ZONE_NAME': 'Center', 'ZONE_ABB': 'C', 'ZONE_RANGE': '8-16 ft.',
+                'LOC_X': np.round(np.cos(angle) * distance, 1), 'LOC_Y': np.round(np.sin(angle) * distance + 5.25, 2),
+                'SHOT_DISTANCE': distance, 'QUARTER': quarter,
+                'MINS_LEFT': rng.integers(0, 12, n), 'SECS_LEFT': rng.integers(0, 60, n)
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+@pytest.fixture
+def season_files(tmp_path, monkeypatch):
+    """Three season CSVs under Data/ (and at the top level, where the comprehensive processor looks), cwd at tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('Data')
+    paths = []
+    for year in (2004, 2014, 2024):
+        path = os.path.join('Data', f'NBA_{year}_Shots.csv')
+        make_season(year).to_csv(path, index=False)
+        make_season(year).to_csv(f'NBA_{year}_Shots.csv', index=False)
+        paths.append(path)
+    return paths
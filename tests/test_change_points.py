@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from benchmark_change_points import looped_segmentation, synthetic_series
+from change_points import binary_segmentation, pad_series, segment_means
+
+def as_list(series, position, gain):
+    return list(zip(series.tolist(), position.tolist(), gain.tolist()))
+
+def assert_same_changes(batched, looped):
+    assert [(row, split) for row, split, _ in batched] == [(row, split) for row, split, _ in looped]
+    np.testing.assert_allclose([gain for *_, gain in batched], [gain for *_, gain in looped], rtol=1e-9)
+
+@pytest.mark.parametrize('length', [21, 82, 21 * 82])
+def test_batched_matches_the_looped_reference(length):
+    matrix, lengths, _ = synthetic_series(30, length, seed=length)
+    batched = as_list(*binary_segmentation(matrix, lengths))
+    assert batched
+    assert_same_changes(batched, looped_segmentation(matrix, lengths))
+
+@pytest.mark.parametrize('max_changes,min_size', [(1, 2), (3, 2), (5, 3)])
+def test_matches_the_reference_with_several_shifts_and_ragged_series(max_changes, min_size):
+    rng = np.random.default_rng(7)
+    values, codes = [], []
+    for code, length in enumerate([21, 14, 3, 40, 8, 1, 33]):
+        steps = np.repeat(rng.uniform(10, 40, 4), int(np.ceil(length / 4)))[:length]
+        values.append(steps + rng.normal(0, 1.5, length))
+        codes.append(np.full(length, code))
+    matrix, lengths = pad_series(np.concatenate(values), np.concatenate(codes))
+
+    batched = as_list(*binary_segmentation(matrix, lengths, max_changes=max_changes, min_size=min_size))
+    looped = looped_segmentation(matrix, lengths, max_changes=max_changes, min_size=min_size)
+    assert_same_changes(batched, looped)
+    assert max(np.bincount([row for row, *_ in batched])) <= max_changes
+
+def test_detects_the_planted_shift():
+    matrix, lengths, shift_at = synthetic_series(20, 21, seed=3)
+    series, position, _ = binary_segmentation(matrix, lengths, max_changes=1)
+    assert series.tolist() == list(range(20))
+    assert np.abs(position - shift_at).max() <= 1
+
+def test_flat_and_short_series_have_no_changes():
+    rng = np.random.default_rng(0)
+    matrix = np.vstack([22 + rng.normal(0, 1, 30), np.r_[5.0, 50.0, 5.0, [np.nan] * 27]])
+    series, position, gain = binary_segmentation(matrix, np.array([30, 3]))
+    assert len(series) == len(position) == len(gain) == 0
+
+def test_pad_series_groups_values_in_order():
+    values = np.array([1.0, 10.0, 2.0, 20.0, 3.0])
+    matrix, lengths = pad_series(values, np.array([0, 1, 0, 1, 0]))
+    assert lengths.tolist() == [3, 2]
+    np.testing.assert_array_equal(matrix[0], [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(matrix[1, :2], [10.0, 20.0])
+    assert np.isnan(matrix[1, 2])
+
+def test_segment_means_stop_at_neighbouring_changes():
+    values = np.r_[[10.0] * 4, [20.0] * 4, [40.0] * 4, [5.0] * 3, [15.0] * 3]
+    matrix, lengths = pad_series(values, np.r_[[0] * 12, [1] * 6])
+    series, position = np.array([0, 0, 1]), np.array([4, 8, 3])
+
+    before, after = segment_means(matrix, lengths, series, position)
+    np.testing.assert_allclose(before, [10.0, 20.0, 5.0])
+    np.testing.assert_allclose(after, [20.0, 40.0, 15.0])
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import confidence_intervals
+from build_leaderboards import build_leaderboard, window_totals
+from confidence_intervals import (attach_confidence_intervals, bootstrap_interval, efg_bootstrap_interval,
+                                  wilson_interval)
+
+# (successes, trials, low, high) at 95%, from published Wilson interval tables
+WILSON_REFERENCES = [
+    (0, 10, 0.0, 0.2775),
+    (1, 10, 0.0179, 0.4042),
+    (5, 10, 0.2366, 0.7634),
+    (10, 10, 0.7225, 1.0),
+    (81, 263, 0.2553, 0.3662)
+]
+
+def test_wilson_matches_reference_values():
+    successes, trials, low, high = (np.array(column) for column in zip(*WILSON_REFERENCES))
+    computed_low, computed_high = wilson_interval(successes, trials)
+    np.testing.assert_allclose(computed_low, low, atol=1e-4)
+    np.testing.assert_allclose(computed_high, high, atol=1e-4)
+
+def test_wilson_is_symmetric_and_narrows_with_volume():
+    low, high = wilson_interval([30, 70, 300], [100, 100, 1000])
+    assert low[0] == pytest.approx(1 - high[1])
+    assert high[0] == pytest.approx(1 - low[1])
+    assert high[2] - low[2] < high[0] - low[0]
+
+def test_wilson_is_nan_without_trials():
+    low, high = wilson_interval([0, 3], [0, 9])
+    assert np.isnan(low[0]) and np.isnan(high[0])
+    assert 0 < low[1] < 3 / 9 < high[1] < 1
+
+def test_confidence_level_widens_the_interval():
+    low90, high90 = wilson_interval([5], [10], confidence=0.90)
+    low95, high95 = wilson_interval([5], [10])
+    assert low95[0] < low90[0] and high90[0] < high95[0]
+    np.testing.assert_allclose([low90[0], high90[0]], [0.2693, 0.7307], atol=1e-4)
+
+def test_bootstrap_is_deterministic_and_independent_of_batch_size(monkeypatch):
+    made = np.array([30, 5, 0, 50, 12, 30])
+    attempts = np.array([100, 20, 0, 50, 40, 100])
+    proportion = bootstrap_interval(made, attempts)
+    efg = efg_bootstrap_interval(made // 2, made // 3, attempts)
+
+    np.testing.assert_array_equal(bootstrap_interval(made, attempts)[0], proportion[0])
+    # One row per batch draws the same stream as every row at once
+    monkeypatch.setattr(confidence_intervals, 'BATCH_DRAWS', 1)
+    for expected, computed in [(proportion, bootstrap_interval(made, attempts)),
+                               (efg, efg_bootstrap_interval(made // 2, made // 3, attempts))]:
+        np.testing.assert_array_equal(computed[0], expected[0])
+        np.testing.assert_array_equal(computed[1], expected[1])
+
+    # Repeated (made, attempts) pairs share their resample; no trials give NaN
+    assert proportion[0][0] == proportion[0][5]
+    assert np.isnan(proportion[0][2]) and np.isnan(efg[0][2])
+
+def test_bootstrap_agrees_with_wilson_at_volume():
+    made, attempts = np.array([360, 150]), np.array([1000, 400])
+    low, high = bootstrap_interval(made, attempts, resamples=4000)
+    wilson_low, wilson_high = wilson_interval(made, attempts)
+    np.testing.assert_allclose(low, wilson_low, atol=0.01)
+    np.testing.assert_allclose(high, wilson_high, atol=0.01)
+
+def test_efg_interval_brackets_the_estimate():
+    two, three, trials = np.array([200]), np.array([100]), np.array([700])
+    low, high = efg_bootstrap_interval(two, three, trials)
+    efg = (two + 1.5 * three) / trials
+    assert low[0] < efg[0] < high[0]
+
+def test_attach_uses_the_first_count_pair_each_record_has():
+    records = [
+        {'three_pt_percentage': 40.0, 'three_pt_made': 40, 'three_pt_shots': 100},
+        # Player seasons count made threes under a different name
+        {'three_pt_percentage': 25.0, 'made_threes': 5, 'three_pt_shots': 20},
+        {'three_pt_percentage': 0, 'three_pt_made': 0, 'three_pt_shots': 0},
+        {'fg_percentage': 50.0}
+    ]
+    attach_confidence_intervals(records)
+
+    low, high = wilson_interval([40, 5], [100, 20])
+    assert records[0]['confidence_intervals'] == {'three_pt_percentage': [round(low[0] * 100, 1), round(high[0] * 100, 1)]}
+    assert records[1]['confidence_intervals'] == {'three_pt_percentage': [round(low[1] * 100, 1), round(high[1] * 100, 1)]}
+    # No attempts or no counts: no interval
+    assert 'confidence_intervals' not in records[2]
+    assert 'confidence_intervals' not in records[3]
+
+def test_attach_with_field_overrides_and_efg():
+    records = [
+        {'player': 'A', 'career_accuracy': 38.0, 'career_threes': 380, 'career_attempts': 1000},
+        {'season': 2024, 'total_shots': 200, 'made_shots': 90, 'made_threes': 30,
+         'fg_percentage': 45.0, 'efg_percentage': 52.5}
+    ]
+    attach_confidence_intervals(records, fields={'career_accuracy': [('career_threes', 'career_attempts')]}, decimals=2)
+
+    low, high = wilson_interval([380], [1000])
+    assert records[0]['confidence_intervals'] == {'career_accuracy': [round(low[0] * 100, 2), round(high[0] * 100, 2)]}
+    season = records[1]['confidence_intervals']
+    assert set(season) == {'fg_percentage', 'efg_percentage'}
+    assert season['efg_percentage'][0] < 52.5 < season['efg_percentage'][1]
+
+def test_leaderboard_rows_carry_intervals():
+    totals = pd.DataFrame({
+        'player': ['A', 'B', 'C'], 'season': [2024] * 3,
+        'fga': [500, 400, 100], 'fgm': [250, 180, 60],
+        'three_pa': [200, 150, 10], 'three_pm': [80, 45, 9]
+    })
+    board = build_leaderboard(window_totals(totals), 'three_pt_percentage')
+    assert board['columns'][-2:] == ['ci_low', 'ci_high']
+    assert [row[1] for row in board['rows']] == ['A', 'B']
+
+    low, high = wilson_interval([80, 45], [200, 150])
+    assert [row[-2:] for row in board['rows']] == [[round(low[0] * 100, 1), round(high[0] * 100, 1)],
+                                                   [round(low[1] * 100, 1), round(high[1] * 100, 1)]]
+
+    efg = build_leaderboard(window_totals(totals), 'efg_percentage', min_qualifier=0)
+    for row in efg['rows']:
+        assert row[-2] <= row[2] <= row[-1]
+
+    counts = build_leaderboard(window_totals(totals), 'three_pt_made')
+    assert 'ci_low' not in counts['columns']
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import parse_cache
+from conftest import make_season
+from data_quality import QualityReport, read_validated
+
+@pytest.fixture
+def shots():
+    """One synthetic season that passes every check."""
+    df = make_season(2014)
+    # Long corner threes from the generator land past the sideline
+    df['LOC_X'] = df['LOC_X'].clip(-25, 25)
+    return df
+
+def counts(report):
+    return {name: entry['count'] for name, entry in report.checks.items()}
+
+def test_clean_season_has_no_issues(shots):
+    report = QualityReport(2014).validate_chunk(shots).finish()
+    assert report.rows == len(shots)
+    assert report.issue_count == 0
+    assert report.missing_columns == []
+    assert report.dtype_mismatches == {}
+
+def test_injected_rows_are_flagged(shots):
+    bad = shots.copy()
+    bad.loc[3, 'LOC_X'] = 40
+    paint_two = bad.index[bad['SHOT_TYPE'] == '2PT Field Goal'][0]
+    bad.loc[paint_two, ['SHOT_TYPE', 'BASIC_ZONE']] = ['3PT Field Goal', 'In The Paint (Non-RA)']
+    bad.loc[7, 'QUARTER'] = 9
+    bad.loc[8, 'MINS_LEFT'] = 13
+    bad = pd.concat([bad, bad.iloc[[10, 11]]], ignore_index=True)
+
+    report = QualityReport(2014).validate_chunk(bad).finish()
+    found = counts(report)
+    assert found['loc_x_out_of_range'] == 1
+    assert found['three_pointer_in_two_point_zone'] == 1
+    assert found['three_pointer_too_close'] == 1
+    assert found['quarter_out_of_range'] == 1
+    assert found['clock_out_of_range'] == 1
+    assert found['duplicate_game_events'] == 2
+    assert report.issue_count == 7
+
+    samples = report.checks['loc_x_out_of_range']['samples']
+    assert [s['row'] for s in samples] == [3]
+    assert samples[0]['PLAYER_NAME'] == bad.loc[3, 'PLAYER_NAME']
+
+def test_teams_outside_the_league_are_reported(shots):
+    shots.loc[:4, 'TEAM_NAME'] = 'Vancouver Grizzlies'
+    report = QualityReport(2014).validate_chunk(shots).finish()
+    # Relocated franchises that normalize to a current team are not reported
+    assert dict(report.unmapped_teams) == {'Vancouver Grizzlies': 5}
+
+def test_unparseable_values_are_dtype_mismatches(shots):
+    shots = shots.astype({'QUARTER': object})
+    shots.loc[[0, 1], 'QUARTER'] = 'OT'
+    report = QualityReport(2014).validate_chunk(shots).finish()
+    assert report.dtype_mismatches['QUARTER']['bad_values'] == 2
+    assert report.dtype_mismatches['QUARTER']['expected'] == 'int'
+    # Non-numbers fail the type check, not the range checks
+    assert counts(report)['quarter_out_of_range'] == 0
+
+def test_chunked_validation_matches_a_single_pass(shots):
+    # Duplicates of rows from earlier chunks are only found across chunks
+    df = pd.concat([shots, shots.iloc[[5, 400]]], ignore_index=True)
+    df.loc[[2, 350, 700], 'LOC_Y'] = -3
+
+    whole = QualityReport(2014, sample_size=10).validate_chunk(df).finish()
+    chunked = QualityReport(2014, sample_size=10)
+    for start in range(0, len(df), 128):
+        chunked.validate_chunk(df.iloc[start:start + 128])
+    chunked.finish()
+
+    assert chunked.to_dict() == whole.to_dict()
+    assert counts(chunked)['duplicate_game_events'] == 2
+    assert counts(chunked)['loc_y_out_of_range'] == 3
+
+def test_finish_drops_the_event_hashes(shots):
+    report = QualityReport(2014).validate_chunk(shots)
+    assert report._event_hashes
+    report.finish()
+    assert report._event_hashes == []
+    # A finished report no longer treats earlier rows as duplicates
+    report.validate_chunk(shots.iloc[:10])
+    assert counts(report)['duplicate_game_events'] == 0
+
+def test_parse_validates_each_chunk_and_caches_the_report(season_files, monkeypatch):
+    path = season_files[1]
+    df = pd.read_csv(path)
+    df.loc[[0, 500], 'QUARTER'] = 9
+    df = pd.concat([df, df.iloc[[1]]], ignore_index=True)
+    df.to_csv(path, index=False)
+    monkeypatch.setattr(parse_cache, 'PARSE_CHUNK_ROWS', 200)
+
+    parsed, report = read_validated(path, 2014)
+    expected = QualityReport(2014).validate_chunk(pd.read_csv(path)).finish()
+    pd.testing.assert_frame_equal(parsed, pd.read_csv(path))
+    assert report.to_dict() == expected.to_dict()
+    assert counts(report)['quarter_out_of_range'] == 2
+    assert counts(report)['duplicate_game_events'] == 1
+
+    def no_validation(self, chunk):
+        raise AssertionError('a cache hit re-ran the checks')
+    monkeypatch.setattr(QualityReport, 'validate_chunk', no_validation)
+    _, cached = read_validated(path, 2014)
+    assert cached.to_dict() == expected.to_dict()
+    assert cached.issue_count == expected.issue_count
@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+import create_master_dataset
+import delta_ingest
+import process_comprehensive_nba_data
+from process_enhanced_nba_data import save_enhanced_data
+
+OUTPUTS = [
+    'data/comprehensive_team_data.json', 'data/comprehensive_player_data.json',
+    'data/comprehensive_league_data.json', 'data/scene4_data_enhanced.json', 'data/scene4_data.json',
+    'data/master/team_season.json', 'data/master/player_career.json',
+    'data/master/shot_analytics.json', 'data/master/situation_analytics.json', 'data/master/metadata.json'
+]
+
+# Run-specific metadata that legitimately differs between a delta and a full build
+RUN_KEYS = {'creation_date', 'watermarks', 'sample', 'file_sizes'}
+
+def _strip(data):
+    if isinstance(data, list):
+        return [_strip(item) for item in data]
+    if isinstance(data, dict):
+        return {key: _strip(value) for key, value in data.items() if key not in RUN_KEYS}
+    return data
+
+def _outputs():
+    outputs = {}
+    for path in OUTPUTS:
+        with open(path, 'r') as f:
+            outputs[path] = _strip(json.load(f))
+    return outputs
+
+def _lines(path):
+    with open(path, 'rb') as f:
+        return f.read().splitlines()
+
+def _master_lines():
+    return _lines(delta_ingest.MASTER_CSV)
+
+def _run(module, monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', [module.__name__ + '.py', *args])
+    module.main()
+
+def _split_files(season_files):
+    """Cut every season file to its first two thirds; returns a function that appends the rest."""
+    rest = {}
+    for path in season_files:
+        with open(path, 'rb') as f:
+            lines = f.read().splitlines(keepends=True)
+        cut = len(lines) * 2 // 3
+        rest[path] = b''.join(lines[cut:])
+        with open(path, 'wb') as f:
+            f.write(b''.join(lines[:cut]))
+
+    def append_rest():
+        for path, data in rest.items():
+            with open(path, 'ab') as f:
+                f.write(data)
+    return append_rest
+
+def test_delta_ingest_matches_full_build(season_files, monkeypatch):
+    append_rest = _split_files(season_files)
+    _run(delta_ingest, monkeypatch)
+    append_rest()
+    _run(delta_ingest, monkeypatch)
+    delta_outputs = _outputs()
+    delta_master = _master_lines()
+
+    _run(process_comprehensive_nba_data, monkeypatch)
+    save_enhanced_data()
+    _run(create_master_dataset, monkeypatch)
+
+    full_outputs = _outputs()
+    for path in OUTPUTS:
+        assert delta_outputs[path] == full_outputs[path], path
+    # Same rows; the delta master CSV lists each season's new rows after its earlier ones
+    full_master = _master_lines()
+    assert delta_master[0] == full_master[0]
+    assert sorted(delta_master[1:]) == sorted(full_master[1:])
+
+def test_second_run_without_new_games_changes_nothing(season_files, monkeypatch):
+    _run(delta_ingest, monkeypatch)
+    master = _master_lines()
+    with open('data/state/watermarks.json') as f:
+        watermarks = json.load(f)
+
+    _run(delta_ingest, monkeypatch)
+    assert _master_lines() == master
+    with open('data/state/watermarks.json') as f:
+        assert json.load(f)['files'] == watermarks['files']
+
+def test_interrupted_run_does_not_duplicate_master_rows(season_files, monkeypatch):
+    append_rest = _split_files(season_files)
+    _run(delta_ingest, monkeypatch)
+    append_rest()
+
+    # Die after the second file's rows reach the master CSV, before the state is saved
+    append = delta_ingest.append_master_rows
+    calls = []
+    def failing_append(df):
+        append(df)
+        calls.append(len(df))
+        if len(calls) == 2:
+            raise RuntimeError('interrupted')
+    monkeypatch.setattr(delta_ingest, 'append_master_rows', failing_append)
+    with pytest.raises(RuntimeError):
+        _run(delta_ingest, monkeypatch)
+    monkeypatch.setattr(delta_ingest, 'append_master_rows', append)
+
+    _run(delta_ingest, monkeypatch)
+    lines = _master_lines()
+    total = sum(len(pd.read_csv(path)) for path in season_files)
+    assert len(lines) - 1 == total
+    assert len(set(lines[1:])) == total
+
+def test_sample_is_reservoir_sampled_from_appended_rows(season_files, monkeypatch):
+    monkeypatch.setattr(delta_ingest, 'SAMPLE_ROWS', 500)
+    append_rest = _split_files(season_files)
+    _run(delta_ingest, monkeypatch)
+    first_sample = _lines(delta_ingest.SAMPLE_CSV)
+    append_rest()
+    _run(delta_ingest, monkeypatch)
+
+    sample = _lines(delta_ingest.SAMPLE_CSV)
+    master = _master_lines()
+    assert len(first_sample) == len(sample) == 501
+    assert sample[0] == master[0]
+    assert len(set(sample[1:])) == 500
+    assert set(sample[1:]) <= set(master[1:])
+    # Some rows appended by the second run made it into the sample
+    assert set(sample[1:]) - set(first_sample[1:])
+
+    with open('data/master/metadata.json') as f:
+        metadata = json.load(f)
+    assert metadata['sample']['updated_incrementally'] is True
+    assert metadata['sample']['population_rows'] == len(master) - 1
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from hyperloglog import GroupedHyperLogLog, HyperLogLog, relative_error
+
+@pytest.mark.parametrize('precision', [10, 12, 14])
+def test_count_within_error_bound(precision):
+    values = np.arange(50000)
+    count = HyperLogLog(precision).add(values).count()
+    # Three standard errors covers the estimate with overwhelming probability
+    assert abs(count - len(values)) <= 3 * relative_error(precision) * len(values)
+
+def test_small_counts_use_linear_counting():
+    assert HyperLogLog(12).add(np.arange(100)).count() == 100
+
+def test_duplicates_do_not_change_the_count():
+    once = HyperLogLog().add(np.arange(5000))
+    repeated = HyperLogLog().add(np.tile(np.arange(5000), 4))
+    assert np.array_equal(once.registers, repeated.registers)
+
+def test_merge_matches_a_single_sketch_in_any_order():
+    values = np.arange(20000)
+    whole = HyperLogLog().add(values)
+    parts = [HyperLogLog().add(part) for part in np.array_split(values, 5)]
+
+    forward = HyperLogLog()
+    for part in parts:
+        forward.merge(part)
+    backward = HyperLogLog()
+    for part in reversed(parts):
+        backward.merge(part)
+
+    assert np.array_equal(forward.registers, whole.registers)
+    assert np.array_equal(backward.registers, whole.registers)
+
+def test_merge_rejects_other_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+
+def test_invalid_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(3)
+
+def test_nulls_are_ignored_and_float_ids_hash_like_ints():
+    ints = HyperLogLog().add(pd.Series([1, 2, 3]))
+    floats = HyperLogLog().add(pd.Series([1.0, np.nan, 2.0, 3.0]))
+    assert np.array_equal(ints.registers, floats.registers)
+
+def test_round_trip():
+    sketch = HyperLogLog(11).add(np.arange(3000))
+    restored = HyperLogLog.from_dict(sketch.to_dict())
+    assert restored.precision == 11
+    assert np.array_equal(restored.registers, sketch.registers)
+
+def test_grouped_merge_matches_grouped_add():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'team': rng.choice(['A', 'B', 'C'], 30000), 'season': rng.choice([2004, 2005], 30000)})
+    players = rng.integers(0, 2000, 30000)
+
+    whole = GroupedHyperLogLog().add(frame, players)
+    merged = GroupedHyperLogLog()
+    for rows in np.array_split(np.arange(len(frame)), 4):
+        merged.merge(GroupedHyperLogLog().add(frame.iloc[rows], players[rows]))
+
+    names = ['team', 'season']
+    pd.testing.assert_series_equal(merged.counts(names).sort_index(), whole.counts(names).sort_index())
+
+    exact = pd.Series(players).groupby([frame['team'], frame['season']]).nunique()
+    estimates = whole.counts(names).reindex(exact.index)
+    assert ((estimates - exact).abs() <= 3 * relative_error(whole.precision) * exact).all()
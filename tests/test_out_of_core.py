@@ -0,0 +1,110 @@
+import filecmp
+import json
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+
+import create_master_dataset
+import out_of_core
+from out_of_core import MemoryBudgetError, parse_memory_size, partition_count, plan_budget
+from parse_cache import iter_shots_csv, read_shots_csv
+
+MASTER_DIR = 'data/master'
+
+# Run-specific metadata that differs between any two builds
+RUN_KEYS = {'creation_date'}
+
+def _run(monkeypatch, *args):
+    monkeypatch.setattr(sys, 'argv', ['create_master_dataset.py', *args])
+    create_master_dataset.main()
+
+def _metadata(directory):
+    with open(os.path.join(directory, 'metadata.json'), 'r') as f:
+        return {key: value for key, value in json.load(f).items() if key not in RUN_KEYS}
+
+@pytest.fixture
+def small_budget(monkeypatch):
+    """Plans a few hundred rows per chunk and several spill partitions, as a tight limit would for full seasons."""
+    plan = create_master_dataset.plan_budget
+    monkeypatch.setattr(create_master_dataset, 'plan_budget', lambda *args: (plan(*args)[0], 700))
+    monkeypatch.setattr(create_master_dataset, 'partition_count', lambda *args: 4)
+    # Fewer sample rows than shots, so both paths have to draw the same sample
+    monkeypatch.setattr(create_master_dataset, 'SAMPLE_ROWS', 500)
+
+def test_out_of_core_matches_in_memory(season_files, monkeypatch, small_budget):
+    _run(monkeypatch)
+    shutil.move('data', 'in_memory')
+
+    _run(monkeypatch, '--memory-limit', '1G', '--spill-dir', 'spill')
+    names = sorted(os.listdir(os.path.join('in_memory', 'master')))
+    assert names == sorted(os.listdir(MASTER_DIR))
+
+    outputs = [name for name in names if name != 'metadata.json']
+    _, mismatch, errors = filecmp.cmpfiles(os.path.join('in_memory', 'master'), MASTER_DIR, outputs, shallow=False)
+    assert (mismatch, errors) == ([], [])
+    assert _metadata(os.path.join('in_memory', 'master')) == _metadata(MASTER_DIR)
+    # Spill files are removed once the analyses are written
+    assert not os.path.exists('spill') or os.listdir('spill') == []
+
+def test_out_of_core_matches_in_memory_with_sketches(season_files, monkeypatch, small_budget):
+    _run(monkeypatch, '--distinct', 'hll')
+    shutil.move('data', 'in_memory')
+
+    _run(monkeypatch, '--distinct', 'hll', '--memory-limit', '1G')
+    for name in ['team_season.json', 'player_career.json', 'shot_analytics.json', 'situation_analytics.json']:
+        assert filecmp.cmp(os.path.join('in_memory', 'master', name), os.path.join(MASTER_DIR, name), shallow=False)
+    assert _metadata(os.path.join('in_memory', 'master')) == _metadata(MASTER_DIR)
+
+def test_too_small_limit_fails_before_writing(season_files, monkeypatch, capsys):
+    with pytest.raises(SystemExit):
+        _run(monkeypatch, '--memory-limit', '10M')
+    assert '--memory-limit' in capsys.readouterr().err
+    assert not os.path.exists(MASTER_DIR)
+
+def test_plan_budget(monkeypatch):
+    monkeypatch.setattr(out_of_core, 'peak_rss_bytes', lambda: 100 << 20)
+    with pytest.raises(MemoryBudgetError):
+        plan_budget(120 << 20, row_bytes=500)
+    with pytest.raises(MemoryBudgetError):
+        plan_budget(200 << 20, row_bytes=500, reserved_bytes=80 << 20)
+
+    budget, chunk_rows = plan_budget(1 << 30, row_bytes=500, reserved_bytes=24 << 20)
+    assert budget == (1 << 30) - (124 << 20)
+    assert chunk_rows == int(budget * out_of_core.CHUNK_SHARE / 500)
+    # Tiny budgets still read whole chunks of a useful size
+    assert plan_budget(133 << 20, row_bytes=10 ** 6)[1] == out_of_core.MIN_CHUNK_ROWS
+
+def test_partition_count():
+    budget = 64 << 20
+    share = budget * out_of_core.PARTITION_SHARE
+    assert partition_count(0, budget) == 1
+    assert partition_count(share, budget) == 1
+    assert partition_count(share + 1, budget) == 2
+    assert partition_count(10 * share, budget) == 10
+
+@pytest.mark.parametrize('text,size', [('2G', 2 << 30), ('512MB', 512 << 20), ('1.5GiB', 3 << 29),
+                                       ('300m', 300 << 20), ('1073741824', 1 << 30)])
+def test_parse_memory_size(text, size):
+    assert parse_memory_size(text) == size
+
+def test_parse_memory_size_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_memory_size('lots')
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_chunks_concatenate_to_the_parsed_frame(season_files, cached):
+    path = season_files[2]
+    # A column that is int in early chunks and float later must be float in every chunk
+    df = pd.read_csv(path).astype({'SHOT_DISTANCE': object})
+    df.loc[len(df) - 1, 'SHOT_DISTANCE'] = 25.5
+    df.to_csv(path, index=False)
+    if cached:
+        read_shots_csv(path)
+
+    chunks = list(iter_shots_csv(path, 250))
+    assert [len(chunk) for chunk in chunks[:-1]] == [250] * (len(chunks) - 1)
+    assert all(chunk['SHOT_DISTANCE'].dtype == float for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), read_shots_csv(path))
@@ -0,0 +1,108 @@
+import glob
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import parse_cache
+from parse_cache import read_shots_csv
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Records every real CSV parse the cache performs."""
+    calls = []
+    parse = parse_cache._parse_csv
+    def counting_parse(file_path, report=None):
+        calls.append(file_path)
+        return parse(file_path, report)
+    monkeypatch.setattr(parse_cache, '_parse_csv', counting_parse)
+    return calls
+
+def test_hit_returns_the_parsed_frame(season_files, parses):
+    path = season_files[0]
+    first = read_shots_csv(path)
+    second = read_shots_csv(path)
+    assert parses == [path]
+    pd.testing.assert_frame_equal(second, pd.read_csv(path))
+    pd.testing.assert_frame_equal(first, second)
+
+def test_size_change_invalidates(season_files, parses):
+    path = season_files[0]
+    read_shots_csv(path)
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(path, 'ab') as f:
+        f.write(lines[1])
+
+    df = read_shots_csv(path)
+    assert parses == [path, path]
+    assert len(df) == len(lines)
+
+def test_touch_without_content_change_is_a_hit(season_files, parses):
+    path = season_files[0]
+    read_shots_csv(path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    read_shots_csv(path)
+    read_shots_csv(path)
+    assert parses == [path]
+
+def test_same_size_rewrite_is_detected_by_hash(season_files, parses):
+    path = season_files[0]
+    read_shots_csv(path)
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    # Same length, different shot result in the first row
+    data = data.replace(b',False,', b',True ,', 1) if b',False,' in data else data.replace(b',True,', b',Fals,', 1)
+    with open(path, 'wb') as f:
+        f.write(data)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    df = read_shots_csv(path)
+    assert parses == [path, path]
+    pd.testing.assert_frame_equal(df, pd.read_csv(path))
+
+def test_identical_copies_share_one_frame(season_files, parses):
+    path = season_files[0]
+    copy = os.path.join('Data', 'copy.csv')
+    shutil.copyfile(path, copy)
+
+    read_shots_csv(path)
+    pd.testing.assert_frame_equal(read_shots_csv(copy), pd.read_csv(path))
+    assert parses == [path]
+    frames = glob.glob(os.path.join(parse_cache.CACHE_DIR, f'frames-v{parse_cache.CACHE_VERSION}', '*'))
+    assert len(frames) == 1
+
+def test_version_bump_discards_entries(season_files, parses, monkeypatch):
+    path = season_files[0]
+    read_shots_csv(path)
+    monkeypatch.setattr(parse_cache, 'CACHE_VERSION', parse_cache.CACHE_VERSION + 1)
+    read_shots_csv(path)
+    assert parses == [path, path]
+
+def test_unreadable_entry_is_rebuilt(season_files, parses):
+    path = season_files[0]
+    read_shots_csv(path)
+    meta_path = parse_cache._meta_path(path, parse_cache.CACHE_DIR)
+    with open(meta_path, 'w') as f:
+        f.write('{not json')
+
+    # The frame is still stored under the file's content hash, so no re-parse is needed
+    pd.testing.assert_frame_equal(read_shots_csv(path), pd.read_csv(path))
+    assert parses == [path]
+    with open(meta_path) as f:
+        assert json.load(f)['sha256'] == parse_cache.file_digest(path)
+
+def test_unreadable_frame_is_reparsed(season_files, parses):
+    path = season_files[0]
+    read_shots_csv(path)
+    for frame in glob.glob(os.path.join(parse_cache.CACHE_DIR, f'frames-v{parse_cache.CACHE_VERSION}', '*')):
+        with open(frame, 'wb') as f:
+            f.write(b'corrupt')
+
+    pd.testing.assert_frame_equal(read_shots_csv(path), pd.read_csv(path))
+    assert parses == [path, path]
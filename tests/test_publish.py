@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import publish
+from publish import Publisher, content_hash, file_hash, load_manifest
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+def _sha(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:publish.HASH_LENGTH]
+
+def test_manifest_records_the_hash_and_size_of_each_file():
+    publisher = Publisher()
+    publisher.add_json('data/a.json', {'b': 1, 'a': [1, 2]}, indent=2)
+    publisher.add_csv('data/b.csv', pd.DataFrame({'x': [1, 2]}), index=False)
+    publisher.add_bytes('data/c.bin', b'\x00\x01')
+    assert sorted(publisher.publish()) == ['data/a.json', 'data/b.csv', 'data/c.bin']
+
+    files = load_manifest()['files']
+    assert list(files) == sorted(files)
+    for path, entry in files.items():
+        assert entry == {'hash': _sha(path), 'bytes': os.path.getsize(path)}
+        assert file_hash(path) == entry['hash']
+    with open('data/b.csv') as f:
+        assert f.read() == 'x\n1\n2\n'
+
+def test_unchanged_content_is_not_rewritten():
+    first = Publisher()
+    first.add_json('data/a.json', {'a': 1})
+    first.add_json('data/b.json', {'b': 1})
+    first.publish()
+    inode = os.stat('data/a.json').st_ino
+
+    second = Publisher()
+    second.add_json('data/a.json', {'a': 1})
+    second.add_json('data/b.json', {'b': 2})
+    assert second.publish() == ['data/b.json']
+    assert os.stat('data/a.json').st_ino == inode
+    assert load_manifest()['files']['data/b.json']['hash'] == content_hash(json.dumps({'b': 2}).encode('utf-8'))
+
+def test_manifest_keeps_entries_from_other_publishers():
+    first = Publisher()
+    first.add_json('data/a.json', {'a': 1})
+    first.publish()
+    second = Publisher()
+    second.add_json('data/b.json', {'b': 1})
+    second.publish()
+    assert set(load_manifest()['files']) == {'data/a.json', 'data/b.json'}
+
+def test_file_hash_of_missing_file():
+    assert file_hash('data/missing.json') is None
+
+def test_file_hash_streams_like_a_whole_read():
+    data = os.urandom(3000)
+    os.makedirs('data')
+    with open('data/blob', 'wb') as f:
+        f.write(data)
+    assert file_hash('data/blob', block_size=256) == content_hash(data)
+
+def _leftovers(directory='data'):
+    return [name for name in os.listdir(directory) if name.endswith('.tmp')]
+
+def test_failed_write_leaves_the_old_file_and_no_temp_files():
+    publish.atomic_write_bytes('data/a.json', b'old')
+    with pytest.raises(RuntimeError):
+        with publish.atomic_output('data/a.json') as temp_path:
+            with open(temp_path, 'wb') as f:
+                f.write(b'partial')
+            raise RuntimeError('interrupted')
+    with open('data/a.json', 'rb') as f:
+        assert f.read() == b'old'
+    assert _leftovers() == []
+
+def test_failed_serialization_keeps_published_files_and_manifest():
+    first = Publisher()
+    first.add_json('data/a.json', {'a': 1})
+    first.publish()
+    manifest = load_manifest()
+
+    def broken():
+        raise ValueError('cannot serialize')
+    second = Publisher()
+    second.add_json('data/a.json', {'a': 2})
+    second.artifacts['data/b.json'] = broken
+    with pytest.raises(ValueError):
+        second.publish()
+    assert load_manifest() == manifest
+    assert not os.path.exists('data/b.json')
+    assert _leftovers() == []
+
+def test_concurrent_publish_writes_every_artifact():
+    publisher = Publisher(max_workers=8)
+    for i in range(200):
+        publisher.add_json(f'data/many/{i}.json', {'i': i})
+    assert len(publisher.publish()) == 200
+    for i in range(200):
+        with open(f'data/many/{i}.json') as f:
+            assert json.load(f) == {'i': i}
+    assert len(load_manifest()['files']) == 200
+    assert _leftovers('data/many') == []
+
+def test_run_publishes_inner_publishers_once_on_exit():
+    with Publisher() as run:
+        inner = Publisher()
+        inner.add_json('data/a.json', {'a': 1})
+        assert inner.publish() == []
+        assert not os.path.exists('data/a.json')
+        assert list(run.artifacts) == ['data/a.json']
+    assert load_manifest()['files']['data/a.json']['hash'] == file_hash('data/a.json')
+
+def test_run_that_fails_publishes_nothing():
+    with pytest.raises(RuntimeError):
+        with Publisher():
+            inner = Publisher()
+            inner.add_json('data/a.json', {'a': 1})
+            inner.publish()
+            raise RuntimeError('failed run')
+    assert not os.path.exists('data/a.json')
+    assert publish._run is None
+
+def test_versioned_publish_snapshots_and_repoints_the_live_link():
+    for value in (1, 2):
+        publisher = Publisher(versioned=True)
+        publisher.add_json('data/a.json', {'a': value})
+        publisher.publish()
+        live = os.path.realpath(publish.LIVE_LINK)
+        with open(os.path.join(live, 'a.json')) as f:
+            assert json.load(f) == {'a': value}
+        with open(os.path.join(live, 'manifest.json')) as f:
+            assert json.load(f) == load_manifest()
+
+    assert os.path.isdir('data') and not os.path.islink('data')
+    assert len(os.listdir(publish.VERSIONS_DIR)) == 2